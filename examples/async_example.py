@@ -0,0 +1,21 @@
+import asyncio
+
+from starvell import AsyncAccount
+
+
+async def main() -> None:
+    async with AsyncAccount("session_id") as acc:  # session_id со Starvell
+        print(f"Привет {acc.user.username}!\n")
+
+        # все запросы выполняются одновременно, в одном event loop
+        sales, transactions, black_list = await asyncio.gather(
+            acc.get_sales(limit=100),
+            acc.get_transactions(limit=100),
+            acc.get_black_list(),
+        )
+
+        print(f"Продаж: {len(sales)}, транзакций: {len(transactions)}")
+        print(f"Пользователей в ЧС: {len(black_list)}")
+
+
+asyncio.run(main())
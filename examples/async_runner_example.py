@@ -0,0 +1,31 @@
+import asyncio
+
+from starvell import AsyncAccount, AsyncRunner
+from starvell.enums import MessageTypes
+from starvell.types import NewMessageEvent
+
+
+async def main() -> None:
+    async with AsyncAccount("session_id") as acc:  # session_id со Starvell
+        print(f"Привет {acc.user.username}!\n")
+        runner = AsyncRunner(acc)
+
+        async def my_filter(msg: NewMessageEvent) -> bool:
+            """
+            Асинхронная функция-предикат, возвращает True если сообщение начинается с "!"
+            """
+
+            return msg.content.startswith("!")
+
+        @runner.add_handler(MessageTypes.NEW_MESSAGE, my_filter)
+        async def msg_hook(msg: NewMessageEvent) -> None:
+            """
+            Все хэндлеры выполняются в одном event loop, без отдельного потока на каждое событие
+            """
+
+            await acc.send_message(msg.chat_id, "Команда получена!")
+
+        await runner.run()
+
+
+asyncio.run(main())
@@ -1,4 +1,5 @@
 from .account import Account
-from .events import Runner
+from .async_account import AsyncAccount
+from .events import AsyncRunner, Runner
 
-__all__ = ["Account", "Runner"]
+__all__ = ["Account", "AsyncAccount", "AsyncRunner", "Runner"]
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from aiohttp import ClientError, ClientWebSocketResponse, WSMsgType
+
+from .async_session import AsyncStarvellSession
+from .enums import EngineIOPacketTypes, SocketTypes
+from .errors import HandlerError, ProtocolError
+from .protocol import (
+    PONG,
+    Handshake,
+    Heartbeat,
+    Packet,
+    backoff_delay,
+    encode_connect,
+    parse_handshake,
+    parse_packet,
+    socket_url,
+)
+from .tracing import Tracer
+
+
+class AsyncSocket:
+    def __init__(
+        self,
+        session: AsyncStarvellSession,
+        online: bool = True,
+        reconnect_delay: float = 1,
+        max_reconnect_delay: float = 60,
+        latency_interval: float = 15,
+        tracer: Tracer | None = None,
+    ):
+        """
+        Асинхронная версия Socket: веб-сокет Starvell в event loop'е, через сессию aiohttp аккаунта
+
+        В отличие от Socket, не запускается в конструкторе, используйте ``await socket.run()``
+
+        :param session: HTTP сессия AsyncAccount (из неё берутся куки, прокси и пул соединений)
+        :param online: Поддерживать-ли постоянный онлайн? (True - при использовании API, аккаунт всегда будет онлайн)
+        :param reconnect_delay: Задержка перед первой попыткой переподключения в секундах (дальше растёт экспоненциально, с джиттером)
+        :param max_reconnect_delay: Максимальная задержка перед переподключением в секундах
+        :param latency_interval: Как часто замерять задержку (RTT) ping'ом веб-сокета, в секундах
+        :param tracer: Трассировка: на каждое событие Socket.IO начинается трассировка (спан "socket.frame"), в которую попадает его обработка хэндлерами
+        """
+
+        self.session: AsyncStarvellSession = session
+        self.online: bool = online
+        self.reconnect_delay: float = reconnect_delay
+        self.max_reconnect_delay: float = max_reconnect_delay
+        self.latency_interval: float = latency_interval
+        # для AsyncReplaySocket сессии нет
+        self.url: str = socket_url(
+            session.base_url if session is not None else "https://starvell.com"
+        )
+        self.ws: ClientWebSocketResponse | None = None
+        self.handshake: Handshake | None = None
+        self.heartbeat: Heartbeat = Heartbeat()
+        self.tracer: Tracer | None = tracer
+
+        self.handlers: dict[
+            SocketTypes, list[Callable[..., Awaitable[None]]]
+        ] = {
+            SocketTypes.OPEN: [],
+            SocketTypes.NEW_MESSAGE: [],
+            SocketTypes.PACKET: [],
+        }
+
+    async def on_message(self, ws: ClientWebSocketResponse, msg: str) -> None:
+        """
+        Вызывается при новом сообщении в веб сокете, и соответственно вызывает все привязанные хэндлеры
+
+        Сообщение разбирается один раз: на ping сразу отвечает pong, из пакета OPEN запоминает параметры соединения (handshake), хэндлеры SocketTypes.PACKET получают разобранный пакет
+
+        :param ws: Веб-сокет aiohttp
+        :param msg: Сообщение веб сокета
+
+        :return: None
+        """
+
+        received_at = time.time()
+        packet = await self.process_packet(ws, msg)
+
+        # служебные пакеты (ping, подключение к пространству имён) не трассируются
+        if self.tracer is None or packet is None or packet.event is None:
+            await self.__handle(ws, msg, packet)
+            return
+
+        with self.tracer.trace(
+            "socket.frame",
+            received_at,
+            event=packet.event,
+            namespace=packet.namespace,
+            size=len(msg),
+        ):
+            self.tracer.record("socket.parse", received_at)
+            await self.__handle(ws, msg, packet)
+
+    async def __handle(
+        self, ws: ClientWebSocketResponse, msg: str, packet: Packet | None
+    ) -> None:
+        for func in self.handlers[SocketTypes.NEW_MESSAGE]:
+            try:
+                await func(ws, msg)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+        if packet is None:
+            return
+
+        for func in self.handlers[SocketTypes.PACKET]:
+            try:
+                await func(ws, packet)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+    async def process_packet(
+        self, ws: ClientWebSocketResponse, msg: str
+    ) -> Packet | None:
+        """
+        Разбирает сообщение веб сокета и обрабатывает служебные пакеты Engine.IO (OPEN, PING)
+
+        :param ws: Веб-сокет aiohttp
+        :param msg: Сообщение веб сокета
+
+        :return: Packet, либо None, если сообщение не является корректным пакетом
+        """
+
+        try:
+            packet = parse_packet(msg)
+
+            if packet.eio_type == EngineIOPacketTypes.PING:
+                self.heartbeat.on_ping()
+                await ws.send_str(PONG)
+            elif packet.eio_type == EngineIOPacketTypes.OPEN:
+                self.handshake = parse_handshake(packet)
+                self.heartbeat.on_handshake(self.handshake)
+        except ProtocolError:
+            return None
+
+        return packet
+
+    async def on_open(self, ws: ClientWebSocketResponse) -> None:
+        """
+        Вызывается при открытии веб сокета, и вызывает все хэндлеры привязанные к этому событию
+
+        :param ws: Веб-сокет aiohttp
+
+        :return: None
+        """
+
+        self.heartbeat.on_open()
+        await ws.send_str(encode_connect("/chats"))
+
+        if self.online:
+            await ws.send_str(encode_connect("/online"))
+
+        for func in self.handlers[SocketTypes.OPEN]:
+            try:
+                await func(ws)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+    async def run(self) -> None:
+        """
+        Подключается к веб сокету и читает сообщения, пока задача не будет отменена
+
+        После обрыва соединения (в т.ч. если ping сервера не пришёл за pingInterval + pingTimeout) переподключается с экспоненциальной задержкой и джиттером
+
+        :return: None
+        """
+
+        attempt = 0
+
+        while True:
+            self.handshake = None
+
+            try:
+                async with self.session.session.ws_connect(
+                    self.url, proxy=self.session.proxy, autoping=False
+                ) as ws:
+                    self.ws = ws
+                    await self.on_open(ws)
+                    await self.__read(ws)
+            except (ClientError, asyncio.TimeoutError):
+                pass
+            finally:
+                self.ws = None
+                self.heartbeat.on_close()
+
+            # после успешного рукопожатия задержка сбрасывается
+            attempt = 0 if self.handshake is not None else attempt + 1
+            await asyncio.sleep(
+                backoff_delay(
+                    attempt, self.reconnect_delay, self.max_reconnect_delay
+                )
+            )
+
+    async def __read(self, ws: ClientWebSocketResponse) -> None:
+        last_latency_ping = 0.0
+
+        while True:
+            remaining = self.heartbeat.remaining()
+
+            if remaining is None or remaining <= 0:
+                # полуоткрытое соединение: сервер перестал слать ping'и
+                self.heartbeat.on_missed()
+                return
+
+            until_latency_ping = (
+                last_latency_ping + self.latency_interval - time.monotonic()
+            )
+
+            if until_latency_ping <= 0:
+                last_latency_ping = time.monotonic()
+                self.heartbeat.ping_sent()
+                await ws.ping()
+                continue
+
+            try:
+                msg = await ws.receive(
+                    timeout=min(remaining, until_latency_ping)
+                )
+            except asyncio.TimeoutError:
+                continue
+
+            if msg.type == WSMsgType.TEXT:
+                try:
+                    await self.on_message(ws, msg.data)
+                except HandlerError as e:
+                    # как и websocket-client, ошибка хэндлера не обрывает соединение
+                    print(f"Ошибка в хэндлере веб-сокета: {e}")
+            elif msg.type == WSMsgType.PING:
+                await ws.pong(msg.data)
+            elif msg.type == WSMsgType.PONG:
+                self.heartbeat.on_pong()
+            elif msg.type in (
+                WSMsgType.CLOSE,
+                WSMsgType.CLOSING,
+                WSMsgType.CLOSED,
+                WSMsgType.ERROR,
+            ):
+                return
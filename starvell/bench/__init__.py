@@ -0,0 +1,12 @@
+__all__ = [
+    "bench_events",
+    "bench_http",
+    "bench_replay",
+    "bench_validation",
+    "generate_frames",
+]
+
+from .events import bench_events, generate_frames
+from .http import bench_http
+from .replay import bench_replay
+from .validation import bench_validation
@@ -0,0 +1,115 @@
+import argparse
+
+from .events import DEFAULT_MIX, bench_events, parse_mix, print_events
+from .http import DEFAULT_CONCURRENCY, HTTP_METHODS, bench_http, print_http
+from .replay import bench_replay, print_replay
+from .validation import bench_validation, print_validation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m starvell.bench",
+        description="Бенчмарки StarvellAPI (без обращения к Starvell)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validation = commands.add_parser(
+        "validation", help="Разбор списков продаж и транзакций"
+    )
+    validation.add_argument("--items", type=int, default=10000)
+    validation.add_argument("--repeat", type=int, default=5)
+
+    events = commands.add_parser(
+        "events", help="Сгенерированные события: разбор, модели и Runner"
+    )
+    events.add_argument("--events", type=int, default=10000)
+    events.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Веса типов событий, например NEW_MESSAGE=80,ORDER_PAYMENT=20",
+    )
+    events.add_argument("--handlers", type=int, default=4)
+    events.add_argument("--filters", type=int, default=1)
+    events.add_argument("--workers", type=int, default=8)
+    events.add_argument("--repeat", type=int, default=3)
+    events.add_argument("--no-allocations", action="store_true")
+    events.add_argument("--seed", type=int, default=0)
+
+    http = commands.add_parser(
+        "http", help="Методы Account против локального StarvellServer"
+    )
+    http.add_argument(
+        "--methods",
+        type=lambda value: value.split(","),
+        help="Методы через запятую (по умолчанию все): "
+        + ", ".join(HTTP_METHODS),
+    )
+    http.add_argument("--requests", type=int, default=200)
+    http.add_argument(
+        "--concurrency",
+        type=lambda value: tuple(int(n) for n in value.split(",")),
+        default=DEFAULT_CONCURRENCY,
+        help="Кол-ва потоков через запятую, например 1,4,16",
+    )
+    http.add_argument("--sweep-method", default="get_order")
+    http.add_argument("--sweep-requests", type=int, default=1000)
+    http.add_argument("--latency", type=float, default=0.01)
+    http.add_argument("--items", type=int, default=100)
+    http.add_argument("--url", help="base_url уже запущенного StarvellServer")
+
+    replay = commands.add_parser(
+        "replay", help="Обработка записанных кадров веб-сокета Runner'ом"
+    )
+    replay.add_argument("path", help="Папка журнала либо файл с кадрами")
+    replay.add_argument("--realtime", action="store_true")
+    replay.add_argument("--speed", type=float, default=1.0)
+    replay.add_argument("--workers", type=int, default=8)
+    replay.add_argument("--repeat", type=int, default=3)
+    replay.add_argument("--async", dest="use_async", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "validation":
+        print_validation(bench_validation(args.items, args.repeat))
+    elif args.command == "events":
+        print_events(
+            bench_events(
+                args.events,
+                args.mix,
+                args.handlers,
+                args.filters,
+                args.workers,
+                args.repeat,
+                not args.no_allocations,
+                args.seed,
+            )
+        )
+    elif args.command == "http":
+        print_http(
+            bench_http(
+                args.methods,
+                args.requests,
+                args.concurrency,
+                args.sweep_method,
+                args.sweep_requests,
+                args.latency,
+                args.items,
+                args.url,
+            )
+        )
+    elif args.command == "replay":
+        print_replay(
+            bench_replay(
+                args.path,
+                args.realtime,
+                args.speed,
+                args.workers,
+                args.repeat,
+                args.use_async,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
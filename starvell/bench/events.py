@@ -0,0 +1,252 @@
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from typing import Any
+
+from starvell.enums import MessageTypes
+from starvell.events import ReplaySocket, Runner, StageTimer, WorkerPool
+from starvell.protocol import encode_event
+from starvell.testing import OfflineAccount, make_message
+from starvell.utils import identify_ws_starvell_message
+from starvell.utils.utils import NOTIFICATION_TYPES
+
+from .replay import print_stages
+
+DEFAULT_MIX: dict[str, float] = {
+    "NEW_MESSAGE": 70,
+    "ORDER_PAYMENT": 10,
+    "REVIEW_CREATED": 10,
+    "BLACKLIST_USER_ADDED": 5,
+    "BLACKLIST_YOU_ADDED": 5,
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """
+    Разбирает состав событий из строки (например "NEW_MESSAGE=80,ORDER_PAYMENT=20")
+
+    :param value: Строка с типами событий и их весами
+
+    :return: Словарь {тип события: вес}
+    """
+
+    mix = {}
+
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip().upper()] = float(weight or 1)
+
+    return mix
+
+
+def generate_frames(
+    events: int = 10000,
+    mix: dict[str, float] | None = None,
+    chats: int = 100,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Генерирует кадры веб-сокета ``42/chats,["message_created",...]`` с заданным составом событий
+
+    :param events: Кол-во кадров
+    :param mix: Веса типов событий: "NEW_MESSAGE" - обычное сообщение, остальные - notificationType ("ORDER_PAYMENT", "REVIEW_CREATED", "BLACKLIST_YOU_ADDED", ...), по умолчанию DEFAULT_MIX
+    :param chats: По скольким чатам распределить события
+    :param seed: Seed генератора (одинаковый seed - одинаковые кадры)
+
+    :return: Список кадров
+
+    :raise ValueError: Если в mix есть неизвестный тип события
+    """
+
+    mix = mix or DEFAULT_MIX
+
+    for name in mix:
+        if name != "NEW_MESSAGE" and name not in NOTIFICATION_TYPES:
+            raise ValueError(f"Неизвестный тип события: {name}")
+
+    rnd = random.Random(seed)
+    types = rnd.choices(list(mix), weights=list(mix.values()), k=events)
+
+    return [
+        encode_event(
+            "/chats",
+            "message_created",
+            make_message(
+                n,
+                str(uuid.UUID(int=rnd.randrange(chats) + 2**66)),
+                None if name == "NEW_MESSAGE" else name,
+            ),
+        )
+        for n, name in enumerate(types)
+    ]
+
+
+def _filter(event: Any) -> bool:
+    # пропускает все события, чтобы каждое дошло до хэндлеров
+    return event is not None
+
+
+def _bench_parse(frames: list[str]) -> dict[str, Any]:
+    # разбор и проверка моделей по одному событию в одном потоке, без пула
+    acc = OfflineAccount()
+    runner = Runner(acc, socket=ReplaySocket(()))
+    stages = StageTimer()
+
+    for frame in frames:
+        started = time.perf_counter()
+        dict_with_data = identify_ws_starvell_message(frame, acc)
+        identified = time.perf_counter()
+        runner.build_event(dict_with_data)
+        stages.record("identify", identified - started)
+        stages.record("validate", time.perf_counter() - identified)
+
+    return stages.snapshot()
+
+
+def _bench_runner(
+    frames: list[str], handlers: int, filters: int, workers: int
+) -> dict[str, Any]:
+    stages = StageTimer()
+    handled = [0]
+    socket = ReplaySocket(frames, stages=stages)
+    runner = Runner(
+        OfflineAccount(),
+        pool=WorkerPool(workers),
+        socket=socket,
+        stages=stages,
+    )
+
+    def handler(event: Any) -> None:
+        handled[0] += 1
+
+    for message_type in MessageTypes:
+        if message_type in runner.handlers:
+            for _ in range(handlers):
+                runner.add_handler(
+                    message_type, [_filter] * filters if filters else None
+                )(handler)
+
+    started = time.perf_counter()
+    socket.run()
+    runner.pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - started
+    events = handled[0] // handlers if handlers else len(frames)
+
+    return {
+        "events": events,
+        "elapsed": elapsed,
+        "events_per_sec": events / elapsed if elapsed else 0.0,
+        "stages": stages.snapshot(),
+        "pool": runner.pool.snapshot(),
+        "enricher": runner.enricher.snapshot(),
+    }
+
+
+def _bench_allocations(frames: list[str], handlers: int) -> dict[str, Any]:
+    # весь путь события в одном потоке: разбор, детали заказа, модель, хэндлеры
+    acc = OfflineAccount()
+    runner = Runner(acc, socket=ReplaySocket(()))
+
+    for message_type in MessageTypes:
+        if message_type in runner.handlers:
+            for _ in range(handlers):
+                runner.add_handler(message_type, _filter)(lambda event: None)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    transient = 0
+
+    try:
+        for frame in frames:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            runner.dispatch(identify_ws_starvell_message(frame, acc))
+            transient += tracemalloc.get_traced_memory()[1] - before
+
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "bytes_per_event": transient / len(frames) if frames else 0.0,
+        "retained_per_event": retained / len(frames) if frames else 0.0,
+    }
+
+
+def bench_events(
+    events: int = 10000,
+    mix: dict[str, float] | None = None,
+    handlers: int = 4,
+    filters: int = 1,
+    workers: int = 8,
+    repeat: int = 3,
+    allocations: bool = True,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Прогоняет сгенерированные события через разбор (identify_ws_starvell_message), проверку моделей и Runner
+
+    Детали заказов собирает OfflineAccount, поэтому к Starvell запросы не выполняются. Размер памяти на событие замеряется отдельным прогоном под tracemalloc (он сильно замедляет выполнение)
+
+    :param events: Кол-во событий
+    :param mix: Веса типов событий (см. generate_frames), по умолчанию DEFAULT_MIX
+    :param handlers: Кол-во хэндлеров на каждый тип события
+    :param filters: Кол-во фильтров у каждого хэндлера
+    :param workers: Кол-во потоков пула Runner'а
+    :param repeat: Кол-во прогонов Runner'а (берётся лучший)
+    :param allocations: Замерять-ли память на событие
+    :param seed: Seed генератора событий
+
+    :return: Словарь (время разбора и проверки моделей, событий в секунду и задержка в Runner'е, память на событие)
+    """
+
+    frames = generate_frames(events, mix, seed=seed)
+    best = None
+
+    for _ in range(repeat):
+        result = _bench_runner(frames, handlers, filters, workers)
+
+        if best is None or result["elapsed"] < best["elapsed"]:
+            best = result
+
+    return {
+        "events": events,
+        "mix": mix or DEFAULT_MIX,
+        "handlers": handlers,
+        "filters": filters,
+        "parse": _bench_parse(frames),
+        "runner": best,
+        "allocations": _bench_allocations(frames, handlers)
+        if allocations
+        else None,
+    }
+
+
+def print_events(results: dict[str, Any]) -> None:
+    mix = ", ".join(f"{k}={v:g}" for k, v in results["mix"].items())
+    runner = results["runner"]
+    total = runner["stages"].get("total", {})
+
+    print(f"Событий: {results['events']}  ({mix})")
+    print(
+        f"Хэндлеров на тип: {results['handlers']}  "
+        f"фильтров: {results['filters']}"
+    )
+    print_stages(results["parse"])
+    print(
+        f"Runner: {runner['events_per_sec']:.0f} событий/с  "
+        f"p50: {total.get('p50', 0) * 1e6:.1f} us  "
+        f"p99: {total.get('p99', 0) * 1e6:.1f} us"
+    )
+    print_stages(runner["stages"])
+
+    if results["allocations"]:
+        a = results["allocations"]
+        print(
+            f"Память на событие: {a['bytes_per_event'] / 1024:.1f} KB  "
+            f"остаётся после обработки: {a['retained_per_event']:.0f} B"
+        )
@@ -0,0 +1,308 @@
+import json
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import pairwise
+from typing import Any
+
+from starvell.account import Account
+from starvell.events import StageTimer
+from starvell.ratelimit import RateLimiter
+from starvell.testing import StarvellServer
+from starvell.types import LotFields
+
+DEFAULT_CONCURRENCY: tuple[int, ...] = (1, 2, 4, 8, 16, 32)
+
+
+class _Transport(threading.local):
+    # время в StarvellSession.send_request и тела ответов текущего вызова метода Account
+    def __init__(self) -> None:
+        self.elapsed: float = 0.0
+        self.contents: list[bytes] = []
+
+
+def _instrument(acc: Account) -> _Transport:
+    transport = _Transport()
+    send_request = acc.request.send_request
+
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        response = send_request(*args, **kwargs)
+        transport.elapsed += time.perf_counter() - started
+        transport.contents.append(response.content)
+
+        return response
+
+    # get / post / patch вызывают send_request через self, поэтому достаточно подменить его у экземпляра
+    acc.request.send_request = timed
+
+    return transport
+
+
+def _uuid(i: int) -> str:
+    return str(uuid.UUID(int=i + 1))
+
+
+_CHAT_ID = _uuid(0)
+
+# метод Account -> вызов (аккаунт, лот для create_lot / save_lot, номер вызова)
+# send_typing не замеряется (после запроса ждёт 4 секунды), withdraw - тоже (выводит средства)
+_CALLS: dict[str, Callable[[Account, LotFields, int], Any]] = {
+    "get_info": lambda acc, lot, i: acc.get_info(),
+    "get_settings": lambda acc, lot, i: acc.get_settings(),
+    "get_sales": lambda acc, lot, i: acc.get_sales(0, 50),
+    "get_reviews": lambda acc, lot, i: acc.get_reviews(0, 50),
+    "get_transactions": lambda acc, lot, i: acc.get_transactions(0, 50),
+    "get_chats": lambda acc, lot, i: acc.get_chats(0, 50),
+    "get_chat": lambda acc, lot, i: acc.get_chat(_uuid(i), 50),
+    "get_order": lambda acc, lot, i: acc.get_order(_uuid(i)),
+    "get_review": lambda acc, lot, i: acc.get_review(_uuid(i)),
+    "get_category_lots": lambda acc, lot, i: acc.get_category_lots(2, 0, 50),
+    "get_my_category_lots": lambda acc, lot, i: acc.get_my_category_lots(
+        2, 0, 50
+    ),
+    "get_lot_fields": lambda acc, lot, i: acc.get_lot_fields(i + 1),
+    "get_black_list": lambda acc, lot, i: acc.get_black_list(),
+    "get_user": lambda acc, lot, i: acc.get_user(i + 1),
+    "get_usdt_rub_exchange_rate": lambda acc, lot, i: (
+        acc.get_usdt_rub_exchange_rate()
+    ),
+    "get_usdt_ltc_exchange_rate": lambda acc, lot, i: (
+        acc.get_usdt_ltc_exchange_rate()
+    ),
+    "create_lot": lambda acc, lot, i: acc.create_lot(lot),
+    "save_lot": lambda acc, lot, i: acc.save_lot(lot),
+    "delete_lot": lambda acc, lot, i: acc.delete_lot(i + 1),
+    "send_message": lambda acc, lot, i: acc.send_message(
+        _CHAT_ID, f"bench {i}", False
+    ),
+    "send_image": lambda acc, lot, i: acc.send_image(
+        _CHAT_ID, b"\x89PNG", False
+    ),
+    "read_chat": lambda acc, lot, i: acc.read_chat(_CHAT_ID),
+    "send_review": lambda acc, lot, i: acc.send_review(_uuid(i), "bench"),
+    "edit_review": lambda acc, lot, i: acc.edit_review(_uuid(i), "bench"),
+    "refund": lambda acc, lot, i: acc.refund(_uuid(i)),
+    "block": lambda acc, lot, i: acc.block(i + 1),
+    "unblock": lambda acc, lot, i: acc.unblock(i + 1),
+    "save_settings": lambda acc, lot, i: acc.save_settings(True),
+}
+
+HTTP_METHODS: tuple[str, ...] = tuple(_CALLS)
+
+
+def _call(
+    func: Callable[[int], Any],
+    i: int,
+    transport: _Transport,
+    stages: StageTimer,
+) -> None:
+    transport.elapsed = 0.0
+    transport.contents = []
+
+    started = time.perf_counter()
+    func(i)
+    total = time.perf_counter() - started
+
+    # сколько из разбора ответа приходится на JSON, оценивается повторным json.loads тел ответов (вне замера)
+    decoding = time.perf_counter()
+
+    for content in transport.contents:
+        if content:
+            json.loads(content)
+
+    decoding = time.perf_counter() - decoding
+
+    stages.record("total", total)
+    stages.record("transport", transport.elapsed)
+    stages.record("json", decoding)
+    stages.record("pydantic", max(total - transport.elapsed - decoding, 0.0))
+
+
+def _bench_method(
+    func: Callable[[int], Any], requests: int, transport: _Transport
+) -> dict[str, Any]:
+    stages = StageTimer()
+    func(0)
+
+    started = time.perf_counter()
+
+    for i in range(requests):
+        _call(func, i, transport, stages)
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "elapsed": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+        "stages": stages.snapshot(),
+    }
+
+
+def _bench_concurrency(
+    func: Callable[[int], Any],
+    requests: int,
+    concurrency: int,
+    transport: _Transport,
+) -> dict[str, Any]:
+    stages = StageTimer()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        futures = [
+            pool.submit(_call, func, i, transport, stages)
+            for i in range(requests)
+        ]
+
+        for future in futures:
+            future.result()
+
+        elapsed = time.perf_counter() - started
+
+    total = stages.snapshot()["total"]
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+        "p50": total["p50"],
+        "p99": total["p99"],
+    }
+
+
+def _saturation(
+    sweep: list[dict[str, Any]], efficiency: float = 0.75
+) -> int | None:
+    # эффективность - доля от линейного роста относительно первого замера; возвращает последнее кол-во потоков перед её падением ниже порога
+    base = sweep[0]["requests_per_sec"] / sweep[0]["concurrency"]
+
+    for r in sweep:
+        r["efficiency"] = (
+            r["requests_per_sec"] / (base * r["concurrency"]) if base else 0.0
+        )
+
+    for prev, cur in pairwise(sweep):
+        if cur["efficiency"] < efficiency:
+            return prev["concurrency"]
+
+    return None
+
+
+def bench_http(
+    methods: list[str] | None = None,
+    requests: int = 200,
+    concurrency: tuple[int, ...] = DEFAULT_CONCURRENCY,
+    sweep_method: str = "get_order",
+    sweep_requests: int = 1000,
+    latency: float = 0.01,
+    items: int = 100,
+    base_url: str | None = None,
+) -> dict[str, Any]:
+    """
+    Прогоняет методы Account через локальный StarvellServer: запросы в секунду, задержки и на что уходит время вызова (транспорт, JSON, pydantic), а также замер масштабирования StarvellSession по кол-ву потоков
+
+    Время "transport" - это StarvellSession.send_request (ограничитель запросов, requests, чтение ответа), "json" - оценка по json.loads тел ответов, "pydantic" - остаток (разбор ответа и модели). RateLimiter отключён, кэша нет. Сервер работает в том же процессе, поэтому делит с клиентом GIL; для чистых замеров можно передать base_url StarvellServer'а, запущенного в другом процессе
+
+    :param methods: Какие методы замерять (см. HTTP_METHODS), по умолчанию все
+    :param requests: Кол-во вызовов каждого метода (последовательно, без задержки сервера)
+    :param concurrency: Кол-ва потоков для замера масштабирования
+    :param sweep_method: Метод для замера масштабирования
+    :param sweep_requests: Кол-во вызовов на каждое кол-во потоков
+    :param latency: Задержка ответов сервера при замере масштабирования (в секундах)
+    :param items: Сколько элементов сервер отдаёт в списках
+    :param base_url: Адрес уже запущенного StarvellServer (по умолчанию запускается свой)
+
+    :return: Словарь (результаты по методам, результаты по кол-ву потоков, кол-во потоков, после которого рост прекращается)
+
+    :raise ValueError: Если указан неизвестный метод
+    """
+
+    methods = methods or list(HTTP_METHODS)
+
+    for name in [*methods, sweep_method]:
+        if name not in _CALLS:
+            raise ValueError(f"Неизвестный метод: {name}")
+
+    server = None if base_url else StarvellServer(items=items)
+
+    if server is not None:
+        base_url = server.start()
+
+    try:
+        acc = Account(
+            "bench", rate_limiter=RateLimiter(None), base_url=base_url
+        )
+        lot = acc.get_lot_fields(1)
+        transport = _instrument(acc)
+        results = {
+            name: _bench_method(
+                partial(_CALLS[name], acc, lot), requests, transport
+            )
+            for name in methods
+        }
+
+        if server is not None:
+            server.latency = latency
+
+        sweep = [
+            _bench_concurrency(
+                partial(_CALLS[sweep_method], acc, lot),
+                sweep_requests,
+                n,
+                transport,
+            )
+            for n in concurrency
+        ]
+    finally:
+        if server is not None:
+            server.stop()
+
+    return {
+        "methods": results,
+        "sweep_method": sweep_method,
+        "latency": latency if server is not None else None,
+        "sweep": sweep,
+        "saturation": _saturation(sweep) if sweep else None,
+    }
+
+
+def print_http(results: dict[str, Any]) -> None:
+    print(
+        f"{'метод':<27} {'запр/с':>7} {'p50':>8} {'p99':>8} "
+        f"{'transport':>9} {'json':>8} {'pydantic':>8}  (us)"
+    )
+
+    for name, r in results["methods"].items():
+        s = r["stages"]
+        print(
+            f"{name:<27} {r['requests_per_sec']:7.0f} "
+            f"{s['total']['p50'] * 1e6:8.0f} {s['total']['p99'] * 1e6:8.0f} "
+            f"{s['transport']['avg'] * 1e6:9.0f} "
+            f"{s['json']['avg'] * 1e6:8.0f} "
+            f"{s['pydantic']['avg'] * 1e6:8.0f}"
+        )
+
+    latency = results["latency"]
+    print(
+        f"\nМасштабирование {results['sweep_method']}"
+        + (f" (задержка сервера {latency * 1000:g} ms)" if latency else "")
+    )
+
+    for r in results["sweep"]:
+        print(
+            f"потоков: {r['concurrency']:<4} "
+            f"запр/с: {r['requests_per_sec']:7.0f}  "
+            f"эффективность: {r['efficiency'] * 100:4.0f}%  "
+            f"p50: {r['p50'] * 1000:7.2f} ms  "
+            f"p99: {r['p99'] * 1000:7.2f} ms"
+        )
+
+    if results["saturation"] is not None:
+        print(
+            f"Масштабируется почти линейно до {results['saturation']} потоков"
+        )
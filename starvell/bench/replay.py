@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any
+
+from starvell.enums import MessageTypes
+from starvell.events import (
+    AsyncReplaySocket,
+    AsyncRunner,
+    ReplaySocket,
+    Runner,
+    StageTimer,
+    WorkerPool,
+)
+from starvell.testing import OfflineAccount
+
+
+def _add_handlers(runner: Runner | AsyncRunner, handled: list[int]) -> None:
+    def handler(event: Any) -> None:
+        handled[0] += 1
+
+    for message_type in MessageTypes:
+        if message_type in runner.handlers:
+            runner.handlers[message_type].append([handler, None, {}])
+
+
+def _replay_sync(
+    path: str, realtime: bool, speed: float, workers: int
+) -> dict[str, Any]:
+    stages = StageTimer()
+    handled = [0]
+    socket = ReplaySocket(path, realtime, speed, stages)
+    runner = Runner(
+        OfflineAccount(),
+        pool=WorkerPool(workers),
+        lazy_orders=True,
+        socket=socket,
+        stages=stages,
+    )
+    _add_handlers(runner, handled)
+
+    started = time.perf_counter()
+    replay = socket.run()
+    runner.pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "replay": replay,
+        "events": handled[0],
+        "elapsed": elapsed,
+        "stages": stages.snapshot(),
+        "pool": runner.pool.snapshot(),
+    }
+
+
+def _replay_async(
+    path: str, realtime: bool, speed: float, workers: int
+) -> dict[str, Any]:
+    stages = StageTimer()
+    handled = [0]
+    socket = AsyncReplaySocket(path, realtime, speed, stages)
+    runner = AsyncRunner(
+        OfflineAccount(),
+        max_concurrency=workers,
+        lazy_orders=True,
+        socket=socket,
+        stages=stages,
+    )
+    _add_handlers(runner, handled)
+
+    started = time.perf_counter()
+    asyncio.run(runner.run())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "replay": socket.report,
+        "events": handled[0],
+        "elapsed": elapsed,
+        "stages": stages.snapshot(),
+    }
+
+
+def bench_replay(
+    path: str,
+    realtime: bool = False,
+    speed: float = 1.0,
+    workers: int = 8,
+    repeat: int = 3,
+    use_async: bool = False,
+) -> dict[str, Any]:
+    """
+    Прогоняет записанные кадры веб-сокета через Runner (или AsyncRunner) без подключения к Starvell
+
+    На каждый тип события вешается пустой хэндлер, детали заказов не запрашиваются (lazy_orders), поэтому замеряется только обработка событий библиотекой
+
+    :param path: Путь к папке журнала либо к файлу с кадрами (см. read_frames)
+    :param realtime: Соблюдать-ли интервалы между кадрами, как при записи
+    :param speed: Ускорение воспроизведения при realtime
+    :param workers: Кол-во потоков пула (для AsyncRunner - max_concurrency)
+    :param repeat: Кол-во прогонов (берётся лучший, каждый прогон - с новым Runner'ом)
+    :param use_async: Прогонять через AsyncRunner
+
+    :return: Словарь (лучший прогон: кол-во кадров и событий, время, событий в секунду, время этапов)
+    """
+
+    replay = _replay_async if use_async else _replay_sync
+    best = None
+
+    for _ in range(repeat):
+        result = replay(path, realtime, speed, workers)
+
+        if best is None or result["elapsed"] < best["elapsed"]:
+            best = result
+
+    best["events_per_sec"] = (
+        best["events"] / best["elapsed"] if best["elapsed"] else 0.0
+    )
+
+    return best
+
+
+def print_replay(results: dict[str, Any]) -> None:
+    replay = results["replay"]
+    print(
+        f"Кадров: {replay['frames']}  событий: {results['events']}  "
+        f"время: {results['elapsed'] * 1000:.1f} ms  "
+        f"событий/с: {results['events_per_sec']:.0f}  "
+        f"кадров/с: {replay['frames_per_sec']:.0f}"
+    )
+
+    if replay["max_lag"]:
+        print(f"Макс. отставание от записи: {replay['max_lag'] * 1000:.1f} ms")
+
+    print_stages(results["stages"])
+
+
+def print_stages(stages: dict[str, dict[str, Any]]) -> None:
+    for name, s in stages.items():
+        print(
+            f"{name:<9} n={s['count']:<7} "
+            f"avg: {s['avg'] * 1e6:8.1f} us  "
+            f"p50: {s['p50'] * 1e6:8.1f} us  "
+            f"p99: {s['p99'] * 1e6:8.1f} us  "
+            f"max: {s['max'] * 1e6:8.1f} us"
+        )
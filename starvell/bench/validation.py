@@ -0,0 +1,106 @@
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from starvell.testing import make_order_info, make_transaction
+from starvell.types import (
+    OrderInfo,
+    OrderInfoList,
+    TransactionInfo,
+    TransactionInfoList,
+)
+from starvell.utils import (
+    format_directions,
+    format_order_status,
+    format_statuses,
+    format_types,
+)
+
+
+def _legacy_orders(content: bytes) -> list[OrderInfo]:
+    # так get_sales() разбирал ответ раньше: json.loads + правка dict'ов + model_validate на каждый элемент
+    orders = json.loads(content)
+
+    for obj in orders:
+        obj["status"] = format_order_status(obj["status"])
+
+    return [OrderInfo.model_validate(obj) for obj in orders]
+
+
+def _legacy_transactions(content: bytes) -> list[TransactionInfo]:
+    transactions = json.loads(content)
+
+    for t in transactions:
+        t["direction"] = format_directions(t["direction"])
+        t["type"] = format_types(t["type"])
+        t["status"] = format_statuses(t["status"])
+
+    return [TransactionInfo.model_validate(t) for t in transactions]
+
+
+def _best_of(
+    func: Callable[[bytes], Any], content: bytes, repeat: int
+) -> float:
+    best = float("inf")
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - started)
+
+    return best
+
+
+def bench_validation(items: int = 10000, repeat: int = 5) -> dict[str, Any]:
+    """
+    Сравнивает разбор списков продаж и транзакций поэлементным model_validate и TypeAdapter.validate_json
+
+    :param items: Кол-во элементов в ответе
+    :param repeat: Кол-во прогонов (берётся лучшее время)
+
+    :return: Словарь (время в секундах и ускорение для каждого списка)
+    """
+
+    payloads = {
+        "sales": (
+            json.dumps([make_order_info(i) for i in range(items)]).encode(),
+            _legacy_orders,
+            OrderInfoList.validate_json,
+        ),
+        "transactions": (
+            json.dumps([make_transaction(i) for i in range(items)]).encode(),
+            _legacy_transactions,
+            TransactionInfoList.validate_json,
+        ),
+    }
+    results: dict[str, Any] = {"items": items}
+
+    for name, (content, legacy, adapter) in payloads.items():
+        if legacy(content) != adapter(content):
+            raise AssertionError(f"{name}: результаты разбора не совпадают")
+
+        legacy_time = _best_of(legacy, content, repeat)
+        adapter_time = _best_of(adapter, content, repeat)
+
+        results[name] = {
+            "bytes": len(content),
+            "model_validate": legacy_time,
+            "validate_json": adapter_time,
+            "speedup": legacy_time / adapter_time,
+        }
+
+    return results
+
+
+def print_validation(results: dict[str, Any]) -> None:
+    print(f"Элементов в ответе: {results['items']}")
+
+    for name in ("sales", "transactions"):
+        r = results[name]
+        print(
+            f"{name:<13} {r['bytes'] / 1024 / 1024:6.1f} MB  "
+            f"model_validate: {r['model_validate'] * 1000:8.1f} ms  "
+            f"validate_json: {r['validate_json'] * 1000:8.1f} ms  "
+            f"x{r['speedup']:.2f}"
+        )
@@ -0,0 +1,13 @@
+from .cache import DEFAULT_TTLS, BaseCache, TTLCache, cache_key, cached
+from .singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "AsyncSingleFlight",
+    "BaseCache",
+    "SingleFlight",
+    "TTLCache",
+    "cache_key",
+    "cached",
+    "request_key",
+]
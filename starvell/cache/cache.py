@@ -0,0 +1,225 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+DEFAULT_TTLS: dict[str, float] = {
+    "get_user": 60,
+    "get_order": 30,
+    "get_review": 30,
+    "get_lot_fields": 30,
+    "get_black_list": 60,
+    "get_settings": 300,
+    "get_usdt_rub_exchange_rate": 60,
+    "get_usdt_ltc_exchange_rate": 60,
+}
+"""Время жизни (в секундах) закэшированных ответов методов Account по умолчанию"""
+
+
+class BaseCache(ABC):
+    """
+    Базовый класс кэша ответов Account, наследуйте его, чтобы подключить своё хранилище (например Redis).
+
+    Значения группируются по пространствам имён - названиям методов Account (get_order, get_user, ...).
+    """
+
+    ttls: dict[str, float]
+
+    @abstractmethod
+    def get(self, namespace: str, key: Hashable) -> tuple[bool, Any]:
+        """
+        :return: (True, значение), если значение есть в кэше, иначе (False, None)
+        """
+
+    @abstractmethod
+    def set(self, namespace: str, key: Hashable, value: Any) -> None: ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str, key: Hashable | None = None) -> None:
+        """
+        Удаляет значение из кэша (если key не указан - все значения пространства имён)
+        """
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class TTLCache(BaseCache):
+    def __init__(
+        self, maxsize: int = 2048, ttls: dict[str, float] | None = None
+    ) -> None:
+        """
+        Потокобезопасный LRU-кэш в памяти, с временем жизни значений для каждого пространства имён
+
+        Значения хранятся и отдаются копиями (copy.deepcopy), поэтому изменение полученной модели не меняет ни кэш, ни ответы другим вызывающим
+
+        :param maxsize: Максимальное кол-во значений в кэше, при превышении вытесняются давно не использованные
+        :param ttls: Время жизни значений (в секундах) для методов Account, дополняет DEFAULT_TTLS (0 - не кэшировать метод)
+        """
+
+        self.maxsize: int = maxsize
+        self.ttls: dict[str, float] = {**DEFAULT_TTLS, **(ttls or {})}
+
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+        self.evictions: int = 0
+
+        self.__data: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, namespace: str, key: Hashable) -> tuple[bool, Any]:
+        with self.__lock:
+            item = self.__data.get((namespace, key))
+
+            if item is not None and item[0] > time.monotonic():
+                self.__data.move_to_end((namespace, key))
+                self.hits[namespace] = self.hits.get(namespace, 0) + 1
+                value = item[1]
+            else:
+                if item is not None:
+                    del self.__data[(namespace, key)]
+
+                self.misses[namespace] = self.misses.get(namespace, 0) + 1
+                return False, None
+
+        return True, copy.deepcopy(value)
+
+    def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        ttl = self.ttls.get(namespace)
+
+        if not ttl:
+            return
+
+        value = copy.deepcopy(value)
+
+        with self.__lock:
+            self.__data[(namespace, key)] = (time.monotonic() + ttl, value)
+            self.__data.move_to_end((namespace, key))
+
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str, key: Hashable | None = None) -> None:
+        with self.__lock:
+            if key is not None:
+                self.__data.pop((namespace, key), None)
+                return
+
+            for k in [k for k in self.__data if k[0] == namespace]:
+                del self.__data[k]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика кэша
+
+        :return: Словарь (размер, попадания и промахи по методам, кол-во вытеснений)
+        """
+
+        with self.__lock:
+            return {
+                "size": len(self.__data),
+                "maxsize": self.maxsize,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "evictions": self.evictions,
+            }
+
+
+def cache_key(*args: Any, **kwargs: Any) -> Hashable:
+    """
+    Строит ключ кэша из аргументов метода (UUID и int приводятся к строке, чтобы get_order(uuid) и get_order(str) совпадали)
+
+    Для методов с @cached используйте ``Account.get_order.cache_key(acc, ...)``: он приводит именованные аргументы и значения по умолчанию к тому же виду, что и при вызове метода
+
+    :return: Ключ (tuple)
+    """
+
+    return tuple(str(a) for a in args) + tuple(
+        (k, str(v)) for k, v in sorted(kwargs.items())
+    )
+
+
+def _call_key(
+    signature: inspect.Signature, self: Any, args: tuple, kwargs: dict
+) -> Hashable:
+    # get_order(x), get_order(order_id=x) и вызов со значениями по умолчанию дают один ключ
+    bound = signature.bind(self, *args, **kwargs)
+    bound.apply_defaults()
+
+    return cache_key(*list(bound.arguments.values())[1:])
+
+
+def cached(namespace: str) -> Callable:
+    """
+    Декоратор для методов Account: кэширует результат в ``self.cache`` (если кэш подключен), ключ - переданные аргументы
+
+    Вызов с ``use_cache=False`` всегда делает запрос и обновляет значение в кэше. Ключ строится по аргументам, приведённым к позиционным (со значениями по умолчанию), он же доступен как ``метод.cache_key(self, *args, **kwargs)``
+
+    :param namespace: Пространство имён (название метода)
+
+    :return: Декоратор
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def key_of(self, *args, **kwargs) -> Hashable:
+            return _call_key(signature, self, args, kwargs)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(
+                self, *args, use_cache: bool = True, **kwargs
+            ) -> Any:
+                cache: BaseCache | None = getattr(self, "cache", None)
+
+                if cache is None or not cache.ttls.get(namespace):
+                    return await func(self, *args, **kwargs)
+
+                key = key_of(self, *args, **kwargs)
+
+                if use_cache:
+                    found, value = cache.get(namespace, key)
+                    if found:
+                        return value
+
+                value = await func(self, *args, **kwargs)
+                cache.set(namespace, key, value)
+                return value
+
+            async_wrapper.cache_key = key_of
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, use_cache: bool = True, **kwargs) -> Any:
+            cache: BaseCache | None = getattr(self, "cache", None)
+
+            if cache is None or not cache.ttls.get(namespace):
+                return func(self, *args, **kwargs)
+
+            key = key_of(self, *args, **kwargs)
+
+            if use_cache:
+                found, value = cache.get(namespace, key)
+                if found:
+                    return value
+
+            value = func(self, *args, **kwargs)
+            cache.set(namespace, key, value)
+            return value
+
+        wrapper.cache_key = key_of
+        return wrapper
+
+    return decorator
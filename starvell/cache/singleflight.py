@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def request_key(
+    method: str,
+    url: str,
+    body: dict[str, Any] | None = None,
+    params: dict[str, Any] | None = None,
+    *extra: Hashable,
+) -> tuple:
+    """
+    Строит ключ запроса, одинаковый для идентичных запросов (порядок ключей в body/params не важен)
+
+    :param method: Метод запроса
+    :param url: Ссылка
+    :param body: JSON к запросу
+    :param params: Параметры к запросу
+    :param extra: Дополнительные части ключа
+
+    :return: Ключ (tuple)
+    """
+
+    return (
+        method.lower(),
+        url,
+        json.dumps(body, sort_keys=True, default=str) if body else None,
+        json.dumps(params, sort_keys=True, default=str) if params else None,
+        *extra,
+    )
+
+
+class _Call:
+    __slots__ = ("error", "event", "result")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class _Abandoned(Exception):
+    """
+    Первый вызов отменён: ожидающие повторяют вызов сами
+    """
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Объединяет одновременные идентичные вызовы: пока выполняется первый вызов с ключом, остальные ждут и получают его результат (или исключение)
+        """
+
+        self.calls_count: int = 0
+        self.shared_count: int = 0
+
+        self.__calls: dict[Hashable, _Call] = {}
+        self.__lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Выполняет func, либо присоединяется к уже выполняющемуся вызову с тем же ключом
+
+        :param key: Ключ вызова
+        :param func: Функция без аргументов
+
+        :return: Результат func
+        """
+
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self.__calls[key] = _Call()
+                self.calls_count += 1
+            else:
+                self.shared_count += 1
+
+        if not leader:
+            call.event.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    def __init__(self) -> None:
+        """
+        Асинхронная версия SingleFlight (в пределах одного event loop)
+        """
+
+        self.calls_count: int = 0
+        self.shared_count: int = 0
+
+        self.__calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет func, либо присоединяется к уже выполняющемуся вызову с тем же ключом. Если первый вызов отменён, ожидающие не отменяются: один из них повторяет вызов
+
+        :param key: Ключ вызова
+        :param func: Корутинная функция без аргументов
+
+        :return: Результат func
+        """
+
+        # если первый вызов отменён, один из ожидающих становится новым первым
+        while (future := self.__calls.get(key)) is not None:
+            self.shared_count += 1
+
+            try:
+                return await asyncio.shield(future)
+            except _Abandoned:
+                continue
+
+        future = self.__calls[key] = asyncio.get_running_loop().create_future()
+        self.calls_count += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # отмена касается только этого вызова, ожидающие не отменяются
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # исключение забирают ожидающие, если их нет - помечаем его полученным
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.__calls[key]
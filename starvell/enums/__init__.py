@@ -1,7 +1,11 @@
 from .enums import (
+    EngineIOPacketTypes,
     MessageTypes,
     OrderStatuses,
+    OverflowPolicies,
     PaymentTypes,
+    RequestPriority,
+    SocketIOPacketTypes,
     SocketTypes,
     TransactionDirections,
     TransactionStatuses,
@@ -9,9 +13,13 @@ from .enums import (
 )
 
 __all__ = [
+    "EngineIOPacketTypes",
     "MessageTypes",
     "OrderStatuses",
+    "OverflowPolicies",
     "PaymentTypes",
+    "RequestPriority",
+    "SocketIOPacketTypes",
     "SocketTypes",
     "TransactionDirections",
     "TransactionStatuses",
@@ -126,3 +126,73 @@ class SocketTypes(Enum):
     """Запуск веб-сокета"""
     NEW_MESSAGE = 1
     """Новое сообщение в веб-сокете"""
+    PACKET = 2
+    """Разобранный пакет Socket.IO (событие, пространство имён, данные)"""
+
+
+class RequestPriority(Enum):
+    """
+    В данном классе перечислены все классы приоритета исходящих запросов.
+    """
+
+    CRITICAL = 0
+    """Критичные запросы (выдача товара, возврат средств)"""
+    INTERACTIVE = 1
+    """Запросы в ответ на действия пользователя"""
+    BACKGROUND = 2
+    """Фоновые запросы (сканирование продаж, лотов и т.д.)"""
+
+
+class OverflowPolicies(Enum):
+    """
+    В данном классе перечислены все варианты поведения пула хэндлеров при переполнении очереди.
+    """
+
+    BLOCK = 0
+    """Ждать, пока в очереди не освободится место (submit(block=False) - задача ждёт в буфере, не останавливая вызывающий поток)"""
+    DROP_OLDEST = 1
+    """Выкинуть самое старое событие из очереди"""
+    REJECT = 2
+    """Отклонить новое событие (QueueFullError)"""
+
+
+class EngineIOPacketTypes(Enum):
+    """
+    В данном классе перечислены все типы пакетов Engine.IO (транспорт веб-сокета Starvell).
+    """
+
+    OPEN = 0
+    """Рукопожатие (sid, pingInterval, pingTimeout)"""
+    CLOSE = 1
+    """Закрытие соединения"""
+    PING = 2
+    """Ping от сервера"""
+    PONG = 3
+    """Ответ на ping"""
+    MESSAGE = 4
+    """Пакет Socket.IO"""
+    UPGRADE = 5
+    """Смена транспорта"""
+    NOOP = 6
+    """Пустой пакет"""
+
+
+class SocketIOPacketTypes(Enum):
+    """
+    В данном классе перечислены все типы пакетов Socket.IO.
+    """
+
+    CONNECT = 0
+    """Подключение к пространству имён"""
+    DISCONNECT = 1
+    """Отключение от пространства имён"""
+    EVENT = 2
+    """Событие"""
+    ACK = 3
+    """Подтверждение события"""
+    CONNECT_ERROR = 4
+    """Ошибка подключения к пространству имён"""
+    BINARY_EVENT = 5
+    """Событие с бинарными данными"""
+    BINARY_ACK = 6
+    """Подтверждение с бинарными данными"""
@@ -5,6 +5,8 @@ from .exceptions import (
     EditReviewError,
     GetReviewError,
     HandlerError,
+    ProtocolError,
+    QueueFullError,
     ReadChatError,
     RefundError,
     RequestFailedError,
@@ -27,6 +29,8 @@ __all__ = [
     "EditReviewError",
     "GetReviewError",
     "HandlerError",
+    "ProtocolError",
+    "QueueFullError",
     "ReadChatError",
     "RefundError",
     "RequestFailedError",
@@ -163,3 +163,15 @@ class SendTypingError(StarvellAPIError):
     """
     Возбуждается при какой-либо ошибке отправки/остановки "Печатает..."
     """
+
+
+class QueueFullError(StarvellAPIError):
+    """
+    Возбуждается, если очередь пула хэндлеров переполнена (OverflowPolicies.REJECT)
+    """
+
+
+class ProtocolError(StarvellAPIError):
+    """
+    Возбуждается, если кадр веб-сокета не является корректным пакетом Engine.IO / Socket.IO
+    """
@@ -1,3 +1,34 @@
+from .async_events import AsyncRunner
+from .base import chat_partition_key, order_partition_key
+from .dedup import BaseDeduplicator, BloomDeduplicator, LRUDeduplicator
+from .enrichment import OrderDetails, OrderEnricher
 from .events import Runner
+from .journal import Journal, JournalFrame
+from .pool import WorkerPool
+from .profiling import HandlerProfiler
+from .recovery import ChatCursor, Gap, GapRecovery
+from .replay import AsyncReplaySocket, ReplaySocket, read_frames
+from .stages import StageTimer
 
-__all__ = ["Runner"]
+__all__ = [
+    "AsyncReplaySocket",
+    "AsyncRunner",
+    "BaseDeduplicator",
+    "BloomDeduplicator",
+    "ChatCursor",
+    "Gap",
+    "GapRecovery",
+    "HandlerProfiler",
+    "Journal",
+    "JournalFrame",
+    "LRUDeduplicator",
+    "OrderDetails",
+    "OrderEnricher",
+    "ReplaySocket",
+    "Runner",
+    "StageTimer",
+    "WorkerPool",
+    "chat_partition_key",
+    "order_partition_key",
+    "read_frames",
+]
@@ -0,0 +1,580 @@
+import asyncio
+import inspect
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from aiohttp import ClientError, ClientWebSocketResponse
+
+from starvell.async_account import AsyncAccount
+from starvell.async_socket import AsyncSocket
+from starvell.enums import EngineIOPacketTypes, OverflowPolicies, SocketTypes
+from starvell.errors import HandlerError, QueueFullError, RequestFailedError
+from starvell.protocol import Packet
+from starvell.tracing import Span, Tracer
+
+from .base import BaseRunner, chat_partition_key
+from .dedup import BaseDeduplicator
+from .enrichment import OrderEnricher
+from .journal import Journal
+from .profiling import HandlerProfiler
+from .recovery import Gap, GapRecovery
+from .stages import StageTimer
+
+
+class AsyncRunner(BaseRunner):
+    _request_errors = (
+        ClientError,
+        RequestFailedError,
+        ValueError,
+        asyncio.TimeoutError,
+    )
+
+    def __init__(
+        self,
+        acc: AsyncAccount,
+        always_online: bool = True,
+        max_concurrency: int = 1000,
+        queue_size: int = 1000,
+        overflow: OverflowPolicies = OverflowPolicies.BLOCK,
+        spill_size: int = 10000,
+        enricher: OrderEnricher | None = None,
+        lazy_orders: bool = False,
+        partition_key: Callable[[dict[str, Any]], Hashable] | None = (
+            chat_partition_key
+        ),
+        recovery: GapRecovery | None = None,
+        dedup: BaseDeduplicator | None = None,
+        journal: Journal | None = None,
+        socket: AsyncSocket | None = None,
+        stages: StageTimer | None = None,
+        tracer: Tracer | None = None,
+        profiler: HandlerProfiler | None = None,
+    ):
+        """
+        Асинхронная версия Runner: веб-сокет и хэндлеры работают в одном event loop'е
+
+        Хэндлеры и фильтры могут быть как ``async def``, так и обычными функциями (обычные хэндлеры выполняются в потоке через asyncio.to_thread)
+
+        :param acc: Экземпляр класса AsyncAccount
+        :param always_online: Поддерживать-ли постоянный онлайн? (True - при использовании API, аккаунт всегда будет онлайн)
+        :param max_concurrency: Максимальное кол-во одновременно выполняемых хэндлеров
+        :param queue_size: Максимальное кол-во событий в обработке (ожидающих своей очереди и обрабатываемых)
+        :param overflow: Что делать при переполнении (как у WorkerPool): BLOCK - событие ждёт в буфере spill_size, не останавливая чтение веб-сокета, DROP_OLDEST - выкинуть самое старое событие, обработка которого ещё не началась (если таких нет - новое), REJECT - отклонить новое (QueueFullError)
+        :param spill_size: Сколько событий может ждать места при политике OverflowPolicies.BLOCK
+        :param enricher: Дополняет уведомления о заказах ценами и ID лота в отдельных задачах (по умолчанию OrderEnricher(acc))
+        :param lazy_orders: Не дожидаться деталей заказа - хэндлеры сразу получают OrderEvent без цен, а полный заказ запрашивается через ``await event.get_order()``
+        :param partition_key: Функция, возвращающая ключ очерёдности события: события с одним ключом обрабатываются строго по очереди, с разными - параллельно (по умолчанию - ID чата, order_partition_key - ID заказа, None - без очерёдности)
+        :param recovery: Восстановление событий, пропущенных во время обрыва веб-сокета (по умолчанию GapRecovery())
+        :param dedup: Индекс уже обработанных ID сообщений, повторно доставленные сообщения (после переподключения и восстановления) хэндлерам не передаются (по умолчанию LRUDeduplicator() - последние 10000 ID, в памяти)
+        :param journal: Журнал кадров веб-сокета: каждый кадр пишется в него до обработки, а кадры, обработка которых не завершилась в прошлый запуск, обрабатываются повторно в начале run() (по умолчанию не ведётся)
+        :param socket: Источник кадров вместо веб-сокета Starvell (например AsyncReplaySocket - воспроизведение записанных кадров), по умолчанию AsyncSocket(acc.request, always_online)
+        :param stages: Замер времени этапов обработки событий (разбор, очередь, детали заказа, сборка события, хэндлеры), по умолчанию не ведётся
+        :param tracer: Трассировка событий: спан на каждый этап (кадр веб-сокета, разбор, очередь, детали заказа, сборка события, каждый хэндлер, HTTP запросы из хэндлеров), ID трассировки доступен через ``event.trace_id`` (по умолчанию tracer аккаунта, если он задан)
+        :param profiler: Замер хэндлеров: время выполнения, процессорное время и исключения по каждому хэндлеру, вывод медленных хэндлеров со стеком и профилирование обработки событий по запросу (по умолчанию HandlerProfiler() - бюджет хэндлера 1 секунда)
+        """
+
+        super().__init__(
+            acc,
+            enricher,
+            lazy_orders,
+            partition_key,
+            recovery,
+            dedup,
+            journal,
+            stages,
+            tracer,
+            profiler,
+        )
+
+        self.acc: AsyncAccount = acc
+        self.max_concurrency: int = max_concurrency
+        self.queue_size: int = queue_size
+        self.overflow: OverflowPolicies = overflow
+        self.spill_size: int = spill_size
+
+        self.dropped: int = 0
+        self.rejected: int = 0
+        self.spilled: int = 0
+        self.max_queue_depth: int = 0
+
+        self.socket: AsyncSocket = socket or AsyncSocket(
+            acc.request, always_online, tracer=self.tracer
+        )
+
+        if self.socket.tracer is None:
+            self.socket.tracer = self.tracer
+        self.socket.handlers[SocketTypes.OPEN].append(self.on_open_process)
+        self.socket.handlers[SocketTypes.NEW_MESSAGE].append(
+            self.on_new_message
+        )
+        self.socket.handlers[SocketTypes.PACKET].append(self.on_packet)
+
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+        self.__tasks: set[asyncio.Task] = set()
+        # последняя задача каждого ключа очерёдности, следующее событие ключа ждёт её завершения
+        self.__partitions: dict[Hashable, asyncio.Task] = {}
+        # задачи событий, обработка которых не завершилась
+        self.__events: set[asyncio.Task] = set()
+        # задачи событий, ждущие предыдущее событие своего ключа: задача -> [корутина, ожидаемая задача, ключ, событие, номер кадра, трассировка]
+        self.__waiting: OrderedDict[asyncio.Task, list] = OrderedDict()
+        # выкинутая задача -> задача, которую она ждала (её ждёт следующее событие того же ключа)
+        self.__skipped: dict[asyncio.Task, asyncio.Task | None] = {}
+        # события, ждущие места при политике BLOCK, в порядке получения
+        self.__spill: deque[tuple] = deque()
+        # номер в журнале кадра, который сейчас обрабатывается
+        self.__frame_seq: int | None = None
+
+    async def run(self) -> None:
+        """
+        Запускает веб-сокет и обрабатывает события, пока задача не будет отменена
+
+        Пример: ``await runner.run()`` либо ``asyncio.create_task(runner.run())``
+
+        :return: None
+        """
+
+        if self.journal is not None:
+            await self.replay_journal()
+
+        try:
+            await self.socket.run()
+
+            # источник кадров закончился (воспроизведение записи) - дожидаемся обработки событий
+            while self.__tasks:
+                await asyncio.wait(list(self.__tasks))
+        finally:
+            for task in list(self.__tasks):
+                task.cancel()
+
+    async def handling(
+        self, handler: list[Callable[..., Any] | dict], *args
+    ) -> None:
+        """
+        Проверяет фильтры хэндлера и запускает его с переданными аргументами в отдельной задаче asyncio
+
+        :param handler: Хэндлер который будет обрабатывать
+        :param args: Аргументы к этому хэндлеру
+
+        :return: None
+        """
+
+        if await self.check_filters(handler, *args):
+            self.__spawn(self.__call(handler[0], *args))
+
+    @staticmethod
+    async def check_filters(
+        handler: list[Callable[..., Any] | dict], *args
+    ) -> bool:
+        """
+        Проверяет фильтры хэндлера (фильтры могут быть корутинами)
+
+        :param handler: Хэндлер
+        :param args: Аргументы к этому хэндлеру
+
+        :return: True, если хэндлер нужно вызвать
+        """
+
+        filters = handler[1]
+
+        if filters is None:
+            return True
+        if not isinstance(filters, (list, tuple, set)):
+            filters = [filters]
+
+        for handler_filter in filters:
+            result = handler_filter(*args, **handler[2])
+
+            if inspect.isawaitable(result):
+                result = await result
+            if not result:
+                return False
+
+        return True
+
+    async def msg_process(
+        self,
+        msg: str | Packet | dict[str, Any],
+        _: ClientWebSocketResponse,
+        seq: int | None = None,
+    ) -> bool:
+        """
+        Вызывается при новом сообщении в веб-сокете, и в случае если это новое событие на Starvell, определяет событие, и вызывает все привязанные к этому событию хэндлеры (функции)
+
+        Запросы к Starvell здесь не выполняются: детали заказа запрашиваются в отдельной задаче, а событие обрабатывается в своей задаче, после предыдущего события с тем же ключом очерёдности (partition_key)
+
+        :param _: Веб-сокет aiohttp
+        :param msg: Сообщение с веб-сокета, разобранный пакет либо данные сообщения (при восстановлении после обрыва)
+        :param seq: Номер кадра в журнале, он отмечается обработанным после вызова хэндлеров
+
+        :return: True, если событие поставлено в обработку
+        """
+
+        return self._receive(msg, seq)
+
+    def _fetch_details(self, order_id: str) -> asyncio.Future:
+        return self.enricher.fetch_async(order_id)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Метрики очереди событий
+
+        :return: Словарь (кол-во событий в обработке, кол-во выкинутых / отклонённых / отложенных событий)
+        """
+
+        return {
+            "queue_depth": len(self.__events),
+            "max_queue_depth": self.max_queue_depth,
+            "partitions": len(self.__partitions),
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "spilled": self.spilled,
+            "spill_depth": len(self.__spill),
+        }
+
+    def _submit(
+        self,
+        dict_with_data: dict[str, Any],
+        details: asyncio.Future | None,
+        seq: int | None,
+        timings: list[float] | None,
+        trace: tuple[Span, Span] | None,
+        key: Hashable,
+    ) -> bool:
+        event = (dict_with_data, details, seq, timings, trace, key)
+
+        if self.overflow == OverflowPolicies.BLOCK and (
+            len(self.__events) >= self.queue_size or self.__spill
+        ):
+            if len(self.__spill) >= self.spill_size:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Очередь событий переполнена ({self.queue_size}), "
+                    f"буфер ожидания тоже ({self.spill_size})"
+                )
+
+            self.__spill.append(event)
+            self.spilled += 1
+
+            return True
+
+        if len(self.__events) >= self.queue_size:
+            if self.overflow == OverflowPolicies.REJECT:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Очередь событий переполнена ({self.queue_size})"
+                )
+
+            if not self.__drop_oldest():
+                self.dropped += 1
+                return False
+
+        self.__start(*event)
+
+        return True
+
+    async def dispatch(
+        self,
+        dict_with_data: dict[str, Any],
+        details: asyncio.Future | None = None,
+        seq: int | None = None,
+        timings: list[float] | None = None,
+        trace: tuple[Span, Span] | None = None,
+    ) -> None:
+        """
+        Дожидается деталей заказа (если нужны), собирает событие и по очереди вызывает все привязанные к нему хэндлеры
+
+        :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+        :param details: Future с деталями заказа от OrderEnricher'а
+        :param seq: Номер кадра в журнале
+        :param timings: Время получения события и окончания предыдущего этапа (time.perf_counter), для замера этапов
+        :param trace: Спан события и спан ожидания в очереди (если событие трассируется)
+
+        :return: None
+        """
+
+        span = self._dequeue(trace)
+
+        try:
+            with self._activate(span), self.profiler.dispatching():
+                await self.__dispatch(dict_with_data, details, timings, span)
+        finally:
+            self._complete(dict_with_data, seq, span)
+
+    async def __dispatch(
+        self,
+        dict_with_data: dict[str, Any],
+        details: asyncio.Future | None,
+        timings: list[float] | None,
+        span: Span | None,
+    ) -> None:
+        self._lap(timings, "queue")
+
+        if details is not None:
+            with self._trace("runner.details"):
+                await asyncio.wait([details])
+
+        data = self._build(dict_with_data, details, timings, span)
+
+        if data is None:
+            return
+
+        for handler in self.handlers[dict_with_data["type"]]:
+            try:
+                with self._trace(f"handler {handler[0].__name__}"):
+                    if await self.check_filters(handler, data):
+                        await self.__call(handler[0], data)
+            # ошибка фильтра либо хэндлера не мешает остальным хэндлерам
+            except Exception as e:  # noqa: BLE001
+                print(f"Ошибка в хэндлере {handler[0].__name__}: {e}")
+
+        self._lap(timings, "handlers", total=True)
+
+    async def recover(self, gap: Gap) -> None:
+        """
+        Восстанавливает события, пропущенные во время обрыва веб-сокета: по get_chats() находит чаты, последнее сообщение которых новее курсора чата (а не по счётчику непрочитанных - см. GapRecovery.affected_chats), запрашивает историю только этих чатов (до курсора, но не больше max_history_limit сообщений) и прогоняет пропущенные сообщения через msg_process (повторы отсеиваются)
+
+        Вызывается после переподключения в отдельной задаче asyncio, новые события затронутых чатов до постановки их пропущенных сообщений откладываются
+
+        :param gap: Состояние на момент переподключения (GapRecovery.begin())
+
+        :return: None
+        """
+
+        steps = self._recover(gap)
+
+        try:
+            call = next(steps)
+
+            while True:
+                try:
+                    result = await getattr(self.acc, call[0])(*call[1])
+                except self._request_errors as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(result)
+        except StopIteration:
+            pass
+        finally:
+            steps.close()
+
+    async def on_open_process(self, ws: ClientWebSocketResponse) -> None:
+        """
+        Вызывается при открытии веб-сокета, и вызывает все привязанные к этому событию хэндлеры
+
+        :param ws: Веб-сокет aiohttp
+
+        :return: None
+        """
+
+        for func in self.handlers[SocketTypes.OPEN]:
+            try:
+                await self.handling(func, ws)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+    async def on_new_message(
+        self, ws: ClientWebSocketResponse, msg: str
+    ) -> None:
+        """
+        Вызывается при новом сообщении в веб-сокете, и вызывает все привязанные к этому событию хэндлеры (Не путать с новым сообщением на Starvell)
+
+        :param ws: Веб-сокет aiohttp
+        :param msg: Сообщение веб-сокета (Строка)
+
+        :return: None
+        """
+
+        if self.journal is not None:
+            # предыдущий кадр не разобрался как пакет - обрабатывать нечего
+            self._commit_frame(self.__take_frame())
+            self.__frame_seq = self.journal.append(msg)
+
+        for func in self.handlers[SocketTypes.NEW_MESSAGE]:
+            try:
+                await self.handling(func, msg, ws)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+    async def on_packet(
+        self, ws: ClientWebSocketResponse, packet: Packet
+    ) -> None:
+        """
+        Вызывается для каждого разобранного пакета веб-сокета: события message_created передаются в msg_process, остальные события - хэндлерам по названию события (add_event_handler)
+
+        :param ws: Веб-сокет aiohttp
+        :param packet: Разобранный пакет
+
+        :return: None
+        """
+
+        seq = self.__take_frame()
+        dispatched = False
+
+        try:
+            dispatched = await self.__route(ws, packet, seq)
+        finally:
+            if not dispatched:
+                self._commit_frame(seq)
+
+    async def replay_journal(self) -> int:
+        """
+        Повторно обрабатывает кадры из журнала, обработка которых не завершилась в прошлый запуск (например из-за падения программы)
+
+        Вызывается в начале run(), до подключения к веб-сокету. Повторно вызываются хэндлеры событий Starvell (message_created), остальные кадры просто отмечаются обработанными
+
+        :return: Кол-во кадров, поставленных в обработку
+        """
+
+        return self._replay(self.journal.uncommitted())
+
+    def __take_frame(self) -> int | None:
+        seq, self.__frame_seq = self.__frame_seq, None
+
+        return seq
+
+    async def __route(
+        self, ws: ClientWebSocketResponse, packet: Packet, seq: int | None
+    ) -> bool:
+        dispatched = False
+
+        if packet.event == "message_created" and packet.namespace == "/chats":
+            dispatched = await self.msg_process(packet, ws, seq)
+        elif (
+            packet.eio_type == EngineIOPacketTypes.OPEN
+            and self.socket.heartbeat.reconnects
+        ):
+            # состояние запоминается до первого события нового соединения, а события нового соединения ждут восстановления своих чатов
+            gap = self.recovery.begin()
+            self._hold_events(gap)
+            self.__spawn(self.recover(gap))
+
+        for func in self.event_handlers.get(
+            (packet.namespace, packet.event), ()
+        ):
+            try:
+                await self.handling(func, packet)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+        for func in self.handlers[SocketTypes.PACKET]:
+            try:
+                await self.handling(func, packet, ws)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+        return dispatched
+
+    def __start(
+        self,
+        dict_with_data: dict[str, Any],
+        details: asyncio.Future | None,
+        seq: int | None,
+        timings: list[float] | None,
+        trace: tuple[Span, Span] | None,
+        key: Hashable,
+    ) -> None:
+        previous = self.__partitions.get(key) if key is not None else None
+        coro = self.dispatch(dict_with_data, details, seq, timings, trace)
+        task = self.__spawn(coro, key)
+
+        self.__events.add(task)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.__events))
+        task.add_done_callback(self.__on_event_done)
+
+        if previous is not None:
+            self.__waiting[task] = [
+                coro,
+                previous,
+                key,
+                dict_with_data,
+                seq,
+                trace,
+            ]
+
+    def __on_event_done(self, task: asyncio.Task) -> None:
+        self.__events.discard(task)
+        self.__waiting.pop(task, None)
+
+        while self.__spill and len(self.__events) < self.queue_size:
+            self.__start(*self.__spill.popleft())
+
+    def __drop_oldest(self) -> bool:
+        if not self.__waiting:
+            return False
+
+        task, (coro, previous, key, dict_with_data, seq, trace) = (
+            self.__waiting.popitem(last=False)
+        )
+        self.__events.discard(task)
+
+        if self.__partitions.get(key) is not task:
+            self.__skipped[task] = previous
+        elif previous is not None and (
+            not previous.done() or previous in self.__skipped
+        ):
+            # за выкинутым событием никого нет - следующее событие ключа ждёт то, что ждало оно
+            self.__partitions[key] = previous
+        else:
+            self.__partitions.pop(key)
+
+        task.cancel()
+        coro.close()
+        self.dropped += 1
+        self._drop(dict_with_data, seq, trace)
+
+        return True
+
+    def __spawn(self, coro: Any, key: Hashable = None) -> asyncio.Task:
+        if key is None:
+            task = asyncio.create_task(coro)
+        else:
+            task = asyncio.create_task(
+                self.__after(self.__partitions.get(key), coro)
+            )
+            self.__partitions[key] = task
+            task.add_done_callback(
+                lambda t: (
+                    self.__partitions.get(key) is t
+                    and self.__partitions.pop(key)
+                )
+            )
+
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+        return task
+
+    async def __after(self, previous: asyncio.Task | None, coro: Any) -> None:
+        task = asyncio.current_task()
+
+        try:
+            while previous is not None:
+                await asyncio.wait([previous])
+                # предыдущее событие выкинуто из очереди - ждём то, которое ждало оно
+                previous = self.__skipped.pop(previous, None)
+
+                if task in self.__waiting:
+                    self.__waiting[task][1] = previous
+        except asyncio.CancelledError:
+            coro.close()
+            raise
+
+        self.__waiting.pop(task, None)
+
+        await coro
+
+    async def __call(self, func: Callable[..., Any], *args) -> None:
+        name = getattr(func, "__name__", str(func))
+
+        async with self.__semaphore:
+            try:
+                if inspect.iscoroutinefunction(func):
+                    await self.profiler.run_async(name, func, *args)
+                else:
+                    await asyncio.to_thread(
+                        self.profiler.run, name, func, *args
+                    )
+            # ошибка хэндлера не должна прерывать обработку события
+            except Exception as e:  # noqa: BLE001
+                print(f"Ошибка в хэндлере {name}: {e}")
@@ -0,0 +1,733 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Callable, Generator, Hashable
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+from starvell.enums import MessageTypes, SocketTypes
+from starvell.errors import HandlerError, ProtocolError
+from starvell.protocol import Packet, parse_packet
+from starvell.tracing import Span, Tracer, start_span
+from starvell.types import NewMessageEvent, OrderEvent, ServiceMessageEvent
+from starvell.utils import (
+    fill_order_details,
+    get_full_lot_title,
+    is_order_notification,
+    parse_ws_starvell_message,
+)
+
+from .dedup import BaseDeduplicator, LRUDeduplicator
+from .enrichment import OrderDetails, OrderEnricher, memoized
+from .journal import Journal, JournalFrame
+from .profiling import HandlerProfiler
+from .recovery import Gap, GapRecovery
+from .stages import StageTimer
+
+
+def chat_partition_key(dict_with_data: dict[str, Any]) -> Hashable:
+    """
+    Ключ очерёдности события - ID чата (события одного чата обрабатываются по порядку)
+
+    :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+
+    :return: ID чата
+    """
+
+    return dict_with_data.get("chatId")
+
+
+def order_partition_key(dict_with_data: dict[str, Any]) -> Hashable:
+    """
+    Ключ очерёдности события - ID заказа для уведомлений о заказах, для остальных событий - ID чата
+
+    :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+
+    :return: ID заказа либо ID чата
+    """
+
+    order = dict_with_data.get("order")
+
+    if order and order.get("id"):
+        return order["id"]
+
+    return dict_with_data.get("chatId")
+
+
+class BaseRunner(ABC):
+    """
+    Общая часть Runner и AsyncRunner: хэндлеры, типы событий, сборка события из сообщения веб-сокета и конвейер событий (разбор, отсев дубликатов, журнал, восстановление после обрыва)
+
+    Наследники реализуют только то, что зависит от модели выполнения: запрос деталей заказа (_fetch_details), постановку события в обработку (_submit), вызов хэндлеров и запросы восстановления (recover)
+    """
+
+    # ошибки запросов аккаунта, при которых восстановление чата пропускается (задаются наследниками)
+    _request_errors: tuple[type[Exception], ...] = ()
+
+    def __init__(
+        self,
+        acc: Any,
+        enricher: OrderEnricher | None = None,
+        lazy_orders: bool = False,
+        partition_key: Callable[[dict[str, Any]], Hashable] | None = (
+            chat_partition_key
+        ),
+        recovery: GapRecovery | None = None,
+        dedup: BaseDeduplicator | None = None,
+        journal: Journal | None = None,
+        stages: StageTimer | None = None,
+        tracer: Tracer | None = None,
+        profiler: HandlerProfiler | None = None,
+    ) -> None:
+        """
+        Параметры описаны в Runner и AsyncRunner
+
+        :param acc: Экземпляр класса Account либо AsyncAccount
+        """
+
+        self.acc = acc
+        self.enricher: OrderEnricher = enricher or OrderEnricher(acc)
+        self.lazy_orders: bool = lazy_orders
+        self.partition_key: Callable[[dict[str, Any]], Hashable] | None = (
+            partition_key
+        )
+        self.recovery: GapRecovery = recovery or GapRecovery()
+        self.dedup: BaseDeduplicator = dedup or LRUDeduplicator()
+        self.journal: Journal | None = journal
+        self.stages: StageTimer | None = stages
+        self.tracer: Tracer | None = (
+            tracer
+            if tracer is not None
+            else getattr(acc.request, "tracer", None)
+        )
+        self.profiler: HandlerProfiler = profiler or HandlerProfiler()
+
+        # пока идёт восстановление после обрыва, новые события чатов, которые ещё восстанавливаются, откладываются, чтобы не обогнать пропущенные
+        self.__hold_lock = threading.RLock()
+        # восстановления, ещё не получившие список чатов (пока они есть, откладываются события всех чатов)
+        self.__holds: list[Gap] = []
+        self.__held_chats: Counter[str] = Counter()
+        # отложенные события: (событие, номер кадра, время получения, спан)
+        self.__held: list[tuple] = []
+
+        self.handlers: dict[MessageTypes | SocketTypes, list] = {
+            MessageTypes.NEW_MESSAGE: [],
+            MessageTypes.NEW_ORDER: [],
+            MessageTypes.CONFIRM_ORDER: [],
+            MessageTypes.ORDER_REOPENED: [],
+            MessageTypes.ORDER_REFUND: [],
+            MessageTypes.NEW_REVIEW: [],
+            MessageTypes.REVIEW_DELETED: [],
+            MessageTypes.REVIEW_CHANGED: [],
+            MessageTypes.REVIEW_RESPONSE_EDITED: [],
+            MessageTypes.REVIEW_RESPONSE_CREATED: [],
+            MessageTypes.REVIEW_RESPONSE_DELETED: [],
+            MessageTypes.BLACKLIST_YOU_ADDED: [],
+            MessageTypes.BLACKLIST_USER_ADDED: [],
+            MessageTypes.BLACKLIST_YOU_REMOVED: [],
+            MessageTypes.BLACKLIST_USER_REMOVED: [],
+            SocketTypes.OPEN: [],
+            SocketTypes.NEW_MESSAGE: [],
+            SocketTypes.PACKET: [],
+        }
+
+        # хэндлеры событий Socket.IO по пространству имён и названию события
+        self.event_handlers: dict[tuple[str, str], list] = {}
+
+        self.event_types: dict[
+            MessageTypes,
+            type[NewMessageEvent | OrderEvent | ServiceMessageEvent],
+        ] = {
+            MessageTypes.NEW_MESSAGE: NewMessageEvent,
+            MessageTypes.NEW_ORDER: OrderEvent,
+            MessageTypes.CONFIRM_ORDER: OrderEvent,
+            MessageTypes.ORDER_REFUND: OrderEvent,
+            MessageTypes.ORDER_REOPENED: OrderEvent,
+            MessageTypes.NEW_REVIEW: OrderEvent,
+            MessageTypes.REVIEW_DELETED: OrderEvent,
+            MessageTypes.REVIEW_CHANGED: OrderEvent,
+            MessageTypes.REVIEW_RESPONSE_EDITED: OrderEvent,
+            MessageTypes.REVIEW_RESPONSE_CREATED: OrderEvent,
+            MessageTypes.REVIEW_RESPONSE_DELETED: OrderEvent,
+            MessageTypes.BLACKLIST_YOU_REMOVED: ServiceMessageEvent,
+            MessageTypes.BLACKLIST_USER_REMOVED: ServiceMessageEvent,
+            MessageTypes.BLACKLIST_YOU_ADDED: ServiceMessageEvent,
+            MessageTypes.BLACKLIST_USER_ADDED: ServiceMessageEvent,
+        }
+
+        self.cache_invalidations: dict[MessageTypes, tuple[str, ...]] = {
+            MessageTypes.NEW_ORDER: ("get_order",),
+            MessageTypes.CONFIRM_ORDER: ("get_order",),
+            MessageTypes.ORDER_REOPENED: ("get_order",),
+            MessageTypes.NEW_REVIEW: ("get_review",),
+            MessageTypes.REVIEW_DELETED: ("get_review",),
+            MessageTypes.REVIEW_CHANGED: ("get_review",),
+            MessageTypes.REVIEW_RESPONSE_EDITED: ("get_review",),
+            MessageTypes.REVIEW_RESPONSE_CREATED: ("get_review",),
+            MessageTypes.REVIEW_RESPONSE_DELETED: ("get_review",),
+            MessageTypes.ORDER_REFUND: ("get_order", "get_review"),
+            MessageTypes.BLACKLIST_YOU_ADDED: ("get_black_list",),
+            MessageTypes.BLACKLIST_USER_ADDED: ("get_black_list",),
+            MessageTypes.BLACKLIST_YOU_REMOVED: ("get_black_list",),
+            MessageTypes.BLACKLIST_USER_REMOVED: (
+                "get_black_list",
+                "get_user",
+            ),
+        }
+
+    def add_handler(
+        self,
+        handler_type: MessageTypes | SocketTypes,
+        handler_filter: list[Callable] | Callable | None = None,
+        **kwargs: object,
+    ) -> Callable[[Any], None]:
+        """
+        Добавляет хэндлер
+
+        Примеры:
+
+        ``@add_handler(MessageTypes.NEW_MESSAGE)``
+
+        ``@add_handler(SocketTypes.NEW_MESSAGE)``
+
+        :param handler_type: MessageTypes либо SocketTypes
+        :param handler_filter: Функция-фильтр, указывать необязательно, в случае если эта функция вернёт False, хэндлер не сработает
+
+        :return: Callable
+        """
+
+        def decorator(func):
+            self.handlers[handler_type].append([func, handler_filter, kwargs])
+            return func
+
+        return decorator
+
+    def add_event_handler(
+        self,
+        event: str,
+        namespace: str = "/chats",
+        handler_filter: list[Callable] | Callable | None = None,
+        **kwargs: object,
+    ) -> Callable[[Any], None]:
+        """
+        Добавляет хэндлер события Socket.IO по его названию (для событий, кроме message_created, у которых нет своего MessageTypes)
+
+        Хэндлер получает разобранный пакет (Packet), аргументы события - ``packet.args``
+
+        Пример: ``@add_event_handler("chat_read")``
+
+        :param event: Название события
+        :param namespace: Пространство имён Socket.IO
+        :param handler_filter: Функция-фильтр, указывать необязательно, в случае если эта функция вернёт False, хэндлер не сработает
+
+        :return: Callable
+        """
+
+        def decorator(func):
+            self.event_handlers.setdefault((namespace, event), []).append([
+                func,
+                handler_filter,
+                kwargs,
+            ])
+            return func
+
+        return decorator
+
+    def build_event(
+        self,
+        dict_with_data: dict[str, Any],
+        details: OrderDetails | None = None,
+    ) -> NewMessageEvent | OrderEvent | ServiceMessageEvent:
+        """
+        Собирает модель события из словаря (результат parse_ws_starvell_message)
+
+        У OrderEvent полный заказ доступен через ``event.get_order()``, он запрашивается только при обращении
+
+        :param dict_with_data: Словарь с событием
+        :param details: Детали заказа от OrderEnricher'а (для уведомлений о заказах)
+
+        :return: NewMessageEvent, OrderEvent либо ServiceMessageEvent
+        """
+
+        if details is not None:
+            fill_order_details(dict_with_data, details)
+
+        if dict_with_data.get("order") and dict_with_data["order"].get(
+            "offerDetails"
+        ):
+            offer = dict_with_data["order"]["offerDetails"]
+            dict_with_data["order"]["offerDetails"]["full_lot_title"] = (
+                get_full_lot_title(offer, dict_with_data["order"])
+            )
+
+        event = self.event_types[dict_with_data["type"]].model_validate(
+            dict_with_data
+        )
+
+        if isinstance(event, OrderEvent):
+            order_id = event.order.id
+            event._order_loader = memoized(
+                lambda: self.acc.get_order(order_id)
+            )
+
+        return event
+
+    def invalidate_cache(self, dict_with_data: dict[str, Any]) -> None:
+        """
+        Удаляет из кэша аккаунта данные, которые устарели из-за события (заказ, отзывы по заказу, чёрный список)
+
+        Вызывается сразу после разбора события, до запроса деталей заказа, чтобы get_order() вернул уже новый статус
+
+        :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+
+        :return: None
+        """
+
+        if self.acc.cache is None:
+            return
+
+        order_id = (dict_with_data.get("order") or {}).get("id")
+
+        for namespace in self.cache_invalidations.get(
+            dict_with_data["type"], ()
+        ):
+            if namespace in ("get_order", "get_review") and order_id:
+                self.acc.invalidate_cache(namespace, order_id)
+            else:
+                self.acc.invalidate_cache(namespace)
+
+    def _receive(
+        self,
+        msg: str | Packet | dict[str, Any],
+        seq: int | None,
+        hold: bool = True,
+    ) -> bool:
+        # общая часть msg_process: спан события, разбор и постановка в обработку (hold=False - событие из восстановления, его не откладываем)
+        received_at = time.perf_counter()
+        span = (
+            self.tracer.start_span("runner.event")
+            if self.tracer is not None
+            else None
+        )
+        dispatched = False
+
+        try:
+            with self._activate(span):
+                dispatched = self.__process(msg, seq, received_at, span, hold)
+
+            return dispatched
+
+        except Exception as e:
+            raise HandlerError(str(e)) from e
+        finally:
+            if span is not None and not dispatched:
+                span.finish()
+
+    def __process(
+        self,
+        msg: str | Packet | dict[str, Any],
+        seq: int | None,
+        received_at: float,
+        span: Span | None,
+        hold: bool,
+    ) -> bool:
+        with self._trace("runner.parse"):
+            dict_with_data = parse_ws_starvell_message(msg)
+
+        if not dict_with_data:
+            return False
+
+        # отложенное событие считается поставленным в обработку: кадр и спан закроются после обработки
+        if hold and self.__hold(dict_with_data, seq, received_at, span):
+            return True
+
+        return self.__accept(dict_with_data, seq, received_at, span)
+
+    def __accept(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        received_at: float,
+        span: Span | None,
+    ) -> bool:
+        message_id = (
+            str(dict_with_data["id"]) if dict_with_data.get("id") else None
+        )
+
+        # сообщение уже обработано либо обрабатывается (повторная доставка)
+        if message_id is not None and self.dedup.check(message_id):
+            return False
+
+        dispatched = False
+
+        try:
+            dispatched = self.__enqueue(dict_with_data, seq, received_at, span)
+        finally:
+            # событие не поставлено в обработку - при повторе оно не дубликат
+            if not dispatched and message_id is not None:
+                self.dedup.discard(message_id)
+
+        return dispatched
+
+    def __enqueue(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        received_at: float,
+        span: Span | None,
+    ) -> bool:
+        if span is not None:
+            span.set(
+                type=str(dict_with_data["type"]),
+                message_id=str(dict_with_data.get("id")),
+                chat_id=str(dict_with_data.get("chatId")),
+            )
+
+        self.invalidate_cache(dict_with_data)
+
+        # детали запрашиваются вне потока веб-сокета, но в контексте трассировки события
+        details = (
+            self._fetch_details(dict_with_data["order"]["id"])
+            if is_order_notification(dict_with_data) and not self.lazy_orders
+            else None
+        )
+
+        timings = None
+
+        if self.stages is not None:
+            queued_at = time.perf_counter()
+            self.stages.record("parse", queued_at - received_at)
+            timings = [received_at, queued_at]
+
+        return self._submit(
+            dict_with_data,
+            details,
+            seq,
+            timings,
+            (span, start_span("runner.queue", span)) if span else None,
+            self.partition_key(dict_with_data) if self.partition_key else None,
+        )
+
+    @abstractmethod
+    def _fetch_details(self, order_id: str) -> Any:
+        """
+        Запрашивает детали заказа у OrderEnricher'а
+
+        :param order_id: ID Заказа
+
+        :return: Future с деталями заказа
+        """
+
+    @abstractmethod
+    def _submit(
+        self,
+        dict_with_data: dict[str, Any],
+        details: Any,
+        seq: int | None,
+        timings: list[float] | None,
+        trace: tuple[Span, Span] | None,
+        key: Hashable,
+    ) -> bool:
+        """
+        Ставит событие в обработку (dispatch), события с одним ключом - строго по очереди
+
+        :return: True, если событие поставлено в обработку
+        """
+
+    def _dequeue(self, trace: tuple[Span, Span] | None) -> Span | None:
+        # событие дождалось своей очереди: спан ожидания закрывается, спан события продолжается в dispatch
+        if trace is None:
+            return None
+
+        span, queued = trace
+        queued.finish()
+
+        return span
+
+    def _lap(
+        self, timings: list[float] | None, stage: str, total: bool = False
+    ) -> None:
+        # timings - [время получения события, время окончания предыдущего этапа]
+        if timings is None or self.stages is None:
+            return
+
+        now = time.perf_counter()
+        self.stages.record(stage, now - timings[1])
+        timings[1] = now
+
+        if total:
+            self.stages.record("total", now - timings[0])
+
+    def _build(
+        self,
+        dict_with_data: dict[str, Any],
+        details: Any,
+        timings: list[float] | None,
+        span: Span | None,
+    ) -> NewMessageEvent | OrderEvent | ServiceMessageEvent | None:
+        # вызывается, когда Future с деталями заказа уже завершён
+        order_details = None
+
+        if details is not None and details.exception() is not None:
+            # событие всё равно доставляется, но без цен и ID лота
+            print(
+                f"Не удалось получить заказ {dict_with_data['order']['id']}: "
+                f"{details.exception()}"
+            )
+        elif details is not None:
+            order_details = details.result()
+
+        self._lap(timings, "details")
+
+        try:
+            with self._trace("runner.build"):
+                data = self.build_event(dict_with_data, order_details)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print(f"Ошибка при разборе события: {e}")
+            return None
+
+        if span is not None:
+            data._trace_id = span.trace_id
+
+        self._lap(timings, "build")
+
+        return data
+
+    def _complete(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        span: Span | None,
+    ) -> None:
+        if span is not None:
+            span.finish()
+
+        # ID считается обработанным, а курсор чата сдвигается только после хэндлеров
+        if dict_with_data.get("id"):
+            self.dedup.done(str(dict_with_data["id"]))
+
+        self.recovery.track(dict_with_data)
+        self._commit_frame(seq)
+
+    def _drop(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        trace: tuple[Span, Span] | None,
+    ) -> None:
+        # событие выкинуто из очереди (OverflowPolicies.DROP_OLDEST) - хэндлеры не вызывались, поэтому его ID не считается обработанным и событие может вернуться при восстановлении после обрыва
+        if dict_with_data.get("id"):
+            self.dedup.discard(str(dict_with_data["id"]))
+
+        span = self._dequeue(trace)
+
+        if span is not None:
+            span.set(dropped=True)
+            span.finish()
+
+        self._commit_frame(seq)
+
+    def _commit_frame(self, seq: int | None) -> None:
+        if seq is not None:
+            self.journal.done(seq)
+
+    def _replay(self, frames: list[JournalFrame]) -> int:
+        # общая часть replay_journal
+        replayed = 0
+
+        for frame in frames:
+            dispatched = False
+
+            try:
+                packet = parse_packet(frame.frame)
+
+                if (
+                    packet.event == "message_created"
+                    and packet.namespace == "/chats"
+                ):
+                    dispatched = self._receive(packet, frame.seq)
+            except (HandlerError, ProtocolError) as e:
+                print(f"Ошибка при повторной обработке кадра {frame.seq}: {e}")
+            finally:
+                if dispatched:
+                    replayed += 1
+                else:
+                    self.journal.done(frame.seq)
+
+        return replayed
+
+    def _hold_events(self, gap: Gap) -> None:
+        # вызывается при переподключении до постановки recover(gap): события откладываются, пока восстановление не получит список чатов
+        with self.__hold_lock:
+            if not any(hold is gap for hold in self.__holds):
+                self.__holds.append(gap)
+
+    def _release_events(self, gap: Gap) -> None:
+        # восстановление закончилось, не получив список чатов, либо recover(gap) не будет выполнен (не поставлен в обработку / выкинут из очереди)
+        with self.__hold_lock:
+            self.__holds = [hold for hold in self.__holds if hold is not gap]
+            self.__flush()
+
+    def __hold(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        received_at: float,
+        span: Span | None,
+    ) -> bool:
+        # без блокировки: восстановление идёт редко, а удержание начинается в потоке веб-сокета
+        if not self.__holds and not self.__held_chats:
+            return False
+
+        with self.__hold_lock:
+            if (
+                not self.__holds
+                and dict_with_data.get("chatId") not in self.__held_chats
+            ):
+                return False
+
+            self.__held.append((dict_with_data, seq, received_at, span))
+
+            return True
+
+    def __narrow_hold(self, gap: Gap, chats: list[str]) -> None:
+        # список чатов получен: дальше откладываются только события восстанавливаемых чатов
+        with self.__hold_lock:
+            self.__held_chats.update(chats)
+            self._release_events(gap)
+
+    def __release_chats(self, chats: list[str]) -> None:
+        with self.__hold_lock:
+            self.__held_chats.subtract(chats)
+            self.__held_chats = +self.__held_chats
+            self.__flush()
+
+    def __flush(self) -> None:
+        # вызывается под __hold_lock: события ставятся в обработку в порядке получения, новые события ждут блокировку
+        if self.__holds:
+            return
+
+        held, self.__held = self.__held, []
+
+        for event in held:
+            if event[0].get("chatId") in self.__held_chats:
+                self.__held.append(event)
+            else:
+                self.__admit(*event)
+
+    def __admit(
+        self,
+        dict_with_data: dict[str, Any],
+        seq: int | None,
+        received_at: float,
+        span: Span | None,
+    ) -> None:
+        dispatched = False
+
+        try:
+            with self._activate(span):
+                dispatched = self.__accept(
+                    dict_with_data, seq, received_at, span
+                )
+        # ошибка одного отложенного события не должна задерживать остальные
+        except Exception as e:  # noqa: BLE001
+            print(f"Ошибка при обработке отложенного события: {e}")
+        finally:
+            if not dispatched:
+                if span is not None:
+                    span.finish()
+
+                self._commit_frame(seq)
+
+    def _recover(self, gap: Gap) -> Generator[tuple[str, tuple], Any, None]:
+        """
+        Общая часть recover() без запросов: отдаёт (название метода аккаунта, аргументы) и получает результат запроса, либо ошибку из _request_errors через throw()
+
+        Новые события откладываются (_hold_events): сначала все, после получения списка чатов - только события затронутых чатов, каждый чат отпускается после постановки его пропущенных сообщений
+        """
+
+        # чаты, события которых ещё откладывает это восстановление (None - пока откладываются события всех чатов)
+        holding: list[str] | None = None
+        self._hold_events(gap)
+
+        try:
+            affected, listed, offset = [], set(), 0
+
+            try:
+                while True:
+                    chats = yield (
+                        "get_chats",
+                        (offset, self.recovery.chats_limit),
+                    )
+                    affected += self.recovery.affected_chats(gap, chats)
+                    listed.update(chat.id for chat in chats)
+
+                    if self.recovery.exhausted(gap, chats, listed):
+                        break
+
+                    offset += len(chats)
+            except self._request_errors as e:
+                print(
+                    f"Не удалось получить чаты для восстановления событий: {e}"
+                )
+                return
+
+            # страницы чатов могут пересекаться, если во время запросов в чатах появились сообщения
+            holding = list(dict.fromkeys(affected))
+            self.__narrow_hold(gap, holding)
+
+            for chat_id in list(holding):
+                try:
+                    yield from self.__recover_chat(gap, chat_id)
+                except (HandlerError, *self._request_errors) as e:
+                    print(
+                        f"Не удалось восстановить события чата {chat_id}: {e}"
+                    )
+                finally:
+                    holding.remove(chat_id)
+                    self.__release_chats([chat_id])
+        finally:
+            if holding is None:
+                self._release_events(gap)
+            elif holding:
+                self.__release_chats(holding)
+
+    def __recover_chat(
+        self, gap: Gap, chat_id: str
+    ) -> Generator[tuple[str, tuple], Any, None]:
+        limit = self.recovery.history_limit
+
+        # у get_raw_chat нет смещения - запрашиваем больше сообщений, пока история не дойдёт до курсора чата
+        while True:
+            messages = yield ("get_raw_chat", (chat_id, limit))
+            complete = self.recovery.reaches(gap, chat_id, messages, limit)
+
+            if complete or limit >= self.recovery.max_history_limit:
+                break
+
+            limit = min(limit * 2, self.recovery.max_history_limit)
+
+        if not complete:
+            print(
+                f"Восстановлены только последние {limit} сообщений "
+                f"чата {chat_id}, более ранние пропущенные события "
+                f"потеряны"
+            )
+
+        for message in self.recovery.missed(gap, chat_id, messages, complete):
+            self._receive(message, None, hold=False)
+
+    def _activate(
+        self, span: Span | None
+    ) -> AbstractContextManager[Span | None]:
+        if self.tracer is None:
+            return nullcontext()
+
+        return self.tracer.activate(span)
+
+    def _trace(self, name: str) -> AbstractContextManager[Span | None]:
+        if self.tracer is None:
+            return nullcontext()
+
+        return self.tracer.trace(name)
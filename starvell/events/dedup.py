@@ -0,0 +1,357 @@
+import atexit
+import hashlib
+import json
+import math
+import os
+import struct
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+
+class BaseDeduplicator(ABC):
+    """
+    Базовый класс индекса уже обработанных ID сообщений (стадия отсева дубликатов в msg_process), наследуйте его, чтобы подключить своё хранилище
+
+    ID попадает в индекс только после обработки события (done), до этого он хранится в памяти как обрабатываемый: событие, которое не успело обработаться (падение программы, выкинуто из переполненной очереди), не считается дубликатом при повторе из журнала или восстановлении после обрыва
+
+    Память ограничена, индекс может сохраняться в файл (path) и загружаться из него при запуске
+    """
+
+    path: str | None
+
+    @abstractmethod
+    def check(self, key: str) -> bool:
+        """
+        Проверяет ID и, если он новый, отмечает его обрабатываемым
+
+        :param key: ID сообщения
+
+        :return: True, если ID уже обработан или сейчас обрабатывается (дубликат)
+        """
+
+    @abstractmethod
+    def done(self, key: str) -> None:
+        """
+        Добавляет ID в индекс после обработки события
+
+        :param key: ID сообщения
+        """
+
+    @abstractmethod
+    def discard(self, key: str) -> None:
+        """
+        Забывает обрабатываемый ID, если событие так и не было обработано (например выкинуто из очереди)
+
+        :param key: ID сообщения
+        """
+
+    @abstractmethod
+    def save(self) -> None:
+        """
+        Сохраняет индекс в файл (если path указан)
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Останавливает фоновое сохранение и сохраняет индекс
+        """
+
+    @abstractmethod
+    def snapshot(self) -> dict[str, Any]: ...
+
+
+class _Persistent(BaseDeduplicator):
+    def __init__(self, path: str | None, save_interval: float) -> None:
+        self.path: str | None = path
+        self.save_interval: float = save_interval
+
+        self.checks: int = 0
+        self.hits: int = 0
+
+        self._lock = threading.Lock()
+        # ID событий, которые сейчас обрабатываются (в файл не сохраняются)
+        self._pending: set[str] = set()
+        self._dirty: bool = False
+        self.__save_lock = threading.Lock()
+        self.__closed = threading.Event()
+
+        if path is not None:
+            if os.path.exists(path):
+                self.__load_file(path)
+
+            # файл пишется в отдельном потоке, а не при проверке ID в потоке веб-сокета
+            threading.Thread(
+                target=self.__autosave, name="starvell-dedup", daemon=True
+            ).start()
+            atexit.register(self.close)
+
+    def check(self, key: str) -> bool:
+        with self._lock:
+            self.checks += 1
+            seen = key in self._pending or self._contains(key)
+
+            if seen:
+                self.hits += 1
+            else:
+                self._pending.add(key)
+
+        return seen
+
+    def done(self, key: str) -> None:
+        with self._lock:
+            self._pending.discard(key)
+            self._add(key)
+            self._dirty = True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._pending.discard(key)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        with self.__save_lock:
+            with self._lock:
+                data = self._dump()
+                self._dirty = False
+
+            # атомарная запись: при падении во время сохранения старый файл остаётся целым
+            tmp = f"{self.path}.tmp"
+
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+
+                os.replace(tmp, self.path)
+            except OSError:
+                with self._lock:
+                    self._dirty = True
+
+                raise
+
+    def close(self) -> None:
+        self.__closed.set()
+        self.save()
+
+    def __load_file(self, path: str) -> None:
+        try:
+            with open(path, "rb") as f:
+                self._load(f.read())
+        except (OSError, ValueError, TypeError, struct.error) as e:
+            # повреждённый файл не должен мешать запуску - индекс начинается заново
+            print(
+                f"Ошибка при загрузке индекса дубликатов из {path}, "
+                f"индекс будет пустым: {e}"
+            )
+
+    def _stats(self) -> dict[str, Any]:
+        return {
+            "checks": self.checks,
+            "hits": self.hits,
+            "misses": self.checks - self.hits,
+            "pending": len(self._pending),
+        }
+
+    def __autosave(self) -> None:
+        while not self.__closed.wait(self.save_interval):
+            if not self._dirty:
+                continue
+
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Ошибка при сохранении индекса дубликатов: {e}")
+
+    @abstractmethod
+    def _contains(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def _add(self, key: str) -> None: ...
+
+    @abstractmethod
+    def _dump(self) -> bytes: ...
+
+    @abstractmethod
+    def _load(self, data: bytes) -> None: ...
+
+
+class LRUDeduplicator(_Persistent):
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        path: str | None = None,
+        save_interval: float = 30,
+    ) -> None:
+        """
+        Точный индекс последних maxsize ID сообщений (LRU)
+
+        :param maxsize: Сколько последних ID хранить
+        :param path: Файл, в который индекс сохраняется (раз в save_interval секунд и при завершении программы) и из которого загружается при запуске
+        :param save_interval: Как часто сохранять индекс в файл, в секундах
+        """
+
+        self.maxsize: int = maxsize
+        self.evictions: int = 0
+        self.__keys: OrderedDict[str, None] = OrderedDict()
+
+        super().__init__(path, save_interval)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика индекса
+
+        :return: Словарь (кол-во проверок, дубликатов, обрабатываемых ID, размер индекса, кол-во вытеснений)
+        """
+
+        with self._lock:
+            return {
+                **self._stats(),
+                "size": len(self.__keys),
+                "maxsize": self.maxsize,
+                "evictions": self.evictions,
+            }
+
+    def _contains(self, key: str) -> bool:
+        if key in self.__keys:
+            self.__keys.move_to_end(key)
+            return True
+
+        return False
+
+    def _add(self, key: str) -> None:
+        self.__keys[key] = None
+        self.__keys.move_to_end(key)
+
+        while len(self.__keys) > self.maxsize:
+            self.__keys.popitem(last=False)
+            self.evictions += 1
+
+    def _dump(self) -> bytes:
+        return json.dumps(list(self.__keys)).encode()
+
+    def _load(self, data: bytes) -> None:
+        keys = json.loads(data)
+
+        if not isinstance(keys, list) or not all(
+            isinstance(key, str) for key in keys
+        ):
+            raise ValueError("ожидался список ID сообщений")
+
+        self.__keys = OrderedDict.fromkeys(keys[-self.maxsize :])
+
+
+class BloomDeduplicator(_Persistent):
+    _HEADER = struct.Struct("<4sIIdII")
+    _MAGIC = b"SVBF"
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        path: str | None = None,
+        save_interval: float = 30,
+    ) -> None:
+        """
+        Вероятностный индекс ID сообщений: два чередующихся фильтра Блума фиксированного размера
+
+        Новые ID пишутся в текущий фильтр, когда в нём набирается capacity ID, он становится предыдущим, а старый предыдущий очищается. Поэтому помнятся минимум capacity последних ID, а доля ложных срабатываний (новое сообщение принято за дубликат) не превышает ~2 * error_rate
+
+        :param capacity: Сколько ID помещается в один фильтр
+        :param error_rate: Допустимая доля ложных срабатываний одного фильтра
+        :param path: Файл, в который индекс сохраняется (раз в save_interval секунд и при завершении программы) и из которого загружается при запуске
+        :param save_interval: Как часто сохранять индекс в файл, в секундах
+        """
+
+        self.capacity: int = capacity
+        self.error_rate: float = error_rate
+        self.bits: int = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes: int = max(1, round(self.bits / capacity * math.log(2)))
+        self.rotations: int = 0
+
+        self.__size: int = 0
+        self.__current: bytearray = bytearray((self.bits + 7) // 8)
+        self.__previous: bytearray = bytearray((self.bits + 7) // 8)
+
+        super().__init__(path, save_interval)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика индекса
+
+        :return: Словарь (кол-во проверок, дубликатов, обрабатываемых ID, заполненность текущего фильтра, размер в байтах, кол-во ротаций)
+        """
+
+        with self._lock:
+            return {
+                **self._stats(),
+                "size": self.__size,
+                "capacity": self.capacity,
+                "error_rate": self.error_rate,
+                "memory": len(self.__current) * 2,
+                "rotations": self.rotations,
+            }
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _contains(self, key: str) -> bool:
+        positions = self._positions(key)
+
+        return any(
+            all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+            for bits in (self.__current, self.__previous)
+        )
+
+    def _add(self, key: str) -> None:
+        if self._contains(key):
+            return
+
+        positions = self._positions(key)
+
+        if self.__size >= self.capacity:
+            self.__previous = self.__current
+            self.__current = bytearray(len(self.__previous))
+            self.__size = 0
+            self.rotations += 1
+
+        for p in positions:
+            self.__current[p >> 3] |= 1 << (p & 7)
+
+        self.__size += 1
+
+    def _dump(self) -> bytes:
+        header = self._HEADER.pack(
+            self._MAGIC,
+            self.capacity,
+            self.bits,
+            self.error_rate,
+            self.hashes,
+            self.__size,
+        )
+
+        return header + bytes(self.__current) + bytes(self.__previous)
+
+    def _load(self, data: bytes) -> None:
+        magic, capacity, bits, _, hashes, size = self._HEADER.unpack_from(data)
+
+        if (
+            magic != self._MAGIC
+            or (bits, hashes) != (self.bits, self.hashes)
+            or len(data) != self._HEADER.size + 2 * len(self.__current)
+        ):
+            # параметры фильтра изменились - сохранённый индекс несовместим
+            return
+
+        start, length = self._HEADER.size, len(self.__current)
+        self.__size = min(size, capacity)
+        self.__current = bytearray(data[start : start + length])
+        self.__previous = bytearray(data[start + length :])
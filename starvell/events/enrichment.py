@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple
+
+from starvell.tracing import span
+from starvell.types import Order
+
+
+class OrderDetails(NamedTuple):
+    """
+    Поля заказа, которые не меняются после его создания
+    """
+
+    price_for_me: float | None
+    price_for_buyer: float | None
+    offer_id: int | None
+
+
+class OrderEnricher:
+    def __init__(self, acc: Any, workers: int = 4, maxsize: int = 1024):
+        """
+        Дополняет уведомления о заказах деталями заказа (цены, ID лота) вне потока / задачи, читающей веб-сокет
+
+        Детали заказа не меняются после его создания, поэтому хранятся в LRU и повторно не запрашиваются, а одновременные запросы одного заказа объединяются в один
+
+        :param acc: Экземпляр класса Account либо AsyncAccount
+        :param workers: Кол-во потоков для запросов get_order (только для Account)
+        :param maxsize: Сколько заказов хранить в LRU
+        """
+
+        self.acc = acc
+        self.workers: int = workers
+        self.maxsize: int = maxsize
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.failed: int = 0
+
+        self.__details: OrderedDict[str, OrderDetails] = OrderedDict()
+        self.__pending: dict[str, Future | asyncio.Future] = {}
+        self.__executor: ThreadPoolExecutor | None = None
+        self.__lock = threading.Lock()
+
+    def fetch(self, order_id: str) -> Future:
+        """
+        Получает детали заказа в пуле потоков enricher'а (запрос выполняется в контексте трассировки вызывающего потока)
+
+        :param order_id: ID Заказа
+
+        :return: Future с OrderDetails (уже выполненный, если заказ есть в LRU)
+        """
+
+        with self.__lock:
+            future = self.__lookup(order_id)
+
+            if future is not None:
+                return future
+
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="starvell-enrich"
+                )
+
+            ctx = contextvars.copy_context()
+            future = self.__executor.submit(ctx.run, self.__load, order_id)
+            self.__pending[order_id] = future
+
+        future.add_done_callback(lambda f: self.__store(order_id, f))
+
+        return future
+
+    def fetch_async(self, order_id: str) -> asyncio.Future:
+        """
+        Асинхронная версия fetch(), запрос выполняется в отдельной задаче asyncio
+
+        :param order_id: ID Заказа
+
+        :return: asyncio.Future с OrderDetails
+        """
+
+        with self.__lock:
+            future = self.__lookup(order_id)
+
+            if isinstance(future, Future):
+                return asyncio.wrap_future(future)
+            if future is not None:
+                return future
+
+            future = asyncio.ensure_future(self.__load_async(order_id))
+            self.__pending[order_id] = future
+
+        future.add_done_callback(lambda f: self.__store(order_id, f))
+
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Останавливает пул потоков enricher'а
+
+        :return: None
+        """
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика enricher'а
+
+        :return: Словарь (кол-во заказов в LRU, запросов в процессе, попаданий, промахов и ошибок)
+        """
+
+        with self.__lock:
+            return {
+                "size": len(self.__details),
+                "pending": len(self.__pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "failed": self.failed,
+            }
+
+    def __lookup(self, order_id: str) -> Future | asyncio.Future | None:
+        if order_id in self.__details:
+            self.__details.move_to_end(order_id)
+            self.hits += 1
+
+            future = Future()
+            future.set_result(self.__details[order_id])
+            return future
+
+        if order_id in self.__pending:
+            self.hits += 1
+            return self.__pending[order_id]
+
+        self.misses += 1
+        return None
+
+    def __load(self, order_id: str) -> OrderDetails:
+        with span("enricher.get_order", order_id=order_id):
+            return self.__details_of(self.acc.get_order(order_id))
+
+    async def __load_async(self, order_id: str) -> OrderDetails:
+        with span("enricher.get_order", order_id=order_id):
+            return self.__details_of(await self.acc.get_order(order_id))
+
+    @staticmethod
+    def __details_of(order: Order) -> OrderDetails:
+        return OrderDetails(
+            order.price_for_me, order.price_for_buyer, order.offer_id
+        )
+
+    def __store(self, order_id: str, future: Future | asyncio.Future) -> None:
+        with self.__lock:
+            self.__pending.pop(order_id, None)
+
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+
+            self.__details[order_id] = future.result()
+
+            while len(self.__details) > self.maxsize:
+                self.__details.popitem(last=False)
+
+
+def memoized(loader: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Оборачивает загрузчик так, чтобы он выполнялся не более одного раза (результат корутины оборачивается в задачу asyncio, которую можно ждать многократно)
+
+    :param loader: Функция без аргументов (либо функция, возвращающая корутину)
+
+    :return: Функция без аргументов
+    """
+
+    result: list[Any] = []
+    lock = threading.Lock()
+
+    def wrapper() -> Any:
+        with lock:
+            if not result:
+                value = loader()
+
+                if asyncio.iscoroutine(value):
+                    value = asyncio.ensure_future(value)
+
+                result.append(value)
+
+            return result[0]
+
+    return wrapper
@@ -1,173 +1,286 @@
 import threading
-from typing import Any, Callable
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
 
+from requests import RequestException
 from websocket import WebSocketApp
 
 from starvell.account import Account
-from starvell.enums import MessageTypes, SocketTypes
-from starvell.errors import HandlerError
+from starvell.enums import EngineIOPacketTypes, SocketTypes
+from starvell.errors import HandlerError, RequestFailedError
+from starvell.protocol import Packet
 from starvell.socket import Socket
-from starvell.types import NewMessageEvent, OrderEvent, ServiceMessageEvent
-from starvell.utils import identify_ws_starvell_message
-from starvell.utils import get_full_lot_title
+from starvell.tracing import Span, Tracer
 
+from .base import BaseRunner, chat_partition_key
+from .dedup import BaseDeduplicator
+from .enrichment import OrderEnricher
+from .journal import Journal, JournalFrame
+from .pool import WorkerPool
+from .profiling import HandlerProfiler
+from .recovery import Gap, GapRecovery
+from .stages import StageTimer
 
-class Runner:
-    def __init__(self, acc: Account, always_online: bool = True):
+
+class Runner(BaseRunner):
+    _request_errors = (RequestException, RequestFailedError, ValueError)
+
+    def __init__(
+        self,
+        acc: Account,
+        always_online: bool = True,
+        pool: WorkerPool | None = None,
+        enricher: OrderEnricher | None = None,
+        lazy_orders: bool = False,
+        partition_key: Callable[[dict[str, Any]], Hashable] | None = (
+            chat_partition_key
+        ),
+        recovery: GapRecovery | None = None,
+        dedup: BaseDeduplicator | None = None,
+        journal: Journal | None = None,
+        socket: Socket | None = None,
+        stages: StageTimer | None = None,
+        tracer: Tracer | None = None,
+        profiler: HandlerProfiler | None = None,
+    ):
         """
         :param acc: Экземпляр класса Account
         :param always_online: Поддерживать-ли постоянный онлайн? (True - при использовании API, аккаунт всегда будет онлайн)
+        :param pool: Пул потоков, в котором выполняются хэндлеры (по умолчанию WorkerPool() - 8 потоков, очередь на 1000 событий)
+        :param enricher: Дополняет уведомления о заказах ценами и ID лота в отдельных потоках (по умолчанию OrderEnricher(acc))
+        :param lazy_orders: Не дожидаться деталей заказа - хэндлеры сразу получают OrderEvent без цен, а полный заказ запрашивается через ``event.get_order()``
+        :param partition_key: Функция, возвращающая ключ очерёдности события: события с одним ключом обрабатываются строго по очереди, с разными - параллельно (по умолчанию - ID чата, order_partition_key - ID заказа, None - без очерёдности)
+        :param recovery: Восстановление событий, пропущенных во время обрыва веб-сокета (по умолчанию GapRecovery())
+        :param dedup: Индекс уже обработанных ID сообщений, повторно доставленные сообщения (после переподключения и восстановления) хэндлерам не передаются (по умолчанию LRUDeduplicator() - последние 10000 ID, в памяти)
+        :param journal: Журнал кадров веб-сокета: каждый кадр пишется в него до обработки, а кадры, обработка которых не завершилась в прошлый запуск, обрабатываются повторно перед первым событием из веб-сокета либо при явном вызове replay_journal() после добавления хэндлеров (по умолчанию не ведётся)
+        :param socket: Источник кадров вместо веб-сокета Starvell (например ReplaySocket - воспроизведение записанных кадров), по умолчанию Socket(acc.session_id, always_online)
+        :param stages: Замер времени этапов обработки событий (разбор, очередь, детали заказа, сборка события, хэндлеры), по умолчанию не ведётся
+        :param tracer: Трассировка событий: спан на каждый этап (кадр веб-сокета, разбор, очередь, детали заказа, сборка события, каждый хэндлер, HTTP запросы из хэндлеров), ID трассировки доступен через ``event.trace_id`` (по умолчанию tracer аккаунта, если он задан)
+        :param profiler: Замер хэндлеров: время выполнения, процессорное время и исключения по каждому хэндлеру, вывод медленных хэндлеров со стеком и профилирование обработки событий по запросу (по умолчанию HandlerProfiler() - бюджет хэндлера 1 секунда)
         """
 
+        super().__init__(
+            acc,
+            enricher,
+            lazy_orders,
+            partition_key,
+            recovery,
+            dedup,
+            journal,
+            stages,
+            tracer,
+            profiler,
+        )
+
         self.acc: Account = acc
+        self.pool: WorkerPool = pool or WorkerPool()
+        self.pool.drop_handlers.append(self.__on_drop)
+        # номер в журнале кадра, который сейчас обрабатывается в потоке веб-сокета
+        self.__frame = threading.local()
+        # кадры прошлого запуска, обработка которых не завершилась (обрабатываются в replay_journal)
+        self.__backlog: list[JournalFrame] | None = (
+            journal.uncommitted() if journal is not None else None
+        )
+        self.__replay_lock = threading.Lock()
+
+        self.socket: Socket = socket or Socket(
+            acc.session_id,
+            always_online,
+            base_url=acc.request.base_url,
+            tracer=self.tracer,
+        )
 
-        self.socket: Socket = Socket(acc.session_id, always_online)
+        if self.socket.tracer is None:
+            self.socket.tracer = self.tracer
         self.socket.handlers[SocketTypes.OPEN].append(self.on_open_process)
         self.socket.handlers[SocketTypes.NEW_MESSAGE].append(
             self.on_new_message
         )
+        self.socket.handlers[SocketTypes.PACKET].append(self.on_packet)
 
-        self.handlers: dict[MessageTypes | SocketTypes, list] = {
-            MessageTypes.NEW_MESSAGE: [],
-            MessageTypes.NEW_ORDER: [],
-            MessageTypes.CONFIRM_ORDER: [],
-            MessageTypes.ORDER_REOPENED: [],
-            MessageTypes.ORDER_REFUND: [],
-            MessageTypes.NEW_REVIEW: [],
-            MessageTypes.REVIEW_DELETED: [],
-            MessageTypes.REVIEW_CHANGED: [],
-            MessageTypes.REVIEW_RESPONSE_EDITED: [],
-            MessageTypes.REVIEW_RESPONSE_CREATED: [],
-            MessageTypes.REVIEW_RESPONSE_DELETED: [],
-            MessageTypes.BLACKLIST_YOU_ADDED: [],
-            MessageTypes.BLACKLIST_USER_ADDED: [],
-            MessageTypes.BLACKLIST_YOU_REMOVED: [],
-            MessageTypes.BLACKLIST_USER_REMOVED: [],
-            SocketTypes.OPEN: [],
-            SocketTypes.NEW_MESSAGE: [],
-        }
-
-        self.event_types: dict[
-            MessageTypes,
-            type[NewMessageEvent | OrderEvent | ServiceMessageEvent],
-        ] = {
-            MessageTypes.NEW_MESSAGE: NewMessageEvent,
-            MessageTypes.NEW_ORDER: OrderEvent,
-            MessageTypes.CONFIRM_ORDER: OrderEvent,
-            MessageTypes.ORDER_REFUND: OrderEvent,
-            MessageTypes.ORDER_REOPENED: OrderEvent,
-            MessageTypes.NEW_REVIEW: OrderEvent,
-            MessageTypes.REVIEW_DELETED: OrderEvent,
-            MessageTypes.REVIEW_CHANGED: OrderEvent,
-            MessageTypes.REVIEW_RESPONSE_EDITED: OrderEvent,
-            MessageTypes.REVIEW_RESPONSE_CREATED: OrderEvent,
-            MessageTypes.REVIEW_RESPONSE_DELETED: OrderEvent,
-            MessageTypes.BLACKLIST_YOU_REMOVED: ServiceMessageEvent,
-            MessageTypes.BLACKLIST_USER_REMOVED: ServiceMessageEvent,
-            MessageTypes.BLACKLIST_YOU_ADDED: ServiceMessageEvent,
-            MessageTypes.BLACKLIST_USER_ADDED: ServiceMessageEvent,
-        }
-
-        self.add_handler(
-            SocketTypes.NEW_MESSAGE,
-            handler_filter=lambda msg, *args: msg.startswith("42/chats"),
-        )(self.msg_process)
-        self.add_handler(
-            SocketTypes.NEW_MESSAGE,
-            handler_filter=lambda msg, *args: msg == "2",
-        )(lambda _, ws: ws.send("3"))
-
-    @staticmethod
-    def handling(handler: list[Callable[[Any], None] | dict], *args) -> None:
+    def handling(
+        self, handler: list[Callable[[Any], None] | dict], *args
+    ) -> None:
         """
-        Вызывает хэндлер с переданными аргументами
+        Проверяет фильтры хэндлера и ставит его вызов с переданными аргументами в пул потоков
 
         :param handler: Хэндлер который будет обрабатывать
         :param args: Аргументы к этому хэндлеру
 
         :return: None
+
+        :raise QueueFullError: Если очередь пула переполнена (OverflowPolicies.REJECT) либо переполнен её буфер ожидания
+        """
+
+        if self.check_filters(handler, *args):
+            self.pool.submit(
+                self.profiler.run,
+                handler[0].__name__,
+                handler[0],
+                *args,
+                block=False,
+            )
+
+    @staticmethod
+    def check_filters(
+        handler: list[Callable[[Any], None] | dict], *args
+    ) -> bool:
+        """
+        Проверяет фильтры хэндлера
+
+        :param handler: Хэндлер
+        :param args: Аргументы к этому хэндлеру
+
+        :return: True, если хэндлер нужно вызвать
         """
 
         if handler[1] is None:
-            threading.Thread(target=handler[0], args=args).start()
+            return True
+        elif not isinstance(handler[1], (list, tuple, set)):
+            return bool(handler[1](*args, **handler[2]))
         else:
-            if not isinstance(handler[1], (list, tuple, set)):
-                if handler[1](*args, **handler[2]):
-                    threading.Thread(target=handler[0], args=args).start()
-            else:
-                if all([h(*args, **handler[2]) for h in handler[1]]):
-                    threading.Thread(target=handler[0], args=args).start()
-
-    def add_handler(
+            return all(h(*args, **handler[2]) for h in handler[1])
+
+    def msg_process(
         self,
-        handler_type: MessageTypes | SocketTypes,
-        handler_filter: list[Callable] | Callable | None = None,
-        **kwargs: object,
-    ) -> Callable[[Any], None]:
+        msg: str | Packet | dict[str, Any],
+        _: WebSocketApp,
+        seq: int | None = None,
+    ) -> bool:
         """
-        Добавляет хэндлер
+        Вызывается при новом сообщении в веб-сокете, и в случае если это новое событие на Starvell, определяет событие, и вызывает все привязанные к этому событию хэндлеры (функции)
+
+        Запросы к Starvell здесь не выполняются: детали заказа запрашивает OrderEnricher в своих потоках, а событие ставится в пул потоков с ключом очерёдности (partition_key)
+
+        Хэндлеры (функции) выполняются в пуле потоков Runner'а
+
+        :param _: WebSocketApp
+        :param msg: Сообщение с веб-сокета, разобранный пакет либо данные сообщения (при восстановлении после обрыва)
+        :param seq: Номер кадра в журнале, он отмечается обработанным после вызова хэндлеров
 
-        Примеры:
+        :return: True, если событие поставлено в обработку
+        """
 
-        ``@add_handler(MessageTypes.NEW_MESSAGE)``
+        return self._receive(msg, seq)
 
-        ``@add_handler(SocketTypes.NEW_MESSAGE)``
+    def _fetch_details(self, order_id: str) -> Future:
+        return self.enricher.fetch(order_id)
 
-        :param handler_type: MessageTypes либо SocketTypes
-        :param handler_filter: Функция-фильтр, указывать необязательно, в случае если эта функция вернёт False, хэндлер не сработает
+    def _submit(
+        self,
+        dict_with_data: dict[str, Any],
+        details: Future | None,
+        seq: int | None,
+        timings: list[float] | None,
+        trace: tuple[Span, Span] | None,
+        key: Hashable,
+    ) -> bool:
+        return self.pool.submit(
+            self.dispatch,
+            dict_with_data,
+            details,
+            seq,
+            timings,
+            trace,
+            key=key,
+            block=False,
+        )
 
-        :return: Callable
+    def dispatch(
+        self,
+        dict_with_data: dict[str, Any],
+        details: Future | None = None,
+        seq: int | None = None,
+        timings: list[float] | None = None,
+        trace: tuple[Span, Span] | None = None,
+    ) -> None:
         """
+        Дожидается деталей заказа (если нужны), собирает событие и по очереди вызывает все привязанные к нему хэндлеры
 
-        def decorator(func):
-            self.handlers[handler_type].append([func, handler_filter, kwargs])
-            return func
+        Выполняется в пуле потоков, события с одним ключом очерёдности - строго в порядке получения
 
-        return decorator
+        :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+        :param details: Future с деталями заказа от OrderEnricher'а
+        :param seq: Номер кадра в журнале
+        :param timings: Время получения события и окончания предыдущего этапа (time.perf_counter), для замера этапов
+        :param trace: Спан события и спан ожидания в очереди (если событие трассируется)
 
-    def msg_process(self, msg: str, _: WebSocketApp) -> None:
+        :return: None
         """
-        Вызывается при новом сообщении в веб-сокете, и в случае если это новое событие на Starvell, определяет событие, и вызывает все привязанные к этому событию хэндлеры (функции)
 
-        Каждый хэндлер (функция), вызывается в отдельном потоке
+        span = self._dequeue(trace)
 
-        :param _: WebSocketApp
-        :param msg: Сообщение с веб-сокета
+        try:
+            with self._activate(span), self.profiler.dispatching():
+                self.__dispatch(dict_with_data, details, timings, span)
+        finally:
+            self._complete(dict_with_data, seq, span)
+
+    def __dispatch(
+        self,
+        dict_with_data: dict[str, Any],
+        details: Future | None,
+        timings: list[float] | None,
+        span: Span | None,
+    ) -> None:
+        self._lap(timings, "queue")
+
+        if details is not None:
+            with self._trace("runner.details"):
+                details.exception()
+
+        data = self._build(dict_with_data, details, timings, span)
+
+        if data is None:
+            return
+
+        for handler in self.handlers[dict_with_data["type"]]:
+            try:
+                with self._trace(f"handler {handler[0].__name__}"):
+                    if self.check_filters(handler, data):
+                        self.profiler.run(
+                            handler[0].__name__, handler[0], data
+                        )
+            # ошибка фильтра либо хэндлера не мешает остальным хэндлерам
+            except Exception as e:  # noqa: BLE001
+                print(f"Ошибка в хэндлере {handler[0].__name__}: {e}")
+
+        self._lap(timings, "handlers", total=True)
+
+    def recover(self, gap: Gap) -> None:
+        """
+        Восстанавливает события, пропущенные во время обрыва веб-сокета: по get_chats() находит чаты, последнее сообщение которых новее курсора чата (а не по счётчику непрочитанных - см. GapRecovery.affected_chats), запрашивает историю только этих чатов (до курсора, но не больше max_history_limit сообщений) и прогоняет пропущенные сообщения через msg_process (повторы отсеиваются)
+
+        Вызывается после переподключения в пуле потоков Runner'а, новые события затронутых чатов до постановки их пропущенных сообщений откладываются
+
+        :param gap: Состояние на момент переподключения (GapRecovery.begin())
 
         :return: None
         """
 
+        steps = self._recover(gap)
+
         try:
-            dict_with_data = identify_ws_starvell_message(msg, self.acc)
-
-            if not dict_with_data:
-                return
-            if dict_with_data.get("order") and dict_with_data["order"].get(
-                "offerDetails"
-            ):
-                offer = dict_with_data["order"]["offerDetails"]
-                dict_with_data["order"]["offerDetails"]["full_lot_title"] = (
-                    get_full_lot_title(offer, dict_with_data["order"])
-                )
-
-            data = self.event_types[dict_with_data["type"]].model_validate(
-                dict_with_data
-            )
+            call = next(steps)
 
-            for handler in self.handlers[dict_with_data["type"]]:
+            while True:
                 try:
-                    self.handling(handler, data)
-                except Exception as e:
-                    print(f"Ошибка в хэндлере {handler[0].__name__}: {e}")
-
-        except Exception as e:
-            raise HandlerError(str(e))
+                    result = getattr(self.acc, call[0])(*call[1])
+                except self._request_errors as e:
+                    call = steps.throw(e)
+                else:
+                    call = steps.send(result)
+        except StopIteration:
+            pass
+        finally:
+            steps.close()
 
     def on_open_process(self, ws: WebSocketApp) -> None:
         """
         Вызывается при открытии веб-сокета, и вызывает все привязанные к этому событию хэндлере
 
-        Каждый хэндлер (функция), вызывается в отдельном потоке
+        Хэндлеры (функции) выполняются в пуле потоков Runner'а
 
         :param ws: WebSocketApp
 
@@ -178,13 +291,13 @@ class Runner:
             try:
                 self.handling(func, ws)
             except Exception as e:
-                raise HandlerError(str(e))
+                raise HandlerError(str(e)) from e
 
     def on_new_message(self, ws: WebSocketApp, msg: str) -> None:
         """
         Вызывается при новом сообщении в веб-сокете, и вызывает все привязанные к этому событию хэндлеры (Не путать с новым сообщением на Starvell)
 
-        Каждый хэндлер (функция), вызывается в отдельном потоке
+        Хэндлеры (функции) выполняются в пуле потоков Runner'а
 
         :param ws: WebSocketApp
         :param msg: Сообщение веб-сокета (Строка)
@@ -192,8 +305,103 @@ class Runner:
         :return: None
         """
 
+        if self.journal is not None:
+            # предыдущий кадр не разобрался как пакет - обрабатывать нечего
+            self._commit_frame(self.__take_frame())
+            self.__frame.seq = self.journal.append(msg)
+
         for func in self.handlers[SocketTypes.NEW_MESSAGE]:
             try:
                 self.handling(func, msg, ws)
             except Exception as e:
-                raise HandlerError(str(e))
+                raise HandlerError(str(e)) from e
+
+    def on_packet(self, ws: WebSocketApp, packet: Packet) -> None:
+        """
+        Вызывается для каждого разобранного пакета веб-сокета: события message_created передаются в msg_process, остальные события - хэндлерам по названию события (add_event_handler)
+
+        События Starvell разбираются сразу в потоке веб-сокета, хэндлеры (функции) выполняются в пуле потоков Runner'а
+
+        :param ws: WebSocketApp
+        :param packet: Разобранный пакет
+
+        :return: None
+        """
+
+        seq = self.__take_frame()
+        dispatched = False
+
+        try:
+            dispatched = self.__route(ws, packet, seq)
+        finally:
+            if not dispatched:
+                self._commit_frame(seq)
+
+    def replay_journal(self) -> int:
+        """
+        Повторно обрабатывает кадры из журнала, обработка которых не завершилась в прошлый запуск (например из-за падения программы)
+
+        Вызывается автоматически в потоке веб-сокета перед первым событием Starvell, либо явно - после добавления хэндлеров. Повторно вызываются хэндлеры событий Starvell (message_created), остальные кадры просто отмечаются обработанными. Выполняется один раз, повторные вызовы ничего не делают
+
+        :return: Кол-во кадров, поставленных в обработку
+        """
+
+        with self.__replay_lock:
+            frames, self.__backlog = self.__backlog, None
+
+            return self._replay(frames or [])
+
+    def __on_drop(self, func: Callable, args: tuple) -> None:
+        if func == self.dispatch:
+            dict_with_data, _, seq, _, trace = args
+            self._drop(dict_with_data, seq, trace)
+        elif func == self.recover:
+            self._release_events(args[0])
+
+    def __take_frame(self) -> int | None:
+        seq = getattr(self.__frame, "seq", None)
+        self.__frame.seq = None
+
+        return seq
+
+    def __route(
+        self, ws: WebSocketApp, packet: Packet, seq: int | None
+    ) -> bool:
+        dispatched = False
+
+        if packet.event == "message_created" and packet.namespace == "/chats":
+            # кадры прошлого запуска обрабатываются раньше новых событий
+            if self.__backlog is not None:
+                self.replay_journal()
+
+            dispatched = self.msg_process(packet, ws, seq)
+        elif (
+            packet.eio_type == EngineIOPacketTypes.OPEN
+            and self.socket.heartbeat.reconnects
+        ):
+            # состояние запоминается до первого события нового соединения, а события нового соединения ждут восстановления своих чатов
+            gap = self.recovery.begin()
+            self._hold_events(gap)
+            submitted = False
+
+            try:
+                submitted = self.pool.submit(self.recover, gap, block=False)
+            finally:
+                if not submitted:
+                    self._release_events(gap)
+
+        for func in self.event_handlers.get(
+            (packet.namespace, packet.event), ()
+        ):
+            try:
+                self.handling(func, packet)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+        for func in self.handlers[SocketTypes.PACKET]:
+            try:
+                self.handling(func, packet, ws)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+        return dispatched
@@ -0,0 +1,304 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+
+class JournalFrame(NamedTuple):
+    """
+    Кадр веб-сокета из журнала
+    """
+
+    seq: int
+    """Порядковый номер кадра"""
+    received_at: float
+    """Время получения (unix time)"""
+    frame: str
+
+
+class Journal:
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        fsync_interval: float = 1.0,
+        max_segments: int | None = 16,
+    ):
+        """
+        Журнал кадров веб-сокета: только дозапись, с разбиением на сегменты
+
+        Каждый кадр пишется до обработки, с временем получения и порядковым номером, после обработки события дописывается отметка о завершении. После падения uncommitted() возвращает кадры без отметки - их обработка возобновляется с первого такого кадра
+
+        Запись не блокирует поток веб-сокета: кадры копятся в памяти и пишутся одной пачкой в отдельном потоке раз в fsync_interval секунд, после чего вызывается fsync (при падении теряются кадры максимум за fsync_interval секунд)
+
+        :param directory: Папка журнала
+        :param segment_size: Размер сегмента в байтах, после которого начинается новый сегмент
+        :param fsync_interval: Как часто записывать пачку кадров на диск, в секундах
+        :param max_segments: Сколько сегментов хранить (удаляются только полностью обработанные), None - хранить все
+        """
+
+        self.directory: str = directory
+        self.segment_size: int = segment_size
+        self.fsync_interval: float = fsync_interval
+        self.max_segments: int | None = max_segments
+
+        self.written: int = 0
+        self.committed: int = 0
+        self.batches: int = 0
+        self.max_batch: int = 0
+        self.fsync_time: float = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+
+        # [первый кадр, последний кадр (0 - кадров ещё нет), путь], номера кадров реально записанных в сегмент
+        self.__segments: list[list[Any]] = []
+        # последний записанный на диск кадр (меняется только при записи)
+        self.__last_written: int = 0
+        self.__pending: set[int] = set()
+        self.__seq: int = 0
+        self.__buffer: list[tuple[int, float, str] | int] = []
+        self.__lock = threading.Lock()
+        self.__write_lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__closed: bool = False
+        # текущий сегмент и его размер, файл открывается на время записи пачки
+        self.__path: str | None = None
+        self.__size: int = 0
+
+        self.__recover()
+        self.__thread = threading.Thread(
+            target=self.__write_loop, name="starvell-journal", daemon=True
+        )
+        self.__thread.start()
+        atexit.register(self.close)
+
+    def append(self, frame: str) -> int:
+        """
+        Добавляет кадр в журнал (в памяти, на диск он попадёт со следующей пачкой)
+
+        :param frame: Кадр веб-сокета
+
+        :return: Порядковый номер кадра (передаётся в done() после обработки)
+        """
+
+        with self.__lock:
+            self.__seq += 1
+            self.__pending.add(self.__seq)
+            self.__buffer.append((self.__seq, time.time(), frame))
+
+            return self.__seq
+
+    def done(self, seq: int) -> None:
+        """
+        Отмечает кадр обработанным
+
+        :param seq: Порядковый номер кадра (результат append)
+
+        :return: None
+        """
+
+        with self.__lock:
+            if seq in self.__pending:
+                self.__pending.discard(seq)
+                self.__buffer.append(seq)
+
+    def uncommitted(self) -> list[JournalFrame]:
+        """
+        Кадры, обработка которых не была завершена (например из-за падения программы), в порядке получения
+
+        :return: Список JournalFrame
+        """
+
+        with self.__lock:
+            pending = set(self.__pending)
+
+        return [f for f in self.__read() if f.seq in pending]
+
+    def flush(self) -> None:
+        """
+        Немедленно записывает накопленные кадры на диск (с fsync)
+
+        :return: None
+        """
+
+        with self.__write_lock:
+            with self.__lock:
+                batch, self.__buffer = self.__buffer, []
+
+            self.__write(batch)
+
+    def close(self) -> None:
+        """
+        Записывает оставшиеся кадры и закрывает журнал
+
+        :return: None
+        """
+
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__wakeup.set()
+        self.__thread.join()
+        self.flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика журнала
+
+        :return: Словарь (кол-во записанных и обработанных кадров, необработанных кадров, сегментов, размер пачек, время fsync)
+        """
+
+        with self.__lock:
+            return {
+                "written": self.written,
+                "committed": self.committed,
+                "pending": len(self.__pending),
+                "buffered": len(self.__buffer),
+                "segments": len(self.__segments),
+                "batches": self.batches,
+                "max_batch": self.max_batch,
+                "avg_fsync": self.fsync_time / self.batches
+                if self.batches
+                else 0.0,
+            }
+
+    def __recover(self) -> None:
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith("journal-") and name.endswith(".jsonl"):
+                first = int(name[len("journal-") : -len(".jsonl")])
+                self.__segments.append([
+                    first,
+                    0,
+                    os.path.join(self.directory, name),
+                ])
+
+        done = set()
+
+        for segment in self.__segments:
+            for record in self.__segment_records(segment[2]):
+                if "done" in record:
+                    done.add(record["done"])
+                else:
+                    segment[1] = max(segment[1], record["seq"])
+                    self.__pending.add(record["seq"])
+
+            self.__seq = max(self.__seq, segment[1])
+
+        self.__pending -= done
+        self.__last_written = self.__seq
+
+    def __records(self) -> Iterator[dict[str, Any]]:
+        for _, _, path in list(self.__segments):
+            yield from self.__segment_records(path)
+
+    @staticmethod
+    def __segment_records(path: str) -> Iterator[dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # недописанная строка (падение во время записи)
+                        continue
+        except FileNotFoundError:
+            return
+
+    def __read(self) -> Iterator[JournalFrame]:
+        for record in self.__records():
+            if "seq" in record:
+                yield JournalFrame(
+                    record["seq"], record["ts"], record["frame"]
+                )
+
+    def __write_loop(self) -> None:
+        while not self.__closed:
+            self.__wakeup.wait(self.fsync_interval)
+
+            if self.__closed:
+                return
+
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Ошибка записи журнала: {e}")
+
+    def __write(self, batch: list[tuple[int, float, str] | int]) -> None:
+        if not batch:
+            return
+
+        frames = [item[0] for item in batch if isinstance(item, tuple)]
+
+        if self.__path is None or self.__size >= self.segment_size:
+            # сегмент называется первым кадром, который в него попадёт
+            self.__rotate(frames[0] if frames else self.__last_written + 1)
+
+        lines = []
+        written = committed = 0
+
+        for item in batch:
+            if isinstance(item, tuple):
+                seq, received_at, frame = item
+                lines.append(
+                    json.dumps(
+                        {"seq": seq, "ts": received_at, "frame": frame},
+                        ensure_ascii=False,
+                    )
+                )
+                written += 1
+            else:
+                lines.append(f'{{"done": {item}}}')
+                committed += 1
+
+        started = time.perf_counter()
+
+        with open(self.__path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self.__size = f.tell()
+
+        elapsed = time.perf_counter() - started
+
+        if frames:
+            self.__segments[-1][1] = frames[-1]
+            self.__last_written = frames[-1]
+
+        with self.__lock:
+            self.written += written
+            self.committed += committed
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(batch))
+            self.fsync_time += elapsed
+
+    def __rotate(self, first_seq: int) -> None:
+        path = os.path.join(self.directory, f"journal-{first_seq:012d}.jsonl")
+
+        if not self.__segments or self.__segments[-1][2] != path:
+            self.__segments.append([first_seq, 0, path])
+
+        self.__path = path
+        self.__size = os.path.getsize(path) if os.path.exists(path) else 0
+        self.__cleanup()
+
+    def __cleanup(self) -> None:
+        if self.max_segments is None:
+            return
+
+        with self.__lock:
+            oldest_pending = min(self.__pending, default=None)
+
+        # сегмент можно удалить, только если все его кадры обработаны (последний кадр сегмента старше первого необработанного)
+        while len(self.__segments) > max(self.max_segments, 1) and (
+            oldest_pending is None or self.__segments[0][1] < oldest_pending
+        ):
+            _, _, path = self.__segments.pop(0)
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,291 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from starvell.enums import OverflowPolicies
+from starvell.errors import QueueFullError
+
+_Task = tuple[Callable, tuple, float]
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        workers: int = 8,
+        queue_size: int = 1000,
+        overflow: OverflowPolicies = OverflowPolicies.BLOCK,
+        spill_size: int = 10000,
+    ) -> None:
+        """
+        Пул потоков для хэндлеров Runner'а: фиксированное кол-во потоков и ограниченная очередь событий
+
+        Задачи с одинаковым ключом (например ID чата) выполняются строго по очереди, в порядке постановки, задачи с разными ключами - параллельно
+
+        :param workers: Кол-во потоков
+        :param queue_size: Максимальное кол-во задач в очереди
+        :param overflow: Что делать при переполнении очереди (ждать, выкинуть самую старую задачу, отклонить новую)
+        :param spill_size: Сколько задач может ждать места в очереди при ``submit(block=False)`` и политике OverflowPolicies.BLOCK (так Runner ставит события из потока веб-сокета, не останавливая чтение кадров и ответы на ping)
+        """
+
+        self.workers: int = workers
+        self.queue_size: int = queue_size
+        self.overflow: OverflowPolicies = overflow
+        self.spill_size: int = spill_size
+        # вызываются с (func, args) задачи, выкинутой политикой DROP_OLDEST
+        self.drop_handlers: list[Callable[[Callable, tuple], None]] = []
+
+        self.submitted: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.dropped: int = 0
+        self.rejected: int = 0
+        self.spilled: int = 0
+        self.max_queue_depth: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self.total_run: float = 0.0
+        self.max_run: float = 0.0
+
+        # очередь готовых к выполнению элементов: (None, задача) либо (ключ, None) - очередь ключа
+        self.__ready: deque[tuple[Hashable | None, _Task | None]] = deque()
+        # задачи каждого ключа, ключ есть в словаре, пока у него есть задачи в очереди или выполняемая задача
+        self.__partitions: dict[Hashable, deque[_Task]] = {}
+        self.__depth: int = 0
+        # задачи, ожидающие места в очереди (submit(block=False)), в порядке постановки
+        self.__spill: deque[tuple[Hashable, _Task]] = deque()
+        self.__cond = threading.Condition()
+        self.__threads: list[threading.Thread] = []
+        self.__closed: bool = False
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Кол-во задач, ожидающих свободный поток
+        """
+
+        return self.__depth
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: Hashable = None,
+        block: bool = True,
+    ) -> bool:
+        """
+        Ставит вызов хэндлера в очередь
+
+        :param func: Хэндлер
+        :param args: Аргументы хэндлера
+        :param key: Ключ очерёдности (задачи с одним ключом не выполняются одновременно и сохраняют порядок), None - без ограничений
+        :param block: Ждать-ли места в очереди при политике OverflowPolicies.BLOCK (False - задача ждёт в буфере spill_size, а поток не останавливается)
+
+        :return: True, если задача поставлена в очередь, False - если пул остановлен
+
+        :raise QueueFullError: Если очередь переполнена и выбрана политика OverflowPolicies.REJECT, либо переполнен буфер ожидания (block=False)
+        """
+
+        dropped = None
+
+        with self.__cond:
+            if self.__closed:
+                return False
+
+            if not self.__threads:
+                self.__start()
+
+            task = (func, args, time.perf_counter())
+
+            if self.overflow == OverflowPolicies.BLOCK and (
+                self.__depth >= self.queue_size or self.__spill
+            ):
+                if not block:
+                    return self.__spill_task(key, task)
+
+                self.__cond.wait_for(
+                    lambda: (
+                        (self.__depth < self.queue_size and not self.__spill)
+                        or self.__closed
+                    )
+                )
+                if self.__closed:
+                    return False
+            elif self.__depth >= self.queue_size:
+                if self.overflow == OverflowPolicies.REJECT:
+                    self.rejected += 1
+                    raise QueueFullError(
+                        f"Очередь хэндлеров переполнена ({self.queue_size})"
+                    )
+
+                dropped = self.__drop_oldest()
+
+            self.__enqueue(key, task)
+
+        if dropped is not None:
+            for handler in self.drop_handlers:
+                handler(dropped[0], dropped[1])
+
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Останавливает пул, задачи, уже стоящие в очереди, будут выполнены
+
+        :param wait: Ждать-ли завершения потоков
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+
+        if wait:
+            for thread in self.__threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Метрики пула
+
+        :return: Словарь (глубина очереди, кол-во выполненных / выкинутых / отклонённых задач, время ожидания и выполнения)
+        """
+
+        with self.__cond:
+            finished = self.completed + self.failed
+
+            return {
+                "workers": self.workers,
+                "queue_depth": self.__depth,
+                "max_queue_depth": self.max_queue_depth,
+                "partitions": len(self.__partitions),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "spilled": self.spilled,
+                "spill_depth": len(self.__spill),
+                "avg_wait": self.total_wait / finished if finished else 0.0,
+                "max_wait": self.max_wait,
+                "avg_run": self.total_run / finished if finished else 0.0,
+                "max_run": self.max_run,
+            }
+
+    def __start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self.__work, name=f"starvell-handler-{i}", daemon=True
+            )
+            thread.start()
+            self.__threads.append(thread)
+
+    def __enqueue(self, key: Hashable, task: _Task) -> None:
+        if key is None:
+            self.__ready.append((None, task))
+        elif key in self.__partitions:
+            self.__partitions[key].append(task)
+        else:
+            self.__partitions[key] = deque([task])
+            self.__ready.append((key, None))
+
+        self.__depth += 1
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.__depth)
+        self.__cond.notify_all()
+
+    def __spill_task(self, key: Hashable, task: _Task) -> bool:
+        if len(self.__spill) >= self.spill_size:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Очередь хэндлеров переполнена ({self.queue_size}), "
+                f"буфер ожидания тоже ({self.spill_size})"
+            )
+
+        self.__spill.append((key, task))
+        self.spilled += 1
+
+        return True
+
+    def __drain_spill(self) -> None:
+        # освободившиеся места занимают задачи из буфера, в порядке постановки
+        while self.__spill and self.__depth < self.queue_size:
+            self.__enqueue(*self.__spill.popleft())
+
+    def __drop_oldest(self) -> _Task:
+        if self.__ready:
+            key, task = self.__ready[0]
+
+            if task is not None:
+                self.__ready.popleft()
+            else:
+                partition = self.__partitions[key]
+                task = partition.popleft()
+
+                if not partition:
+                    self.__ready.popleft()
+                    del self.__partitions[key]
+        else:
+            # все задачи в очередях ключей, которые сейчас выполняются
+            task = next(p for p in self.__partitions.values() if p).popleft()
+
+        self.__depth -= 1
+        self.dropped += 1
+
+        return task
+
+    def __work(self) -> None:
+        while True:
+            with self.__cond:
+                self.__cond.wait_for(lambda: self.__ready or self.__closed)
+
+                if not self.__ready:
+                    return
+
+                key, task = self.__ready.popleft()
+
+                if task is None:
+                    task = self.__partitions[key].popleft()
+
+                self.__depth -= 1
+                self.__drain_spill()
+                self.__cond.notify_all()
+
+            func, args, enqueued_at = task
+            started = time.perf_counter()
+            failed = False
+
+            try:
+                func(*args)
+            # ошибка хэндлера не должна останавливать поток пула
+            except Exception as e:  # noqa: BLE001
+                failed = True
+                print(
+                    f"Ошибка в хэндлере {getattr(func, '__name__', func)}: {e}"
+                )
+
+            finished = time.perf_counter()
+
+            with self.__cond:
+                wait, run = started - enqueued_at, finished - started
+
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_run += run
+                self.max_run = max(self.max_run, run)
+
+                if key is not None:
+                    if self.__partitions[key]:
+                        # следующая задача ключа встаёт в конец общей очереди, чтобы не занимать поток
+                        self.__ready.append((key, None))
+                        self.__cond.notify_all()
+                    else:
+                        del self.__partitions[key]
@@ -0,0 +1,490 @@
+import cProfile
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from collections.abc import Awaitable, Callable, Generator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any
+
+from .stages import StageTimer
+
+PROFILE_MODES: tuple[str, ...] = ("cprofile", "sampling")
+# с Python 3.12 включённый cProfile профилирует все потоки, а включить второй нельзя (ValueError) - поэтому профиль один на процесс
+_PROCESS_PROFILE: bool = sys.version_info >= (3, 12)
+
+
+class _Call:
+    __slots__ = ("coro", "name", "reported", "started", "thread")
+
+    def __init__(self, name: str, thread: int | None, coro: Any = None):
+        self.name: str = name
+        self.started: float = time.perf_counter()
+        # поток, в котором выполняется хэндлер, либо корутина (async хэндлер)
+        self.thread: int | None = thread
+        self.coro: Any = coro
+        self.reported: bool = False
+
+
+class _Handler:
+    __slots__ = ("count", "errors", "exceptions", "last_error", "slow")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.exceptions: dict[str, int] = {}
+        self.last_error: str | None = None
+        self.slow: int = 0
+
+
+class _Session:
+    __slots__ = (
+        "dispatched",
+        "mode",
+        "profiles",
+        "running",
+        "samples",
+        "threads",
+    )
+
+    def __init__(self, mode: str) -> None:
+        self.mode: str = mode
+        self.profiles: dict[int, cProfile.Profile] = {}
+        self.samples: Counter[str] = Counter()
+        # потоки, которые сейчас обрабатывают событие (ident: вложенность)
+        self.threads: dict[int, int] = {}
+        self.running: int = 0
+        self.dispatched: int = 0
+
+
+def _coro_frames(coro: Any) -> list[FrameType]:
+    # цепочка await'ов корутины, от внешней к внутренней
+    frames = []
+
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(
+            coro, "gi_frame", None
+        )
+
+        if frame is not None:
+            frames.append(frame)
+
+        coro = getattr(coro, "cr_await", None) or getattr(
+            coro, "gi_yieldfrom", None
+        )
+
+    return frames
+
+
+def _folded(frame: FrameType) -> str:
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} "
+            f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class HandlerProfiler:
+    def __init__(
+        self,
+        budget: float | None = 1.0,
+        stack_depth: int = 20,
+        samples: int = 10000,
+    ):
+        """
+        Замер хэндлеров Runner'а / AsyncRunner'а: время выполнения, процессорное время и исключения по названию хэндлера, а также поиск медленных хэндлеров
+
+        Хэндлер, который выполняется дольше budget, выводится вместе со снимком его стека, снятым, пока он ещё выполняется (отдельный поток проверяет выполняющиеся хэндлеры 4 раза за budget). Процессорное время замеряется только у обычных хэндлеров (у async хэндлеров его делят все задачи event loop'а)
+
+        Через profile() можно на N секунд включить cProfile либо сэмплирующий профайлер над обработкой событий и получить файл профиля
+
+        :param budget: Сколько секунд может выполняться хэндлер, None - не искать медленные хэндлеры
+        :param stack_depth: Сколько последних кадров стека выводить у медленного хэндлера
+        :param samples: Сколько замеров каждого хэндлера хранить для перцентилей
+        """
+
+        self.budget: float | None = budget
+        self.stack_depth: int = stack_depth
+
+        self.__wall = StageTimer(samples)
+        self.__cpu = StageTimer(samples)
+        self.__handlers: dict[str, _Handler] = {}
+        self.__calls: dict[int, _Call] = {}
+        self.__ids = itertools.count()
+        self.__session: _Session | None = None
+        self.__cond = threading.Condition()
+        self.__watchdog: threading.Thread | None = None
+
+    def run(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Вызывает хэндлер и замеряет его (исключение хэндлера записывается и пробрасывается дальше)
+
+        :param name: Название хэндлера
+        :param func: Хэндлер
+        :param args: Аргументы хэндлера
+
+        :return: Результат хэндлера
+        """
+
+        call_id = self.__begin(_Call(name, threading.get_ident()))
+        cpu = time.thread_time()
+        error = None
+
+        try:
+            return func(*args)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.__cpu.record(name, time.thread_time() - cpu)
+            self.__end(call_id, error)
+
+    async def run_async(
+        self, name: str, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """
+        Асинхронная версия run() для ``async def`` хэндлеров (процессорное время не замеряется)
+
+        :param name: Название хэндлера
+        :param func: Хэндлер
+        :param args: Аргументы хэндлера
+
+        :return: Результат хэндлера
+        """
+
+        coro = func(*args)
+        call_id = self.__begin(_Call(name, None, coro))
+        error = None
+
+        try:
+            return await coro
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.__end(call_id, error)
+
+    @contextmanager
+    def dispatching(self) -> Generator[None, None, None]:
+        """
+        Отмечает обработку одного события: если запущен profile(), она попадает в профиль
+
+        :return: Контекстный менеджер
+        """
+
+        session = self.__session
+
+        if session is None:
+            yield
+            return
+
+        ident = threading.get_ident()
+
+        with self.__cond:
+            session.running += 1
+            session.dispatched += 1
+            depth = session.threads.get(ident, 0)
+            session.threads[ident] = depth + 1
+
+        try:
+            # до 3.12 - один профиль на поток, включён, пока поток обрабатывает хотя бы одно событие (в AsyncRunner события обрабатываются одновременно в одном потоке)
+            if (
+                session.mode == "cprofile"
+                and not _PROCESS_PROFILE
+                and not depth
+            ):
+                self.__enable(session, ident)
+
+            yield
+        finally:
+            with self.__cond:
+                session.threads[ident] -= 1
+                depth = session.threads[ident]
+
+                if not depth:
+                    del session.threads[ident]
+
+            if not depth and ident in session.profiles:
+                session.profiles[ident].disable()
+
+            # профиль записывается, когда все начатые события обработаны, а профайлеры выключены
+            with self.__cond:
+                session.running -= 1
+                self.__cond.notify_all()
+
+    def profile(
+        self,
+        seconds: float,
+        path: str,
+        mode: str = "cprofile",
+        interval: float = 0.005,
+    ) -> Future:
+        """
+        Профилирует обработку событий в течение seconds секунд в отдельном потоке и записывает профиль в файл
+
+        cprofile - профиль cProfile (pstats, открывается через ``python -m pstats`` либо snakeviz), в него попадают все вызовы при обработке событий (с Python 3.12 - все вызовы процесса за это время: cProfile включается один на все потоки). sampling - раз в interval секунд снимается стек потоков, которые обрабатывают события, файл - свёрнутые стеки ("f1;f2;f3 кол-во", для flamegraph.pl / speedscope), почти не замедляет обработку
+
+        :param seconds: Сколько секунд профилировать
+        :param path: Путь к файлу профиля
+        :param mode: cprofile либо sampling
+        :param interval: Интервал снятия стеков в режиме sampling, в секундах
+
+        :return: Future с путём к файлу, выполняется после записи профиля
+
+        :raise ValueError: Если режим неизвестен, либо профилирование уже запущено (если cProfile не включился, например уже запущен другой профайлер, исключение будет в Future)
+        """
+
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Неизвестный режим профилирования: {mode}")
+
+        with self.__cond:
+            if self.__session is not None:
+                raise ValueError("Профилирование уже запущено")
+
+            session = self.__session = _Session(mode)
+
+        future = Future()
+        threading.Thread(
+            target=self.__profile,
+            args=(session, seconds, path, interval, future),
+            name="starvell-profiler",
+            daemon=True,
+        ).start()
+
+        return future
+
+    def reset(self) -> None:
+        """
+        Удаляет все замеры
+
+        :return: None
+        """
+
+        self.__wall.reset()
+        self.__cpu.reset()
+
+        with self.__cond:
+            self.__handlers.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Статистика хэндлеров
+
+        :return: Словарь {хэндлер: {кол-во вызовов, ошибок, ошибки по типу исключения, последняя ошибка (traceback), медленных вызовов, время выполнения и процессорное время (кол-во, среднее, p50, p99, максимальное в секундах)}}
+        """
+
+        wall = self.__wall.snapshot()
+        cpu = self.__cpu.snapshot()
+
+        with self.__cond:
+            handlers = {
+                name: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "exceptions": dict(h.exceptions),
+                    "last_error": h.last_error,
+                    "slow": h.slow,
+                }
+                for name, h in self.__handlers.items()
+            }
+
+        for name, h in handlers.items():
+            h["wall"] = wall.get(name, {})
+            h["cpu"] = cpu.get(name, {})
+
+        return handlers
+
+    def __begin(self, call: _Call) -> int:
+        call_id = next(self.__ids)
+
+        with self.__cond:
+            self.__calls[call_id] = call
+
+            if self.budget is not None and self.__watchdog is None:
+                self.__watchdog = threading.Thread(
+                    target=self.__watch, name="starvell-watchdog", daemon=True
+                )
+                self.__watchdog.start()
+
+        return call_id
+
+    def __end(self, call_id: int, error: Exception | None) -> None:
+        with self.__cond:
+            call = self.__calls.pop(call_id)
+
+        wall = time.perf_counter() - call.started
+        slow = self.budget is not None and wall > self.budget
+        self.__wall.record(call.name, wall)
+
+        with self.__cond:
+            h = self.__handlers.get(call.name)
+
+            if h is None:
+                h = self.__handlers[call.name] = _Handler()
+
+            h.count += 1
+
+            if slow:
+                h.slow += 1
+
+            if error is not None:
+                kind = type(error).__name__
+                h.errors += 1
+                h.exceptions[kind] = h.exceptions.get(kind, 0) + 1
+                h.last_error = "".join(traceback.format_exception(error))
+
+        # стек уже выведен, пока хэндлер выполнялся
+        if slow and not call.reported:
+            print(
+                f"Медленный хэндлер {call.name}: {wall:.3f} с "
+                f"(бюджет {self.budget} с)"
+            )
+
+    def __watch(self) -> None:
+        while self.budget is not None:
+            with self.__cond:
+                self.__cond.wait(max(self.budget / 4, 0.01))
+
+                now = time.perf_counter()
+                late = [
+                    call
+                    for call in self.__calls.values()
+                    if not call.reported and now - call.started > self.budget
+                ]
+
+                for call in late:
+                    call.reported = True
+
+            if not late:
+                continue
+
+            frames = sys._current_frames()
+
+            for call in late:
+                print(
+                    f"Медленный хэндлер {call.name}: выполняется дольше "
+                    f"{self.budget} с, стек:\n{self.__stack(call, frames)}"
+                )
+
+        with self.__cond:
+            self.__watchdog = None
+
+    def __stack(self, call: _Call, frames: dict[int, FrameType]) -> str:
+        if call.coro is not None:
+            summary = traceback.StackSummary.extract(
+                (f, f.f_lineno)
+                for f in _coro_frames(call.coro)[-self.stack_depth :]
+            )
+        elif call.thread in frames:
+            summary = traceback.extract_stack(
+                frames[call.thread], self.stack_depth
+            )
+        else:
+            return "(хэндлер уже завершился)"
+
+        return "".join(summary.format())
+
+    def __profile(
+        self,
+        session: _Session,
+        seconds: float,
+        path: str,
+        interval: float,
+        future: Future,
+    ) -> None:
+        deadline = time.perf_counter() + seconds
+
+        try:
+            if session.mode == "sampling":
+                self.__sample(session, deadline, interval)
+                self.__stop(session, seconds)
+            elif _PROCESS_PROFILE:
+                profile = cProfile.Profile()
+                profile.enable()
+                session.profiles[threading.get_ident()] = profile
+
+                try:
+                    time.sleep(seconds)
+                    self.__stop(session, seconds)
+                finally:
+                    profile.disable()
+            else:
+                time.sleep(seconds)
+                self.__stop(session, seconds)
+
+            directory = os.path.dirname(path)
+
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            if session.mode == "sampling":
+                with open(path, "w", encoding="utf-8") as f:
+                    f.writelines(
+                        f"{stack} {n}\n"
+                        for stack, n in session.samples.most_common()
+                    )
+            elif not session.dispatched:
+                raise ValueError(
+                    "За время профилирования не обработано ни одного события"
+                )
+            elif not session.profiles:
+                raise ValueError("Не удалось включить cProfile")
+            else:
+                stats = pstats.Stats(*session.profiles.values())
+                stats.dump_stats(path)
+        except (OSError, ValueError) as e:
+            with self.__cond:
+                self.__session = None
+
+            future.set_exception(e)
+            return
+
+        future.set_result(path)
+
+    def __stop(self, session: _Session, timeout: float) -> None:
+        with self.__cond:
+            self.__session = None
+            # события, обработка которых уже началась, попадают в профиль целиком
+            self.__cond.wait_for(lambda: not session.running, timeout)
+
+    @staticmethod
+    def __enable(session: _Session, ident: int) -> None:
+        profile = session.profiles.get(ident) or cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError as e:
+            # профилирование уже включено другим инструментом - событие обрабатывается без профиля
+            print(f"Не удалось включить cProfile: {e}")
+            return
+
+        session.profiles[ident] = profile
+
+    def __sample(
+        self, session: _Session, deadline: float, interval: float
+    ) -> None:
+        me = threading.get_ident()
+
+        while time.perf_counter() < deadline:
+            with self.__cond:
+                threads = list(session.threads)
+
+            frames = sys._current_frames()
+
+            for ident in threads:
+                if ident != me and ident in frames:
+                    session.samples[_folded(frames[ident])] += 1
+
+            time.sleep(interval)
@@ -0,0 +1,252 @@
+import threading
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from starvell.types import ChatInfo
+
+
+class ChatCursor(NamedTuple):
+    """
+    Последнее обработанное событие чата
+    """
+
+    created_at: datetime
+    message_id: str
+
+
+class Gap(NamedTuple):
+    """
+    Состояние на момент переподключения: с каких пор у каждого чата могут быть пропущенные события
+    """
+
+    started_at: datetime
+    """Время последнего события до обрыва (для чатов, из которых ещё не было событий)"""
+    cursors: dict[str, ChatCursor]
+
+    def since(self, chat_id: str) -> datetime:
+        """
+        С какого момента у чата могут быть пропущенные сообщения
+
+        :param chat_id: ID Чата
+
+        :return: Время последнего события чата до обрыва, либо последнего события вообще
+        """
+
+        cursor = self.cursors.get(chat_id)
+
+        return cursor.created_at if cursor else self.started_at
+
+
+def _created_at(dict_with_data: dict[str, Any]) -> datetime | None:
+    value = dict_with_data.get("createdAt")
+
+    if not value:
+        return None
+
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+class GapRecovery:
+    def __init__(
+        self,
+        chats_limit: int = 20,
+        history_limit: int = 50,
+        max_history_limit: int = 1000,
+    ):
+        """
+        Запоминает последнее событие каждого чата, чтобы после переподключения веб-сокета дозапросить события, пришедшие во время обрыва
+
+        Сама запросы не делает: при переподключении Runner / AsyncRunner запоминает состояние (begin), запрашивает get_chats(), по ним выбирает чаты, в которых появились новые сообщения (affected_chats), запрашивает историю только этих чатов (увеличивая кол-во сообщений, пока история не дойдёт до последнего события чата до обрыва - reaches) и прогоняет пропущенные сообщения (missed) через обычный конвейер событий, где повторы отсеивает индекс дубликатов Runner'а (dedup)
+
+        :param chats_limit: Сколько чатов запрашивать за раз при поиске затронутых чатов
+        :param history_limit: Сколько последних сообщений запрашивать у затронутого чата
+        :param max_history_limit: Больше скольких сообщений истории не запрашивать (если пропущенных сообщений больше, восстанавливаются только последние, а чат учитывается в ``truncated``)
+        """
+
+        self.chats_limit: int = chats_limit
+        self.history_limit: int = history_limit
+        self.max_history_limit: int = max_history_limit
+
+        self.cursors: dict[str, ChatCursor] = {}
+        # время последнего события по часам Starvell (для чатов, из которых ещё не было событий)
+        self.watermark: datetime = datetime.now(timezone.utc)
+
+        self.recoveries: int = 0
+        self.recovered: int = 0
+        self.truncated: int = 0
+
+        self.__lock = threading.Lock()
+
+    def track(self, dict_with_data: dict[str, Any]) -> None:
+        """
+        Запоминает обработанное событие как последнее в его чате (вызывается после хэндлеров: событие, которое не успело обработаться до обрыва, будет восстановлено)
+
+        :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+
+        :return: None
+        """
+
+        chat_id = dict_with_data.get("chatId")
+        message_id = dict_with_data.get("id")
+
+        if not chat_id or not message_id:
+            return
+
+        with self.__lock:
+            created_at = _created_at(dict_with_data)
+
+            if created_at is not None:
+                cursor = self.cursors.get(chat_id)
+
+                if cursor is None or created_at >= cursor.created_at:
+                    self.cursors[chat_id] = ChatCursor(created_at, message_id)
+
+                self.watermark = max(self.watermark, created_at)
+
+    def begin(self) -> Gap:
+        """
+        Запоминает состояние на момент переподключения (вызывается до обработки новых событий)
+
+        :return: Gap
+        """
+
+        with self.__lock:
+            self.recoveries += 1
+
+            return Gap(self.watermark, dict(self.cursors))
+
+    def affected_chats(self, gap: Gap, chats: list[ChatInfo]) -> list[str]:
+        """
+        Выбирает чаты, в которых после последнего обработанного до обрыва события появились сообщения
+
+        Сравнивается время последнего сообщения чата с курсором чата, а не счётчик непрочитанных: счётчик сбрасывается, если чат прочитали с другого устройства, и не учитывает сообщения самого аккаунта (а это тоже события), поэтому по нему часть чатов с пропущенными событиями была бы пропущена
+
+        :param gap: Состояние на момент переподключения (результат begin)
+        :param chats: Чаты аккаунта (результат get_chats)
+
+        :return: Список ID затронутых чатов
+        """
+
+        return [
+            chat.id
+            for chat in chats
+            if chat.last_message.created_at > gap.since(chat.id)
+        ]
+
+    def exhausted(
+        self, gap: Gap, chats: list[ChatInfo], listed: set[str]
+    ) -> bool:
+        """
+        Можно-ли не запрашивать следующую страницу чатов (чаты отсортированы по последнему сообщению)
+
+        :param gap: Состояние на момент переподключения (результат begin)
+        :param chats: Последняя полученная страница чатов
+        :param listed: ID всех уже полученных чатов
+
+        :return: True, если дальше только чаты без сообщений после обрыва
+        """
+
+        if len(chats) < self.chats_limit:
+            return True
+
+        # у ещё не полученного чата пропущенные сообщения могут быть только новее его курсора
+        threshold = min(
+            (c.created_at for i, c in gap.cursors.items() if i not in listed),
+            default=gap.started_at,
+        )
+
+        return chats[-1].last_message.created_at <= threshold
+
+    def reaches(
+        self,
+        gap: Gap,
+        chat_id: str,
+        messages: list[dict[str, Any]],
+        limit: int,
+    ) -> bool:
+        """
+        Содержит-ли полученная история все пропущенные сообщения чата
+
+        :param gap: Состояние на момент переподключения (результат begin)
+        :param chat_id: ID Чата
+        :param messages: История чата (результат get_raw_chat)
+        :param limit: Сколько сообщений было запрошено
+
+        :return: True, если получена вся история чата, либо она доходит до последнего события чата до обрыва
+        """
+
+        if len(messages) < limit:
+            return True
+
+        since = gap.since(chat_id)
+
+        return any(
+            created_at is not None and created_at <= since
+            for created_at in map(_created_at, messages)
+        )
+
+    def missed(
+        self,
+        gap: Gap,
+        chat_id: str,
+        messages: list[dict[str, Any]],
+        complete: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Отбирает из истории чата сообщения, которые пришли после последнего обработанного до обрыва события (уже обработанные из них отсеет dedup Runner'а)
+
+        :param gap: Состояние на момент переподключения (результат begin)
+        :param chat_id: ID Чата
+        :param messages: История чата (результат get_raw_chat)
+        :param complete: Содержит-ли история все пропущенные сообщения (результат reaches), False - чат учитывается в ``truncated``
+
+        :return: Пропущенные сообщения в порядке отправки, в виде данных события message_created
+        """
+
+        since = gap.since(chat_id)
+        missed = []
+
+        with self.__lock:
+            for message in messages:
+                created_at = _created_at(message)
+
+                if created_at is not None and created_at <= since:
+                    continue
+
+                message.setdefault("chatId", chat_id)
+                message.setdefault("images", [])
+
+                # в истории автор может быть пустым (как и в get_chat), а роли - не указаны
+                if not message.get("author"):
+                    message["author"] = message.get("buyer")
+                if message.get("author") is not None:
+                    message["author"].setdefault("roles", [])
+
+                missed.append(message)
+
+            self.recovered += len(missed)
+
+            if not complete:
+                self.truncated += 1
+
+        missed.sort(key=lambda m: m.get("createdAt") or "")
+
+        return missed
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика восстановления
+
+        :return: Словарь (кол-во отслеживаемых чатов, восстановлений, восстановленных событий и чатов, восстановленных не полностью)
+        """
+
+        with self.__lock:
+            return {
+                "chats": len(self.cursors),
+                "recoveries": self.recoveries,
+                "recovered": self.recovered,
+                "truncated": self.truncated,
+            }
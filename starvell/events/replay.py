@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from starvell.async_socket import AsyncSocket
+from starvell.socket import Socket
+
+from .journal import JournalFrame
+from .stages import StageTimer
+
+
+def read_frames(path: str) -> Iterator[JournalFrame]:
+    """
+    Читает записанные кадры веб-сокета
+
+    Поддерживаются папка журнала (Journal), отдельный сегмент журнала и текстовый файл с одним кадром на строку (у таких кадров нет времени получения, received_at = 0)
+
+    :param path: Путь к папке журнала либо к файлу
+
+    :return: Итератор JournalFrame в порядке получения
+    """
+
+    if os.path.isdir(path):
+        paths = [
+            os.path.join(path, name)
+            for name in sorted(os.listdir(path))
+            if name.startswith("journal-") and name.endswith(".jsonl")
+        ]
+    else:
+        paths = [path]
+
+    n = 0
+
+    for file_path in paths:
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+
+                if not line:
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+
+                n += 1
+
+                if isinstance(record, dict):
+                    # отметки об обработке кадров журнала пропускаются
+                    if "frame" in record:
+                        yield JournalFrame(
+                            record.get("seq", n),
+                            record.get("ts", 0.0),
+                            record["frame"],
+                        )
+                else:
+                    yield JournalFrame(n, 0.0, line)
+
+
+def _frames(source: str | Iterable[str]) -> Iterator[JournalFrame]:
+    if isinstance(source, str):
+        yield from read_frames(source)
+    else:
+        for n, frame in enumerate(source, 1):
+            yield JournalFrame(n, 0.0, frame)
+
+
+class _Pacer:
+    def __init__(self, realtime: bool, speed: float) -> None:
+        self.realtime: bool = realtime
+        self.speed: float = speed
+        self.max_lag: float = 0.0
+
+        self.__started: float | None = None
+        self.__first: float | None = None
+
+    def delay(self, received_at: float) -> float:
+        now = time.perf_counter()
+
+        if self.__started is None:
+            self.__started = now
+
+        if not self.realtime or not received_at:
+            return 0.0
+
+        if self.__first is None:
+            self.__first = received_at
+
+        delay = (received_at - self.__first) / self.speed - (
+            now - self.__started
+        )
+        self.max_lag = max(self.max_lag, -delay)
+
+        return max(delay, 0.0)
+
+
+class _NullWebSocket:
+    # ответы на ping и подключение к пространствам имён при воспроизведении никуда не отправляются
+    def send(self, data: str) -> None:
+        pass
+
+    async def send_str(self, data: str) -> None:
+        pass
+
+
+def _report(frames: int, elapsed: float, max_lag: float) -> dict[str, Any]:
+    return {
+        "frames": frames,
+        "elapsed": elapsed,
+        "frames_per_sec": frames / elapsed if elapsed else 0.0,
+        "max_lag": max_lag,
+    }
+
+
+class ReplaySocket(Socket):
+    def __init__(
+        self,
+        source: str | Iterable[str],
+        realtime: bool = False,
+        speed: float = 1.0,
+        stages: StageTimer | None = None,
+    ):
+        """
+        Источник кадров для Runner'а вместо веб-сокета Starvell: воспроизводит записанные кадры (например журнал Journal), без подключения к Starvell
+
+        Кадры проходят тот же путь, что и с веб-сокета (разбор пакета, хэндлеры SocketTypes.NEW_MESSAGE / PACKET, msg_process), поэтому подходит для повторяемого замера пропускной способности: ``Runner(acc, socket=ReplaySocket(path))``, затем ``socket.run()``
+
+        :param source: Путь к папке журнала либо к файлу с кадрами (см. read_frames), либо сами кадры (например сгенерированные)
+        :param realtime: Соблюдать-ли интервалы между кадрами, как при записи (False - как можно быстрее)
+        :param speed: Ускорение воспроизведения при realtime (2 - в два раза быстрее записи)
+        :param stages: Замер времени обработки кадра в потоке веб-сокета (этап "frame")
+        """
+
+        self.source: str | Iterable[str] = source
+        self.realtime: bool = realtime
+        self.speed: float = speed
+        self.stages: StageTimer | None = stages
+
+        super().__init__("", online=False)
+
+    def run_socket(self) -> None:
+        """
+        Ничего не делает: воспроизведение запускается явно через run()
+
+        :return: None
+        """
+
+    def run(self) -> dict[str, Any]:
+        """
+        Воспроизводит кадры в текущем потоке (хэндлеры Runner'а при этом выполняются в его пуле потоков)
+
+        :return: Словарь (кол-во кадров, время воспроизведения, кадров в секунду, максимальное отставание от записи при realtime)
+        """
+
+        ws = _NullWebSocket()
+        pacer = _Pacer(self.realtime, self.speed)
+        frames = 0
+
+        self.on_open(ws)
+        started = time.perf_counter()
+
+        try:
+            for frame in _frames(self.source):
+                delay = pacer.delay(frame.received_at)
+
+                if delay:
+                    time.sleep(delay)
+
+                received_at = time.perf_counter()
+                self.on_message(ws, frame.frame)
+                frames += 1
+
+                if self.stages is not None:
+                    self.stages.record(
+                        "frame", time.perf_counter() - received_at
+                    )
+        finally:
+            self.heartbeat.on_close()
+
+        return _report(frames, time.perf_counter() - started, pacer.max_lag)
+
+
+class AsyncReplaySocket(AsyncSocket):
+    def __init__(
+        self,
+        source: str | Iterable[str],
+        realtime: bool = False,
+        speed: float = 1.0,
+        stages: StageTimer | None = None,
+    ):
+        """
+        Асинхронная версия ReplaySocket: ``AsyncRunner(acc, socket=AsyncReplaySocket(path))``, затем ``await runner.run()`` - run() завершится после обработки всех кадров
+
+        :param source: Путь к папке журнала либо к файлу с кадрами (см. read_frames), либо сами кадры (например сгенерированные)
+        :param realtime: Соблюдать-ли интервалы между кадрами, как при записи (False - как можно быстрее)
+        :param speed: Ускорение воспроизведения при realtime (2 - в два раза быстрее записи)
+        :param stages: Замер времени обработки кадра (этап "frame")
+        """
+
+        self.source: str | Iterable[str] = source
+        self.realtime: bool = realtime
+        self.speed: float = speed
+        self.stages: StageTimer | None = stages
+        self.report: dict[str, Any] | None = None
+
+        super().__init__(None, online=False)
+
+    async def run(self) -> None:
+        """
+        Воспроизводит кадры, результат (как у ReplaySocket.run) сохраняется в report
+
+        :return: None
+        """
+
+        ws = _NullWebSocket()
+        pacer = _Pacer(self.realtime, self.speed)
+        frames = 0
+
+        await self.on_open(ws)
+        started = time.perf_counter()
+
+        try:
+            for frame in _frames(self.source):
+                # без задержки управление всё равно отдаётся event loop'у, чтобы хэндлеры выполнялись параллельно с чтением
+                await asyncio.sleep(pacer.delay(frame.received_at))
+
+                received_at = time.perf_counter()
+                await self.on_message(ws, frame.frame)
+                frames += 1
+
+                if self.stages is not None:
+                    self.stages.record(
+                        "frame", time.perf_counter() - received_at
+                    )
+        finally:
+            self.heartbeat.on_close()
+
+        self.report = _report(
+            frames, time.perf_counter() - started, pacer.max_lag
+        )
@@ -0,0 +1,99 @@
+import random
+import threading
+from typing import Any
+
+
+class _Stage:
+    __slots__ = ("count", "max", "samples", "total")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.samples: list[float] = []
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class StageTimer:
+    def __init__(self, samples: int = 10000):
+        """
+        Время этапов обработки событий Runner'а / AsyncRunner'а (разбор кадра, ожидание в очереди, детали заказа, сборка события, хэндлеры)
+
+        По каждому этапу хранятся кол-во, среднее и максимальное время, а для перцентилей - случайная выборка из samples замеров (reservoir sampling), поэтому память не растёт со временем работы
+
+        :param samples: Сколько замеров каждого этапа хранить для перцентилей
+        """
+
+        self.samples: int = samples
+
+        self.__stages: dict[str, _Stage] = {}
+        self.__random = random.Random(0)
+        self.__lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Добавляет замер этапа
+
+        :param stage: Название этапа
+        :param seconds: Время в секундах
+
+        :return: None
+        """
+
+        with self.__lock:
+            s = self.__stages.get(stage)
+
+            if s is None:
+                s = self.__stages[stage] = _Stage()
+
+            s.count += 1
+            s.total += seconds
+            s.max = max(s.max, seconds)
+
+            if len(s.samples) < self.samples:
+                s.samples.append(seconds)
+            else:
+                i = self.__random.randrange(s.count)
+
+                if i < self.samples:
+                    s.samples[i] = seconds
+
+    def reset(self) -> None:
+        """
+        Удаляет все замеры
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.__stages.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Статистика этапов
+
+        :return: Словарь {этап: {кол-во, среднее, p50, p99, максимальное время в секундах}}
+        """
+
+        with self.__lock:
+            stages = {
+                name: (s.count, s.total, s.max, sorted(s.samples))
+                for name, s in self.__stages.items()
+            }
+
+        return {
+            name: {
+                "count": count,
+                "avg": total / count if count else 0.0,
+                "p50": _percentile(samples, 0.5),
+                "p99": _percentile(samples, 0.99),
+                "max": max_time,
+            }
+            for name, (count, total, max_time, samples) in stages.items()
+        }
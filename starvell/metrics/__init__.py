@@ -0,0 +1,7 @@
+from .metrics import DEFAULT_BUCKETS, RequestMetrics, url_template
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "RequestMetrics",
+    "url_template",
+]
@@ -0,0 +1,309 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import Any
+from urllib.parse import urlsplit
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+_ID_SEGMENT = re.compile(
+    r"\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+
+def url_template(url: str) -> str:
+    """
+    Шаблон ссылки запроса: путь без адреса и параметров, числовые ID и UUID заменены на {id} (например "/api/orders/{id}")
+
+    :param url: Ссылка
+
+    :return: Шаблон
+    """
+
+    path = urlsplit(url).path or "/"
+
+    return "/".join(
+        "{id}" if _ID_SEGMENT.fullmatch(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+class _Endpoint:
+    __slots__ = (
+        "buckets",
+        "bytes_in",
+        "bytes_out",
+        "count",
+        "errors",
+        "max",
+        "rate_limited",
+        "retries",
+        "statuses",
+        "total",
+    )
+
+    def __init__(self, buckets: int) -> None:
+        self.count: int = 0
+        self.statuses: dict[int, int] = {}
+        self.retries: int = 0
+        self.rate_limited: int = 0
+        self.errors: int = 0
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        # последний элемент - запросы дольше самой большой границы (+Inf)
+        self.buckets: list[int] = [0] * (buckets + 1)
+
+
+def _quantile(
+    bounds: tuple[float, ...], counts: list[int], q: float, max_time: float
+) -> float:
+    # верхняя граница интервала гистограммы, в который попадает перцентиль
+    total = sum(counts)
+
+    if not total:
+        return 0.0
+
+    rank = q * total
+    seen = 0
+
+    for bound, n in zip(bounds, counts):
+        seen += n
+
+        if seen >= rank:
+            return min(bound, max_time)
+
+    return max_time
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+
+
+class RequestMetrics:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Статистика запросов StarvellSession / AsyncStarvellSession по эндпоинтам (метод + шаблон ссылки, например "GET /api/orders/{id}")
+
+        По каждому эндпоинту считаются запросы, коды ответов, повторы после 429, ответы 429, ошибки соединения, отправленные и полученные байты и гистограмма времени ответа. Запись замера - несколько операций со словарём под блокировкой, поэтому почти не замедляет запросы
+
+        :param buckets: Границы интервалов гистограммы времени ответа (в секундах, по возрастанию)
+        """
+
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+
+        self.__endpoints: dict[tuple[str, str], _Endpoint] = {}
+        self.__lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int | None,
+        seconds: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """
+        Добавляет замер запроса
+
+        :param method: Метод (get/post/patch)
+        :param url: Ссылка (шаблон строится через url_template)
+        :param status: Код ответа (None - ошибка соединения)
+        :param seconds: Время запроса в секундах
+        :param bytes_out: Размер тела запроса
+        :param bytes_in: Размер тела ответа
+        :param retry: Является-ли запрос повтором (после 429)
+
+        :return: None
+        """
+
+        key = (method.upper(), url_template(url))
+        bucket = bisect_left(self.buckets, seconds)
+
+        with self.__lock:
+            e = self.__endpoints.get(key)
+
+            if e is None:
+                e = self.__endpoints[key] = _Endpoint(len(self.buckets))
+
+            e.count += 1
+            e.total += seconds
+            e.max = max(e.max, seconds)
+            e.buckets[bucket] += 1
+            e.bytes_in += bytes_in
+            e.bytes_out += bytes_out
+
+            if retry:
+                e.retries += 1
+
+            if status is None:
+                e.errors += 1
+            else:
+                e.statuses[status] = e.statuses.get(status, 0) + 1
+
+                if status == 429:
+                    e.rate_limited += 1
+
+    def reset(self) -> None:
+        """
+        Удаляет всю статистику
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.__endpoints.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Статистика по эндпоинтам
+
+        :return: Словарь {"МЕТОД /шаблон": {кол-во запросов, коды ответов, повторы, 429, ошибки соединения, байты, время ответа (среднее, p50 и p99 по гистограмме, максимальное, гистограмма {граница: кол-во запросов не дольше неё})}}
+        """
+
+        with self.__lock:
+            endpoints = {
+                f"{method} {template}": (
+                    e.count,
+                    dict(e.statuses),
+                    e.retries,
+                    e.rate_limited,
+                    e.errors,
+                    e.bytes_in,
+                    e.bytes_out,
+                    e.total,
+                    e.max,
+                    list(e.buckets),
+                )
+                for (method, template), e in self.__endpoints.items()
+            }
+
+        result = {}
+
+        for name, (
+            count,
+            statuses,
+            retries,
+            rate_limited,
+            errors,
+            bytes_in,
+            bytes_out,
+            total,
+            max_time,
+            buckets,
+        ) in endpoints.items():
+            cumulative = 0
+            histogram = {}
+
+            for bound, n in zip(self.buckets, buckets):
+                cumulative += n
+                histogram[bound] = cumulative
+
+            result[name] = {
+                "count": count,
+                "statuses": statuses,
+                "retries": retries,
+                "rate_limited": rate_limited,
+                "errors": errors,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "latency": {
+                    "avg": total / count if count else 0.0,
+                    "p50": _quantile(self.buckets, buckets, 0.5, max_time),
+                    "p99": _quantile(self.buckets, buckets, 0.99, max_time),
+                    "max": max_time,
+                    "sum": total,
+                    "buckets": histogram,
+                },
+            }
+
+        return result
+
+    def to_prometheus(self, prefix: str = "starvell_http") -> str:
+        """
+        Статистика в текстовом формате Prometheus (например для отдачи по /metrics)
+
+        :param prefix: Префикс названий метрик
+
+        :return: Текст с метриками
+        """
+
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.extend((
+                f"# HELP {prefix}_{name} {help_text}",
+                f"# TYPE {prefix}_{name} {kind}",
+            ))
+
+        def endpoints():
+            for name, e in snapshot.items():
+                method, _, template = name.partition(" ")
+                yield method, template, e
+
+        header("requests_total", "counter", "Ответы по кодам")
+        for method, template, e in endpoints():
+            for status, n in sorted(e["statuses"].items()):
+                labels = _labels(
+                    method=method, endpoint=template, status=status
+                )
+                lines.append(f"{prefix}_requests_total{{{labels}}} {n}")
+
+        for name, key, help_text in (
+            ("errors_total", "errors", "Ошибки соединения"),
+            ("retries_total", "retries", "Повторы запросов после 429"),
+            ("rate_limited_total", "rate_limited", "Ответы 429"),
+            ("request_bytes_total", "bytes_out", "Отправлено байт"),
+            ("response_bytes_total", "bytes_in", "Получено байт"),
+        ):
+            header(name, "counter", help_text)
+            for method, template, e in endpoints():
+                labels = _labels(method=method, endpoint=template)
+                lines.append(f"{prefix}_{name}{{{labels}}} {e[key]}")
+
+        header(
+            "request_duration_seconds", "histogram", "Время ответа в секундах"
+        )
+        for method, template, e in endpoints():
+            labels = _labels(method=method, endpoint=template)
+            latency = e["latency"]
+
+            for bound, n in latency["buckets"].items():
+                lines.append(
+                    f"{prefix}_request_duration_seconds_bucket"
+                    f'{{{labels},le="{bound:g}"}} {n}'
+                )
+
+            name = f"{prefix}_request_duration_seconds"
+            lines.extend((
+                f'{name}_bucket{{{labels},le="+Inf"}} {e["count"]}',
+                f"{name}_sum{{{labels}}} {latency['sum']}",
+                f"{name}_count{{{labels}}} {e['count']}",
+            ))
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,26 @@
+from .heartbeat import Heartbeat, backoff_delay
+from .protocol import (
+    PING,
+    PONG,
+    Handshake,
+    Packet,
+    encode_connect,
+    encode_event,
+    parse_handshake,
+    parse_packet,
+    socket_url,
+)
+
+__all__ = [
+    "PING",
+    "PONG",
+    "Handshake",
+    "Heartbeat",
+    "Packet",
+    "backoff_delay",
+    "encode_connect",
+    "encode_event",
+    "parse_handshake",
+    "parse_packet",
+    "socket_url",
+]
@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+from typing import Any
+
+from .protocol import Handshake
+
+
+def backoff_delay(
+    attempt: int, base: float = 1, max_delay: float = 60
+) -> float:
+    """
+    Задержка перед переподключением: экспоненциальный рост с джиттером, чтобы клиенты не переподключались одновременно
+
+    :param attempt: Номер попытки подряд (с 0)
+    :param base: Задержка первой попытки в секундах
+    :param max_delay: Максимальная задержка в секундах
+
+    :return: Задержка в секундах (от половины до полной экспоненциальной задержки)
+    """
+
+    delay = min(max_delay, base * 2 ** min(attempt, 32))
+
+    return random.uniform(delay / 2, delay)
+
+
+class Heartbeat:
+    def __init__(self, ping_interval: float = 25, ping_timeout: float = 20):
+        """
+        Следит за ping'ами сервера Engine.IO: если очередной ping не пришёл за pingInterval + pingTimeout, соединение считается оборванным (полуоткрытым)
+
+        Также хранит метрики соединения: время работы, кол-во переподключений, задержку (RTT) ping'ов веб-сокета
+
+        :param ping_interval: Интервал ping'ов сервера до рукопожатия (затем берётся из пакета OPEN)
+        :param ping_timeout: Таймаут ping'а до рукопожатия (затем берётся из пакета OPEN)
+        """
+
+        self.ping_interval: float = ping_interval
+        self.ping_timeout: float = ping_timeout
+
+        self.connected_at: float | None = None
+        self.last_ping_at: float | None = None
+        self.connections: int = 0
+        self.pings: int = 0
+        self.missed: int = 0
+        self.max_ping_gap: float = 0.0
+
+        self.latency: float | None = None
+        self.max_latency: float = 0.0
+        self.total_latency: float = 0.0
+        self.pongs: int = 0
+
+        self.__ping_sent_at: float | None = None
+        self.__lock = threading.Lock()
+
+    @property
+    def reconnects(self) -> int:
+        """
+        Кол-во переподключений (соединений после первого)
+        """
+
+        return max(self.connections - 1, 0)
+
+    @property
+    def connected(self) -> bool:
+        """
+        Открыто-ли соединение
+        """
+
+        return self.connected_at is not None
+
+    def on_open(self) -> None:
+        """
+        Соединение открыто
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.connected_at = time.monotonic()
+            self.last_ping_at = None
+            self.__ping_sent_at = None
+            self.connections += 1
+
+    def on_close(self) -> None:
+        """
+        Соединение закрыто
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.connected_at = None
+            self.last_ping_at = None
+            self.__ping_sent_at = None
+
+    def on_handshake(self, handshake: Handshake) -> None:
+        """
+        Получен пакет OPEN, интервалы берутся из него
+
+        :param handshake: Параметры соединения
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.ping_interval = handshake.ping_interval
+            self.ping_timeout = handshake.ping_timeout
+
+    def on_ping(self) -> None:
+        """
+        Получен ping сервера Engine.IO
+
+        :return: None
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            previous = self.last_ping_at or self.connected_at
+
+            if previous is not None:
+                self.max_ping_gap = max(self.max_ping_gap, now - previous)
+
+            self.last_ping_at = now
+            self.pings += 1
+
+    def ping_sent(self) -> None:
+        """
+        Отправлен ping веб-сокета (для замера RTT)
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.__ping_sent_at = time.monotonic()
+
+    def on_pong(self) -> None:
+        """
+        Получен pong веб-сокета, замеряет RTT
+
+        :return: None
+        """
+
+        with self.__lock:
+            if self.__ping_sent_at is None:
+                return
+
+            rtt = time.monotonic() - self.__ping_sent_at
+            self.__ping_sent_at = None
+            self.latency = rtt
+            self.max_latency = max(self.max_latency, rtt)
+            self.total_latency += rtt
+            self.pongs += 1
+
+    def remaining(self) -> float | None:
+        """
+        Сколько секунд осталось до следующего ping'а сервера, после которых соединение считается оборванным
+
+        :return: Секунды (может быть отрицательным), None - если соединение закрыто
+        """
+
+        with self.__lock:
+            last = self.last_ping_at or self.connected_at
+
+            if last is None:
+                return None
+
+            return (
+                last
+                + self.ping_interval
+                + self.ping_timeout
+                - time.monotonic()
+            )
+
+    def expired(self) -> bool:
+        """
+        Пропущен-ли ping сервера (соединение нужно переподключить)
+
+        :return: True, если ping не пришёл вовремя
+        """
+
+        remaining = self.remaining()
+
+        return remaining is not None and remaining <= 0
+
+    def on_missed(self) -> None:
+        """
+        Соединение закрывается из-за пропущенного ping'а
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.missed += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Метрики соединения
+
+        :return: Словарь (время работы соединения, кол-во переподключений и пропущенных ping'ов, задержка ping'ов)
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+
+            return {
+                "connected": self.connected_at is not None,
+                "uptime": now - self.connected_at
+                if self.connected_at is not None
+                else 0.0,
+                "reconnects": max(self.connections - 1, 0),
+                "missed_heartbeats": self.missed,
+                "ping_interval": self.ping_interval,
+                "ping_timeout": self.ping_timeout,
+                "pings": self.pings,
+                "last_ping_age": now - self.last_ping_at
+                if self.last_ping_at is not None
+                else None,
+                "max_ping_gap": self.max_ping_gap,
+                "latency": self.latency,
+                "avg_latency": self.total_latency / self.pongs
+                if self.pongs
+                else None,
+                "max_latency": self.max_latency,
+            }
@@ -0,0 +1,236 @@
+import json
+from typing import Any, NamedTuple
+
+from starvell.enums import EngineIOPacketTypes, SocketIOPacketTypes
+from starvell.errors import ProtocolError
+
+_ENGINE_IO_TYPES: dict[str, EngineIOPacketTypes] = {
+    str(t.value): t for t in EngineIOPacketTypes
+}
+_SOCKET_IO_TYPES: dict[str, SocketIOPacketTypes] = {
+    str(t.value): t for t in SocketIOPacketTypes
+}
+
+PING = "2"
+"""Пакет Engine.IO ping"""
+PONG = "3"
+"""Пакет Engine.IO pong"""
+
+
+class Packet(NamedTuple):
+    """
+    Разобранный кадр веб-сокета (пакет Engine.IO и, если это сообщение, пакет Socket.IO)
+    """
+
+    eio_type: EngineIOPacketTypes
+    type: SocketIOPacketTypes | None = None
+    namespace: str = "/"
+    ack_id: int | None = None
+    data: Any = None
+    attachments: int = 0
+
+    @property
+    def event(self) -> str | None:
+        """
+        Название события (для пакетов EVENT / BINARY_EVENT)
+        """
+
+        if (
+            self.type
+            in (SocketIOPacketTypes.EVENT, SocketIOPacketTypes.BINARY_EVENT)
+            and self.data
+        ):
+            return self.data[0]
+
+        return None
+
+    @property
+    def args(self) -> list[Any]:
+        """
+        Аргументы события (данные без названия события)
+        """
+
+        if self.event is not None:
+            return self.data[1:]
+
+        return self.data if isinstance(self.data, list) else []
+
+
+class Handshake(NamedTuple):
+    """
+    Параметры соединения из пакета OPEN
+    """
+
+    sid: str
+    ping_interval: float
+    """Интервал ping'ов сервера в секундах"""
+    ping_timeout: float
+    """Сколько секунд после ожидаемого ping'а сервер считается живым"""
+    max_payload: int | None = None
+    upgrades: tuple[str, ...] = ()
+
+
+def parse_packet(frame: str) -> Packet:
+    """
+    Разбирает текстовый кадр веб-сокета за один проход: тип пакета Engine.IO, тип пакета Socket.IO, пространство имён, ack ID и данные (JSON декодируется один раз)
+
+    Пример: ``parse_packet('42/chats,["message_created",{...}]').event == "message_created"``
+
+    :param frame: Кадр веб-сокета
+
+    :return: Packet
+
+    :raise ProtocolError: Если кадр не является корректным пакетом
+    """
+
+    if not frame:
+        raise ProtocolError("Пустой кадр")
+
+    eio_type = _ENGINE_IO_TYPES.get(frame[0])
+
+    if eio_type is None:
+        raise ProtocolError(f"Неизвестный тип пакета Engine.IO: {frame[:16]}")
+
+    if eio_type == EngineIOPacketTypes.OPEN:
+        return Packet(eio_type, data=_loads(frame, 1))
+    if eio_type != EngineIOPacketTypes.MESSAGE:
+        return Packet(eio_type, data=frame[1:] or None)
+
+    if len(frame) < 2:
+        raise ProtocolError("Пакет MESSAGE без пакета Socket.IO")
+
+    sio_type = _SOCKET_IO_TYPES.get(frame[1])
+
+    if sio_type is None:
+        raise ProtocolError(f"Неизвестный тип пакета Socket.IO: {frame[:16]}")
+
+    pos, size = 2, len(frame)
+    attachments = 0
+
+    if sio_type in (
+        SocketIOPacketTypes.BINARY_EVENT,
+        SocketIOPacketTypes.BINARY_ACK,
+    ):
+        dash = frame.find("-", pos)
+
+        if dash == -1 or not frame[pos:dash].isdigit():
+            raise ProtocolError("Нет кол-ва вложений в бинарном пакете")
+
+        attachments = int(frame[pos:dash])
+        pos = dash + 1
+
+    namespace = "/"
+
+    if pos < size and frame[pos] == "/":
+        comma = frame.find(",", pos)
+
+        if comma == -1:
+            namespace, pos = frame[pos:], size
+        else:
+            namespace, pos = frame[pos:comma], comma + 1
+
+    ack_start = pos
+
+    while pos < size and frame[pos].isdigit():
+        pos += 1
+
+    ack_id = int(frame[ack_start:pos]) if pos > ack_start else None
+
+    return Packet(
+        eio_type,
+        sio_type,
+        namespace,
+        ack_id,
+        _loads(frame, pos),
+        attachments,
+    )
+
+
+def parse_handshake(packet: Packet) -> Handshake:
+    """
+    Достаёт параметры соединения из пакета OPEN
+
+    :param packet: Пакет OPEN (результат parse_packet)
+
+    :return: Handshake (интервалы в секундах)
+
+    :raise ProtocolError: Если это не пакет OPEN либо в нём нет нужных полей
+    """
+
+    if packet.eio_type != EngineIOPacketTypes.OPEN or not isinstance(
+        packet.data, dict
+    ):
+        raise ProtocolError("Ожидался пакет OPEN")
+
+    try:
+        return Handshake(
+            sid=packet.data["sid"],
+            ping_interval=packet.data["pingInterval"] / 1000,
+            ping_timeout=packet.data["pingTimeout"] / 1000,
+            max_payload=packet.data.get("maxPayload"),
+            upgrades=tuple(packet.data.get("upgrades") or ()),
+        )
+    except (KeyError, TypeError) as e:
+        raise ProtocolError(f"Некорректный пакет OPEN: {e}")
+
+
+def socket_url(base_url: str) -> str:
+    """
+    Собирает ссылку веб-сокета Engine.IO из адреса сайта
+
+    :param base_url: Адрес Starvell (например "https://starvell.com")
+
+    :return: Ссылка (например "wss://starvell.com/socket.io/?EIO=4&transport=websocket")
+    """
+
+    scheme, sep, rest = base_url.rstrip("/").partition("://")
+    scheme = {"https": "wss", "http": "ws"}.get(scheme, scheme)
+
+    return f"{scheme}{sep}{rest}/socket.io/?EIO=4&transport=websocket"
+
+
+def encode_connect(namespace: str = "/", auth: Any = None) -> str:
+    """
+    Собирает пакет подключения к пространству имён Socket.IO
+
+    :param namespace: Пространство имён (например "/chats")
+    :param auth: Данные авторизации (необязательно)
+
+    :return: Кадр веб-сокета (например "40/chats,")
+    """
+
+    frame = "40" + (f"{namespace}," if namespace != "/" else "")
+
+    return frame + (json.dumps(auth) if auth is not None else "")
+
+
+def encode_event(
+    namespace: str, event: str, *args: Any, ack_id: int | None = None
+) -> str:
+    """
+    Собирает пакет события Socket.IO
+
+    :param namespace: Пространство имён
+    :param event: Название события
+    :param args: Аргументы события
+    :param ack_id: ID подтверждения (если нужен ответ сервера)
+
+    :return: Кадр веб-сокета
+    """
+
+    frame = "42" + (f"{namespace}," if namespace != "/" else "")
+
+    if ack_id is not None:
+        frame += str(ack_id)
+
+    return frame + json.dumps([event, *args], ensure_ascii=False)
+
+
+def _loads(frame: str, pos: int) -> Any:
+    if pos >= len(frame):
+        return None
+
+    try:
+        return json.loads(frame[pos:])
+    except ValueError as e:
+        raise ProtocolError(f"Некорректный JSON в пакете: {e}")
@@ -0,0 +1,19 @@
+from .adaptive import AdaptiveLimiter
+from .ratelimit import RateLimiter, TokenBucket, parse_retry_after
+from .scheduler import (
+    PriorityScheduler,
+    current_priority,
+    request_priority,
+    with_priority,
+)
+
+__all__ = [
+    "AdaptiveLimiter",
+    "PriorityScheduler",
+    "RateLimiter",
+    "TokenBucket",
+    "current_priority",
+    "parse_retry_after",
+    "request_priority",
+    "with_priority",
+]
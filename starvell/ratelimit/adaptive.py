@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+from .ratelimit import RateLimiter, TokenBucket
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        initial_rate: float | None = None,
+        min_rate: float = 1,
+        max_rate: float = 100,
+        rate_step: float = 1,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        decrease_interval: float = 1.0,
+    ) -> None:
+        """
+        AIMD-ограничитель: плавно увеличивает кол-во одновременных запросов и запросов в секунду, пока запросы проходят успешно, и кратно уменьшает их при 429 или росте задержки
+
+        Один экземпляр рассчитан на одну сессию (синхронную либо асинхронную)
+
+        :param initial_concurrency: Начальное кол-во одновременных запросов
+        :param min_concurrency: Минимальное кол-во одновременных запросов
+        :param max_concurrency: Максимальное кол-во одновременных запросов
+        :param initial_rate: Начальное кол-во запросов в секунду (по умолчанию - скорость RateLimiter'а сессии, а если она не ограничена - max_rate)
+        :param min_rate: Минимальное кол-во запросов в секунду
+        :param max_rate: Максимальное кол-во запросов в секунду
+        :param rate_step: На сколько запросов в секунду увеличивается лимит за каждую секунду успешных запросов
+        :param decrease_factor: Во сколько раз уменьшаются лимиты при 429 / росте задержки (0.5 - в два раза)
+        :param latency_tolerance: Во сколько раз задержка может превысить базовую, прежде чем лимиты будут уменьшены
+        :param decrease_interval: Минимальный интервал (в секундах) между двумя уменьшениями лимитов
+        """
+
+        self.min_concurrency: int = min_concurrency
+        self.max_concurrency: int = max_concurrency
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.rate_step: float = rate_step
+        self.decrease_factor: float = decrease_factor
+        self.latency_tolerance: float = latency_tolerance
+        self.decrease_interval: float = decrease_interval
+
+        self.concurrency: float = float(initial_concurrency)
+        self.initial_rate: float | None = initial_rate
+        self.rate: float = float(
+            initial_rate if initial_rate is not None else max_rate
+        )
+        self.in_flight: int = 0
+
+        self.latency: float | None = None
+        self.baseline_latency: float | None = None
+        self.decreases_count: int = 0
+        self.last_decrease_at: float = 0.0
+
+        self.bucket: TokenBucket | None = None
+
+        self.__cond = threading.Condition()
+        self.__async_cond: asyncio.Condition | None = None
+
+    @property
+    def limit(self) -> int:
+        """
+        Текущее разрешённое кол-во одновременных запросов
+        """
+
+        return max(int(self.concurrency), self.min_concurrency)
+
+    def attach(self, rate_limiter: RateLimiter) -> None:
+        """
+        Привязывает ограничитель к Token Bucket'у RateLimiter'а сессии, скорость которого он будет регулировать
+
+        :param rate_limiter: RateLimiter сессии
+
+        :return: None
+        """
+
+        with self.__cond:
+            if rate_limiter.bucket is None:
+                rate_limiter.bucket = TokenBucket(self.rate, self.rate)
+            elif self.initial_rate is None:
+                # без явного initial_rate начинаем со скорости, заданной пользователем
+                self.rate = min(rate_limiter.bucket.rate, self.max_rate)
+
+            self.bucket = rate_limiter.bucket
+            self.__apply_rate()
+
+    def acquire(self) -> None:
+        """
+        Блокирует поток, пока кол-во запросов "в полёте" не станет меньше лимита
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """
+        Освобождает место, занятое acquire()
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.in_flight -= 1
+            self.__cond.notify_all()
+
+    async def acquire_async(self) -> None:
+        """
+        Асинхронная версия acquire()
+
+        :return: None
+        """
+
+        if self.__async_cond is None:
+            self.__async_cond = asyncio.Condition()
+
+        async with self.__async_cond:
+            await self.__async_cond.wait_for(
+                lambda: self.in_flight < self.limit
+            )
+            self.in_flight += 1
+
+    async def release_async(self) -> None:
+        """
+        Асинхронная версия release()
+
+        :return: None
+        """
+
+        self.in_flight -= 1
+
+        if self.__async_cond is not None:
+            async with self.__async_cond:
+                self.__async_cond.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        """
+        Регистрирует успешный запрос: аддитивно увеличивает лимиты, либо уменьшает их, если задержка сильно выросла
+
+        :param latency: Время выполнения запроса в секундах
+
+        :return: None
+        """
+
+        with self.__cond:
+            if self.latency is None:
+                self.latency = self.baseline_latency = latency
+            else:
+                self.latency += (latency - self.latency) * 0.3
+                self.baseline_latency += (
+                    latency - self.baseline_latency
+                ) * 0.02
+
+            if self.latency > self.baseline_latency * self.latency_tolerance:
+                self.__decrease()
+            else:
+                self.concurrency = min(
+                    self.max_concurrency,
+                    self.concurrency + 1 / self.concurrency,
+                )
+                self.rate = min(
+                    self.max_rate, self.rate + self.rate_step / self.rate
+                )
+                self.__apply_rate()
+
+            self.__cond.notify_all()
+
+    def on_throttle(self) -> None:
+        """
+        Регистрирует 429 / ошибку соединения: кратно уменьшает лимиты
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.__decrease()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Текущее состояние ограничителя
+
+        :return: Словарь с лимитами, кол-вом запросов "в полёте" и задержками
+        """
+
+        return {
+            "concurrency": self.limit,
+            "rate": self.rate,
+            "in_flight": self.in_flight,
+            "latency": self.latency,
+            "baseline_latency": self.baseline_latency,
+            "decreases_count": self.decreases_count,
+        }
+
+    def __decrease(self) -> None:
+        now = time.monotonic()
+
+        # серия 429 от одного "всплеска" запросов уменьшает лимиты только один раз
+        if now - self.last_decrease_at < self.decrease_interval:
+            return
+
+        self.last_decrease_at = now
+        self.decreases_count += 1
+        self.concurrency = max(
+            self.min_concurrency, self.concurrency * self.decrease_factor
+        )
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.__apply_rate()
+
+    def __apply_rate(self) -> None:
+        if self.bucket is not None:
+            self.bucket.configure(self.rate, max(self.rate, 1.0))
@@ -0,0 +1,257 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Парсит заголовок Retry-After (кол-во секунд либо HTTP-дата)
+
+    :param value: Значение заголовка Retry-After
+
+    :return: Кол-во секунд, которое нужно подождать, либо None, если заголовка нет или он некорректный
+    """
+
+    if not value:
+        return None
+
+    value = value.strip()
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """
+        Потокобезопасный Token Bucket
+
+        :param rate: Сколько токенов (запросов) восполняется в секунду
+        :param capacity: Максимальное кол-во токенов в корзине (размер "всплеска"), по умолчанию равно rate
+        """
+
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity is not None else rate
+        self.tokens: float = self.capacity
+        self.updated_at: float = time.monotonic()
+
+        self.__lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Резервирует токены, даже если их сейчас недостаточно (баланс уходит в минус)
+
+        :param tokens: Кол-во токенов
+
+        :return: Сколько секунд нужно подождать, прежде чем использовать зарезервированные токены
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate,
+            )
+            self.updated_at = now
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+
+            return -self.tokens / self.rate
+
+    def try_take(self, tokens: float = 1) -> float:
+        """
+        Забирает токены, только если их сейчас достаточно (баланс не уходит в минус)
+
+        :param tokens: Кол-во токенов
+
+        :return: 0, если токены забраны, иначе сколько секунд нужно подождать, пока их станет достаточно
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate,
+            )
+            self.updated_at = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+
+            return (tokens - self.tokens) / self.rate
+
+    def configure(self, rate: float, capacity: float | None = None) -> None:
+        """
+        Меняет скорость и размер корзины (токены, накопленные по старой скорости, сохраняются)
+
+        :param rate: Сколько токенов восполняется в секунду
+        :param capacity: Максимальное кол-во токенов, по умолчанию равно rate
+
+        :return: None
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate,
+            )
+            self.updated_at = now
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else rate
+            self.tokens = min(self.tokens, self.capacity)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        max_retry_after: float = 300,
+        jitter: bool = True,
+    ) -> None:
+        """
+        Ограничитель запросов аккаунта: Token Bucket, экспоненциальный backoff с jitter'ом, учёт Retry-After и общий для всех потоков "cool-down" после 429
+
+        :param rate: Сколько запросов в секунду разрешено (по умолчанию None - без ограничения, остаются только backoff и cool-down после 429)
+        :param burst: Сколько запросов можно отправить разом, по умолчанию равно rate
+        :param max_retries: Максимальное кол-во попыток на один запрос
+        :param backoff_base: Базовая задержка (в секундах) для экспоненциального backoff'а
+        :param backoff_max: Максимальная задержка (в секундах) после 429
+        :param max_retry_after: Максимальная задержка (в секундах), которую может задать сервер через Retry-After - большие значения урезаются до неё
+        :param jitter: Использовать-ли случайный jitter (full jitter) для задержек
+        """
+
+        self.bucket: TokenBucket | None = (
+            TokenBucket(rate, burst) if rate else None
+        )
+        self.max_retries: int = max_retries
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.max_retry_after: float = max_retry_after
+        self.jitter: bool = jitter
+
+        self.cooldown_until: float = 0.0
+        self.throttled_count: int = 0
+
+        self.__lock = threading.Lock()
+
+    @property
+    def cooldown_left(self) -> float:
+        """
+        Сколько секунд осталось до конца текущего cool-down'а
+        """
+
+        return max(self.cooldown_until - time.monotonic(), 0.0)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Считает задержку экспоненциального backoff'а
+
+        :param attempt: Номер попытки (с 0)
+
+        :return: Задержка в секундах
+        """
+
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def on_429(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Регистрирует ответ 429 и продлевает общий cool-down для всех потоков, использующих этот ограничитель
+
+        :param attempt: Номер попытки (с 0), на которой получен 429
+        :param retry_after: Значение заголовка Retry-After (если есть)
+
+        :return: Задержка в секундах
+        """
+
+        delay = parse_retry_after(retry_after)
+
+        if delay is None:
+            delay = self.backoff(attempt)
+        else:
+            delay = min(delay, self.max_retry_after)
+
+        with self.__lock:
+            self.throttled_count += 1
+            self.cooldown_until = max(
+                self.cooldown_until, time.monotonic() + delay
+            )
+
+        return delay
+
+    def try_acquire(self) -> float:
+        """
+        Забирает токен на запрос без ожидания и без резерва "в долг" (используется PriorityScheduler'ом, чтобы токены доставались запросам в порядке приоритета)
+
+        :return: 0, если запрос можно отправлять, иначе сколько секунд нужно подождать до следующей попытки
+        """
+
+        wait = self.cooldown_left
+
+        if wait > 0:
+            return wait
+
+        return self.bucket.try_take() if self.bucket else 0.0
+
+    def acquire(self) -> None:
+        """
+        Блокирует поток, пока не будет разрешено отправить запрос
+
+        :return: None
+        """
+
+        wait = self.bucket.reserve() if self.bucket else 0.0
+
+        while True:
+            wait = max(wait, self.cooldown_left)
+
+            if wait <= 0:
+                return
+
+            time.sleep(wait)
+            wait = 0.0
+
+    async def acquire_async(self) -> None:
+        """
+        Асинхронно ждёт, пока не будет разрешено отправить запрос (не блокируя event loop)
+
+        :return: None
+        """
+
+        wait = self.bucket.reserve() if self.bucket else 0.0
+
+        while True:
+            wait = max(wait, self.cooldown_left)
+
+            if wait <= 0:
+                return
+
+            await asyncio.sleep(wait)
+            wait = 0.0
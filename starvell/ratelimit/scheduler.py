@@ -0,0 +1,346 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import inspect
+import itertools
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from starvell.enums import RequestPriority
+
+from .adaptive import AdaptiveLimiter
+from .ratelimit import RateLimiter
+
+_current_priority: ContextVar[RequestPriority | None] = ContextVar(
+    "starvell_request_priority", default=None
+)
+
+
+def current_priority() -> RequestPriority:
+    """
+    Приоритет запросов в текущем контексте (потоке / задаче asyncio)
+
+    :return: RequestPriority (по умолчанию INTERACTIVE)
+    """
+
+    return _current_priority.get() or RequestPriority.INTERACTIVE
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Generator[None, None, None]:
+    """
+    Устанавливает приоритет для всех запросов внутри блока ``with``, перекрывая приоритеты методов Account по умолчанию
+
+    Пример: ``with request_priority(RequestPriority.CRITICAL): acc.get_order(order_id)``
+
+    :param priority: Приоритет запросов
+    """
+
+    token = _current_priority.set(priority)
+
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def with_priority(priority: RequestPriority) -> Callable:
+    """
+    Декоратор для методов Account: задаёт приоритет по умолчанию для запросов метода, если вызывающий код не установил свой через request_priority()
+
+    :param priority: Приоритет по умолчанию
+
+    :return: Декоратор
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                if _current_priority.get() is not None:
+                    return await func(*args, **kwargs)
+
+                token = _current_priority.set(priority)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _current_priority.reset(token)
+
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs) -> Iterator[Any]:
+                # генератор выполняется по шагам в своей копии контекста, чтобы приоритет не "протекал" в вызывающий код между yield
+                ctx = contextvars.copy_context()
+
+                if ctx.get(_current_priority) is None:
+                    ctx.run(_current_priority.set, priority)
+
+                gen = ctx.run(func, *args, **kwargs)
+
+                try:
+                    while True:
+                        try:
+                            item = ctx.run(next, gen)
+                        except StopIteration:
+                            return
+                        yield item
+                finally:
+                    ctx.run(gen.close)
+
+            return gen_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            if _current_priority.get() is not None:
+                return func(*args, **kwargs)
+
+            with request_priority(priority):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class PriorityScheduler:
+    def __init__(self, max_in_flight: int = 8) -> None:
+        """
+        Планировщик исходящих запросов: ограничивает кол-во запросов "в полёте" и пропускает ожидающие запросы строго по приоритету (CRITICAL -> INTERACTIVE -> BACKGROUND), внутри одного приоритета - по очереди
+
+        Если в acquire() передан RateLimiter, запрос пропускается только вместе с токеном из него, поэтому и токены достаются ожидающим запросам в порядке приоритета
+
+        Может одновременно использоваться синхронной и асинхронной сессиями
+
+        :param max_in_flight: Максимальное кол-во одновременных запросов (если привязан AdaptiveLimiter, используется его лимит)
+        """
+
+        self.max_in_flight: int = max_in_flight
+        self.adaptive_limiter: AdaptiveLimiter | None = None
+        self.in_flight: int = 0
+
+        self.stats: dict[RequestPriority, dict[str, int | float]] = {
+            priority: {
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+                "admitted": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            for priority in RequestPriority
+        }
+
+        self.__queue: list[list] = []
+        self.__counter = itertools.count()
+        self.__lock = threading.Lock()
+        # таймер, будящий очередь, когда у RateLimiter'а появится токен
+        self.__timer: threading.Timer | None = None
+        self.__timer_at: float = 0.0
+
+    @property
+    def limit(self) -> int:
+        """
+        Текущее разрешённое кол-во одновременных запросов
+        """
+
+        if self.adaptive_limiter is not None:
+            return self.adaptive_limiter.limit
+
+        return self.max_in_flight
+
+    def attach(self, adaptive_limiter: AdaptiveLimiter) -> None:
+        """
+        Берёт лимит одновременных запросов из AdaptiveLimiter'а
+
+        :param adaptive_limiter: AdaptiveLimiter сессии
+
+        :return: None
+        """
+
+        self.adaptive_limiter = adaptive_limiter
+
+    def acquire(
+        self,
+        priority: RequestPriority,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """
+        Блокирует поток, пока запросу с этим приоритетом не будет выделено место
+
+        :param priority: Приоритет запроса
+        :param rate_limiter: RateLimiter сессии: место выделяется только вместе с его токеном (и не во время cool-down'а после 429)
+
+        :return: None
+        """
+
+        started = time.perf_counter()
+        event = threading.Event()
+
+        if self.__enqueue(priority, rate_limiter, event.set):
+            event.wait()
+
+        self.__record_wait(priority, time.perf_counter() - started)
+
+    async def acquire_async(
+        self,
+        priority: RequestPriority,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """
+        Асинхронная версия acquire()
+
+        :param priority: Приоритет запроса
+        :param rate_limiter: RateLimiter сессии: место выделяется только вместе с его токеном (и не во время cool-down'а после 429)
+
+        :return: None
+        """
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+
+        entry = self.__enqueue(priority, rate_limiter, wake)
+
+        if entry:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self.__lock:
+                    woken = entry[3]
+                    entry[3] = True
+
+                    if not woken:
+                        self.stats[priority]["queue_depth"] -= 1
+                if woken:
+                    self.release()
+                raise
+
+        self.__record_wait(priority, time.perf_counter() - started)
+
+    def release(self) -> None:
+        """
+        Освобождает место, занятое acquire() и пропускает следующий по приоритету запрос
+
+        :return: None
+        """
+
+        with self.__lock:
+            self.in_flight -= 1
+            self.__wake()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Метрики планировщика по каждому классу приоритета
+
+        :return: Словарь (глубина очереди, кол-во пропущенных запросов, время ожидания)
+        """
+
+        with self.__lock:
+            return {
+                "in_flight": self.in_flight,
+                "limit": self.limit,
+                "priorities": {
+                    priority.name: {
+                        **stats,
+                        "avg_wait": stats["total_wait"] / stats["admitted"]
+                        if stats["admitted"]
+                        else 0.0,
+                    }
+                    for priority, stats in self.stats.items()
+                },
+            }
+
+    def __enqueue(
+        self,
+        priority: RequestPriority,
+        rate_limiter: RateLimiter | None,
+        wake: Callable[[], None],
+    ) -> list | None:
+        with self.__lock:
+            if (
+                not self.__queue
+                and self.in_flight < self.limit
+                and (rate_limiter is None or rate_limiter.try_acquire() <= 0)
+            ):
+                self.in_flight += 1
+                return None
+
+            # [приоритет, порядковый номер, функция пробуждения, разбужен/отменён, RateLimiter]
+            entry = [
+                priority.value,
+                next(self.__counter),
+                wake,
+                False,
+                rate_limiter,
+            ]
+            heapq.heappush(self.__queue, entry)
+
+            stats = self.stats[priority]
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(
+                stats["max_queue_depth"], stats["queue_depth"]
+            )
+
+            self.__wake()
+
+            return entry
+
+    def __wake(self) -> None:
+        while self.__queue and self.in_flight < self.limit:
+            entry = self.__queue[0]
+
+            if entry[3]:
+                heapq.heappop(self.__queue)
+                continue
+
+            # токен достаётся первому по приоритету запросу, остальные ждут за ним
+            wait = entry[4].try_acquire() if entry[4] is not None else 0.0
+
+            if wait > 0:
+                self.__wake_later(wait)
+                return
+
+            heapq.heappop(self.__queue)
+            entry[3] = True
+            self.in_flight += 1
+            self.stats[RequestPriority(entry[0])]["queue_depth"] -= 1
+            entry[2]()
+
+    def __wake_later(self, delay: float) -> None:
+        at = time.monotonic() + delay
+
+        if self.__timer is not None and self.__timer_at <= at:
+            return
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+
+        self.__timer = threading.Timer(delay, self.__on_timer)
+        self.__timer.daemon = True
+        self.__timer_at = at
+        self.__timer.start()
+
+    def __on_timer(self) -> None:
+        with self.__lock:
+            self.__timer = None
+            self.__wake()
+
+    def __record_wait(self, priority: RequestPriority, wait: float) -> None:
+        with self.__lock:
+            stats = self.stats[priority]
+            stats["admitted"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
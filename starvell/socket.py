@@ -1,43 +1,138 @@
 import threading
+import time
 from typing import Callable
 
 import websocket
 
-from .enums import SocketTypes
-from .errors import HandlerError
+from .enums import EngineIOPacketTypes, SocketTypes
+from .errors import HandlerError, ProtocolError
+from .protocol import (
+    PONG,
+    Handshake,
+    Heartbeat,
+    Packet,
+    backoff_delay,
+    encode_connect,
+    parse_handshake,
+    parse_packet,
+    socket_url,
+)
+from .tracing import Tracer
 
 
 class Socket:
-    def __init__(self, session_id: str, online: bool = True):
+    def __init__(
+        self,
+        session_id: str,
+        online: bool = True,
+        reconnect_delay: float = 1,
+        max_reconnect_delay: float = 60,
+        latency_interval: float = 15,
+        base_url: str = "https://starvell.com",
+        tracer: Tracer | None = None,
+    ):
         """
         :param session_id: ID Сессии на Starvell
         :param online: Поддерживать-ли постоянный онлайн? (True - при использовании API, аккаунт всегда будет онлайн)
+        :param reconnect_delay: Задержка перед первой попыткой переподключения в секундах (дальше растёт экспоненциально, с джиттером)
+        :param max_reconnect_delay: Максимальная задержка перед переподключением в секундах
+        :param latency_interval: Как часто замерять задержку (RTT) ping'ом веб-сокета, в секундах
+        :param base_url: Адрес Starvell, к веб-сокету которого подключаться
+        :param tracer: Трассировка: на каждое событие Socket.IO начинается трассировка (спан "socket.frame"), в которую попадает его обработка хэндлерами
         """
 
         self.s: str = session_id
         self.online: bool = online
-        self.run_socket()
+        self.reconnect_delay: float = reconnect_delay
+        self.max_reconnect_delay: float = max_reconnect_delay
+        self.latency_interval: float = latency_interval
+        self.url: str = socket_url(base_url)
+        self.handshake: Handshake | None = None
+        self.heartbeat: Heartbeat = Heartbeat()
+        self.app: websocket.WebSocketApp | None = None
+        self.tracer: Tracer | None = tracer
 
         self.handlers: dict[SocketTypes, list[Callable]] = {
             SocketTypes.OPEN: [],
             SocketTypes.NEW_MESSAGE: [],
+            SocketTypes.PACKET: [],
         }
 
+        self.run_socket()
+
     def on_message(self, ws: websocket.WebSocket, msg: str) -> None:
         """
         Вызывается при новом сообщении в веб сокете, и соответственно вызывает все привязанные хэндлеры
 
+        Сообщение разбирается один раз: на ping сразу отвечает pong, из пакета OPEN запоминает параметры соединения (handshake), хэндлеры SocketTypes.PACKET получают разобранный пакет
+
         :param ws: Экземпляр класса WebSocket
         :param msg: Сообщение веб сокета
 
         :return: None
         """
 
+        received_at = time.time()
+        packet = self.process_packet(ws, msg)
+
+        # служебные пакеты (ping, подключение к пространству имён) не трассируются
+        if self.tracer is None or packet is None or packet.event is None:
+            self.__handle(ws, msg, packet)
+            return
+
+        with self.tracer.trace(
+            "socket.frame",
+            received_at,
+            event=packet.event,
+            namespace=packet.namespace,
+            size=len(msg),
+        ):
+            self.tracer.record("socket.parse", received_at)
+            self.__handle(ws, msg, packet)
+
+    def __handle(
+        self, ws: websocket.WebSocket, msg: str, packet: Packet | None
+    ) -> None:
         for func in self.handlers[SocketTypes.NEW_MESSAGE]:
             try:
                 func(ws, msg)
             except Exception as e:
-                raise HandlerError(str(e))
+                raise HandlerError(str(e)) from e
+
+        if packet is None:
+            return
+
+        for func in self.handlers[SocketTypes.PACKET]:
+            try:
+                func(ws, packet)
+            except Exception as e:
+                raise HandlerError(str(e)) from e
+
+    def process_packet(
+        self, ws: websocket.WebSocket, msg: str
+    ) -> Packet | None:
+        """
+        Разбирает сообщение веб сокета и обрабатывает служебные пакеты Engine.IO (OPEN, PING)
+
+        :param ws: Экземпляр класса WebSocket
+        :param msg: Сообщение веб сокета
+
+        :return: Packet, либо None, если сообщение не является корректным пакетом
+        """
+
+        try:
+            packet = parse_packet(msg)
+
+            if packet.eio_type == EngineIOPacketTypes.PING:
+                self.heartbeat.on_ping()
+                ws.send(PONG)
+            elif packet.eio_type == EngineIOPacketTypes.OPEN:
+                self.handshake = parse_handshake(packet)
+                self.heartbeat.on_handshake(self.handshake)
+        except ProtocolError:
+            return None
+
+        return packet
 
     def on_open(self, ws: websocket.WebSocket) -> None:
         """
@@ -50,38 +145,98 @@ class Socket:
         :return: None
         """
 
-        ws.send("40/chats,")
+        self.heartbeat.on_open()
+        ws.send(encode_connect("/chats"))
 
         if self.online:
-            ws.send("40/online,")
+            ws.send(encode_connect("/online"))
 
         for func in self.handlers[SocketTypes.OPEN]:
             try:
                 threading.Thread(target=func, args=[ws]).start()
             except Exception as e:
-                raise HandlerError(str(e))
+                raise HandlerError(str(e)) from e
+
+    def on_pong(self, ws: websocket.WebSocket, data: bytes) -> None:
+        """
+        Вызывается при получении pong'а веб-сокета, замеряет задержку
+
+        :param ws: Экземпляр класса WebSocket
+        :param data: Данные pong'а
+
+        :return: None
+        """
+
+        self.heartbeat.on_pong()
 
     def init(self) -> None:
         """
-        Запускает веб сокет
+        Запускает веб сокет и переподключается после обрыва соединения (с экспоненциальной задержкой и джиттером)
 
         :return: None
         """
 
-        url = "wss://starvell.com/socket.io/?EIO=4&transport=websocket"
-        ws = websocket.WebSocketApp(
-            url=url,
-            cookie=f"session={self.s}",
-            on_message=self.on_message,
-            on_open=self.on_open,
-        )
-        ws.run_forever(reconnect=True)
+        attempt = 0
+
+        while True:
+            self.handshake = None
+            self.app = websocket.WebSocketApp(
+                url=self.url,
+                cookie=f"session={self.s}",
+                on_message=self.on_message,
+                on_open=self.on_open,
+                on_pong=self.on_pong,
+            )
+            # select просыпается раз в секунду, чтобы заметить закрытие соединения watchdog'ом
+            self.app.run_forever(ping_timeout=1)
+            self.app = None
+            self.heartbeat.on_close()
+
+            # после успешного рукопожатия задержка сбрасывается
+            attempt = 0 if self.handshake is not None else attempt + 1
+            time.sleep(
+                backoff_delay(
+                    attempt, self.reconnect_delay, self.max_reconnect_delay
+                )
+            )
+
+    def watchdog(self) -> None:
+        """
+        Раз в секунду проверяет, что ping сервера пришёл вовремя (иначе закрывает соединение, и init() переподключается), и замеряет задержку ping'ом веб-сокета
+
+        :return: None
+        """
+
+        last_latency_ping = 0.0
+
+        while True:
+            time.sleep(1)
+            app = self.app
+
+            if app is None or not self.heartbeat.connected:
+                continue
+
+            try:
+                if self.heartbeat.expired():
+                    self.heartbeat.on_missed()
+                    app.close()
+                elif (
+                    time.monotonic() - last_latency_ping
+                    >= self.latency_interval
+                ):
+                    last_latency_ping = time.monotonic()
+                    self.heartbeat.ping_sent()
+                    app.sock.ping()
+            except (websocket.WebSocketException, OSError, AttributeError):
+                # соединение закрывается в другом потоке (sock уже может быть None)
+                pass
 
     def run_socket(self) -> None:
         """
-        Запускает веб сокет в отдельном потоке
+        Запускает веб сокет и watchdog в отдельных потоках
 
         :return: None
         """
 
         threading.Thread(target=self.init).start()
+        threading.Thread(target=self.watchdog, daemon=True).start()
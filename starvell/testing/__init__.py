@@ -0,0 +1,35 @@
+__all__ = [
+    "OfflineAccount",
+    "StarvellServer",
+    "make_blocked_user",
+    "make_chat",
+    "make_lot",
+    "make_message",
+    "make_offer",
+    "make_order",
+    "make_order_info",
+    "make_profile",
+    "make_review",
+    "make_settings",
+    "make_transaction",
+    "make_user",
+    "order_number",
+]
+
+from .account import OfflineAccount
+from .payloads import (
+    make_blocked_user,
+    make_chat,
+    make_lot,
+    make_message,
+    make_offer,
+    make_order,
+    make_order_info,
+    make_profile,
+    make_review,
+    make_settings,
+    make_transaction,
+    make_user,
+    order_number,
+)
+from .server import StarvellServer
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+from typing import Any
+from uuid import UUID
+
+from starvell.types import Order
+
+from .payloads import make_order, order_number
+
+
+class OfflineAccount:
+    def __init__(self, user_id: int = 1):
+        """
+        Аккаунт без обращения к Starvell, для Runner'а в тестах и бенчмарках (вместе с ReplaySocket)
+
+        get_order() собирает заказ из starvell.testing (как ответ /api/orders/{id}), остальные методы Account не поддерживаются
+
+        :param user_id: ID Аккаунта
+        """
+
+        self.user_id: int = user_id
+        self.session_id: str = ""
+        self.cache = None
+        self.request = SimpleNamespace(base_url="https://starvell.com")
+
+        self.orders: int = 0
+
+    def get_order(self, order_id: str | UUID, use_cache: bool = True) -> Order:
+        """
+        Собирает заказ по ID
+
+        :param order_id: ID Заказа
+        :param use_cache: Не используется (совместимость с Account)
+
+        :return: Order
+        """
+
+        self.orders += 1
+        order_id = str(order_id)
+
+        return Order.model_validate(
+            make_order(order_number(order_id), order_id)
+        )
+
+    def invalidate_cache(self, namespace: str, *args: Any) -> None:
+        pass
@@ -0,0 +1,401 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(seconds: int) -> str:
+    return (
+        (_EPOCH + timedelta(seconds=seconds))
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def order_number(order_id: str) -> int:
+    """
+    Порядковый номер заказа по его ID (ID заказов в ответах строятся из номера: uuid.UUID(int=n))
+
+    :param order_id: ID Заказа
+
+    :return: Номер заказа (0, если ID не UUID)
+    """
+
+    try:
+        return uuid.UUID(order_id).int % 2**32
+    except ValueError:
+        return 0
+
+
+def make_user(user_id: int) -> dict[str, Any]:
+    """
+    Пользователь в формате ответов Starvell (покупатель в списке продаж)
+
+    :param user_id: ID Пользователя
+
+    :return: Словарь
+    """
+
+    return {
+        "id": user_id,
+        "username": f"user{user_id}",
+        "avatar": None,
+        "banner": None,
+        "description": None,
+        "isOnline": user_id % 2 == 0,
+        "isBanned": False,
+        "isKycVerified": False,
+        "roles": ["USER"],
+        "rating": 5,
+        "reviewsCount": user_id % 100,
+        "lastOnlineAt": _timestamp(user_id),
+        "createdAt": _timestamp(0),
+    }
+
+
+def make_order_info(n: int) -> dict[str, Any]:
+    """
+    Продажа в формате ответа /api/orders/list
+
+    :param n: Порядковый номер продажи (от него зависят ID, цены и даты)
+
+    :return: Словарь
+    """
+
+    return {
+        "id": str(uuid.UUID(int=n)),
+        "status": ("CREATED", "COMPLETED", "REFUND")[n % 3],
+        "basePrice": 10000 + n,
+        "totalPrice": 11000 + n,
+        "offerId": n,
+        "offerDetails": {
+            "game": {"id": 1, "name": "Brawl Stars", "slug": "brawl-stars"},
+            "images": [],
+            "category": {"id": 2, "name": "Гемы", "slug": "gems"},
+            "attributes": [],
+            "subCategory": {"name": "Пополнение"},
+            "availability": 100,
+            "deliveryTime": {
+                "from": {"unit": "MINUTES", "value": 5},
+                "to": {"unit": "HOURS", "value": 1},
+            },
+            "descriptions": {
+                "rus": {
+                    "description": "Описание лота",
+                    "briefDescription": f"Лот #{n}",
+                }
+            },
+            "instantDelivery": n % 2 == 0,
+        },
+        "orderArgs": [],
+        "reviewVisibleAfterRefund": False,
+        "completedAt": _timestamp(n + 60) if n % 3 == 1 else None,
+        "refundedAt": _timestamp(n + 60) if n % 3 == 2 else None,
+        "createdAt": _timestamp(n),
+        "updatedAt": _timestamp(n + 60),
+        "user": make_user(n % 1000),
+    }
+
+
+def make_transaction(n: int) -> dict[str, Any]:
+    """
+    Транзакция в формате ответа /api/transactions/list
+
+    :param n: Порядковый номер транзакции
+
+    :return: Словарь
+    """
+
+    return {
+        "id": str(uuid.UUID(int=n)),
+        "direction": ("INCOME", "EXPENSE")[n % 2],
+        "type": ("ORDER_FULFILLMENT", "ORDER_PAYMENT", "BALANCE_TOPUP")[n % 3],
+        "status": "COMPLETED",
+        "amount": random.Random(n).randint(100, 100000),
+        "userId": 1,
+        "orderId": str(uuid.UUID(int=n)) if n % 3 != 2 else None,
+        "topupId": None,
+        "payoutId": None,
+        "fundsReleaseAt": None,
+        "createdAt": _timestamp(n),
+        "updatedAt": _timestamp(n),
+        "topup": None,
+        "payout": None,
+        "payoutPaymentSystem": None,
+        "topupPaymentSystem": None,
+    }
+
+
+def _offer_details(n: int) -> dict[str, Any]:
+    return make_order_info(n)["offerDetails"]
+
+
+def make_profile(user_id: int = 1) -> dict[str, Any]:
+    """
+    Профиль аккаунта в формате ответа /api/users-profile
+
+    :param user_id: ID Пользователя
+
+    :return: Словарь
+    """
+
+    return {
+        "user": {
+            **make_user(user_id),
+            "email": f"user{user_id}@example.com",
+            "isPhoneLinked": False,
+            "hasPassword": True,
+        },
+        "isImitated": False,
+        "offersHide": None,
+        "offersHides": [],
+        "balance": {"rubBalance": 150000, "usdBalance": 0, "eurBalance": 0},
+        "holdedAmount": 5000,
+        "orderCountsByType": {
+            "purchaseOrdersCount": 0,
+            "salesOrdersCount": 3,
+        },
+        "hasAtLeastOneCompletedOrder": True,
+        "unreadChatIds": [],
+    }
+
+
+def make_settings() -> dict[str, Any]:
+    """
+    Настройки аккаунта в формате ответа /api/user/settings
+
+    :return: Словарь
+    """
+
+    return {
+        "settings": {
+            "emailNotificationsEnabled": True,
+            "telegramNotificationsEnabled": False,
+            "isOffersVisibleOnlyInProfile": False,
+        },
+        "telegramLink": None,
+    }
+
+
+def make_order(n: int, order_id: str | None = None) -> dict[str, Any]:
+    """
+    Заказ в формате ответа /api/orders/{id}
+
+    :param n: Порядковый номер заказа
+    :param order_id: ID Заказа (по умолчанию строится из n)
+
+    :return: Словарь
+    """
+
+    order = make_order_info(n)
+    order["id"] = order_id or order["id"]
+    order["quantity"] = n % 5 + 1
+    order["buyerId"] = order["user"]["id"]
+
+    return order
+
+
+def make_review(n: int, order_id: str | None = None) -> dict[str, Any]:
+    """
+    Отзыв в формате ответов /api/reviews/list и /api/reviews/by-order-id
+
+    :param n: Порядковый номер отзыва
+    :param order_id: ID Заказа (по умолчанию строится из n)
+
+    :return: Словарь
+    """
+
+    author = make_user(n % 1000)
+
+    return {
+        "id": str(uuid.UUID(int=n + 2**64)),
+        "content": f"Отзыв #{n}",
+        "rating": n % 5 + 1,
+        "authorId": author["id"],
+        "orderId": order_id or str(uuid.UUID(int=n)),
+        "isHidden": False,
+        "createdAt": _timestamp(n),
+        "author": {
+            "id": author["id"],
+            "username": author["username"],
+            "avatar": None,
+        },
+        "order": {"amount": 11000 + n},
+        "reviewResponse": None,
+    }
+
+
+def make_message(
+    n: int,
+    chat_id: str | None = None,
+    notification_type: str | None = None,
+    content: str | None = None,
+) -> dict[str, Any]:
+    """
+    Сообщение чата в формате события веб-сокета message_created (и ответа /api/messages/list)
+
+    :param n: Порядковый номер сообщения (от него зависят ID, автор и дата)
+    :param chat_id: ID Чата (по умолчанию строится из n)
+    :param notification_type: Тип уведомления (например "ORDER_PAYMENT", "BLACKLIST_YOU_ADDED"), None - обычное сообщение
+    :param content: Текст сообщения
+
+    :return: Словарь
+    """
+
+    user = make_user(n % 1000)
+    author = {
+        "id": user["id"],
+        "username": user["username"],
+        "avatar": None,
+        "roles": user["roles"],
+    }
+    message = {
+        "id": str(uuid.UUID(int=n + 2**65)),
+        "content": content if content is not None else f"Сообщение #{n}",
+        "metadata": None,
+        "images": [],
+        "chatId": chat_id or str(uuid.UUID(int=n % 1000 + 2**66)),
+        "createdAt": _timestamp(n),
+        "author": author,
+        "buyer": None,
+        "seller": None,
+        "admin": None,
+        "order": None,
+    }
+
+    if notification_type is not None:
+        # уведомление отправляет Starvell: автора нет, покупатель и заказ указаны
+        message["content"] = ""
+        message["metadata"] = {"notificationType": notification_type}
+        message["author"] = None
+        message["buyer"] = author
+        message["order"] = {
+            "id": str(uuid.UUID(int=n)),
+            "quantity": n % 5 + 1,
+            "offerDetails": _offer_details(n),
+            "orderArgs": [],
+        }
+
+    return message
+
+
+def make_chat(n: int, user_id: int = 1) -> dict[str, Any]:
+    """
+    Чат в формате ответа /api/chats/list
+
+    :param n: Порядковый номер чата
+    :param user_id: ID Аккаунта (второй участник чата)
+
+    :return: Словарь
+    """
+
+    chat_id = str(uuid.UUID(int=n % 1000 + 2**66))
+    last = make_message(n, chat_id)
+
+    return {
+        "id": chat_id,
+        "participants": [
+            {
+                "id": uid,
+                "username": f"user{uid}",
+                "avatar": None,
+                "isOnline": uid % 2 == 0,
+                "isOperator": False,
+                "lastOnlineAt": _timestamp(uid),
+            }
+            for uid in (user_id, n % 1000)
+        ],
+        "lastMessage": {
+            **{k: last[k] for k in ("id", "content", "createdAt", "images")},
+            "type": "DEFAULT",
+            "metadata": last["metadata"],
+            "buyer": None,
+            "seller": None,
+            "admin": None,
+            "order": None,
+        },
+        "unreadMessageCount": n % 3,
+    }
+
+
+def make_offer(n: int) -> dict[str, Any]:
+    """
+    Лот в формате ответа /api/offers/list-by-category
+
+    :param n: Порядковый номер лота
+
+    :return: Словарь
+    """
+
+    details = _offer_details(n)
+
+    return {
+        "id": n,
+        "price": f"{100 + n % 1000}.00",
+        "descriptions": details["descriptions"],
+        "availability": details["availability"],
+        "instantDelivery": details["instantDelivery"],
+        "user": {
+            **make_user(n % 1000),
+            "rating": 4.9,
+        },
+        "subCategory": details["subCategory"],
+    }
+
+
+def make_lot(n: int, user_id: int = 1) -> dict[str, Any]:
+    """
+    Поля своего лота в формате ответов /api/offers/{id} и /api/offers/list-my
+
+    :param n: ID Лота
+    :param user_id: ID Аккаунта
+
+    :return: Словарь
+    """
+
+    details = _offer_details(n)
+
+    return {
+        "id": n,
+        "type": "LOT",
+        "price": f"{100 + n % 1000}.00",
+        "priceType": "PER_UNIT",
+        "availability": details["availability"],
+        "descriptions": details["descriptions"],
+        "deliveryTime": details["deliveryTime"],
+        "attributes": [],
+        "postPaymentMessage": None,
+        "profilePosition": None,
+        "instantDelivery": details["instantDelivery"],
+        "goods": [],
+        "isActive": True,
+        "isHidden": False,
+        "isProfileVisibleOnly": False,
+        "userId": user_id,
+        "gameId": details["game"]["id"],
+        "categoryId": details["category"]["id"],
+        "subCategoryId": 3,
+        "createdAt": _timestamp(n),
+        "updatedAt": _timestamp(n + 60),
+        "basicAttributes": [],
+        "numericAttributes": [],
+    }
+
+
+def make_blocked_user(user_id: int) -> dict[str, Any]:
+    """
+    Пользователь в формате ответа /api/blacklisted-users/list
+
+    :param user_id: ID Пользователя
+
+    :return: Словарь
+    """
+
+    return {
+        "id": user_id,
+        "username": f"user{user_id}",
+        "avatar": None,
+        "blacklistedAt": _timestamp(user_id),
+    }
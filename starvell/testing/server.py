@@ -0,0 +1,562 @@
+import asyncio
+import json
+import random
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiohttp import WSMsgType, web
+from typing_extensions import Self
+
+from starvell.protocol import PING, PONG, encode_event
+
+from .payloads import (
+    make_blocked_user,
+    make_chat,
+    make_lot,
+    make_message,
+    make_offer,
+    make_order,
+    make_order_info,
+    make_profile,
+    make_review,
+    make_settings,
+    make_transaction,
+    make_user,
+    order_number,
+)
+
+_Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class StarvellServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1,
+        items: int = 100,
+        user_id: int = 1,
+        ping_interval: float = 25,
+        ping_timeout: float = 20,
+        seed: int | None = 0,
+    ):
+        """
+        Локальная замена Starvell для тестов и нагрузочных замеров: HTTP API, которое использует Account / AsyncAccount, веб-сокет Socket.IO (/socket.io/) и приём трассировок OTLP/HTTP JSON (/v1/traces, для OtlpExporter)
+
+        Ответы собираются из starvell.testing (те же поля, что и у ответов Starvell), сервер работает в своём потоке со своим event loop'ом. Пример: ``with StarvellServer(latency=0.05) as server: acc = Account("session", base_url=server.base_url)``
+
+        :param host: Адрес, на котором слушать
+        :param port: Порт (0 - любой свободный)
+        :param latency: Задержка каждого ответа API в секундах
+        :param jitter: Случайная добавка к задержке (от 0 до jitter секунд)
+        :param rate_limit_rate: Доля запросов, на которые отвечать 429
+        :param error_rate: Доля запросов, на которые отвечать 500
+        :param retry_after: Значение заголовка Retry-After у ответов 429
+        :param items: Сколько всего продаж / транзакций / чатов / лотов отдают списки (пагинация по offset и limit)
+        :param user_id: ID Аккаунта
+        :param ping_interval: Интервал ping'ов веб-сокета (pingInterval рукопожатия), в секундах
+        :param ping_timeout: pingTimeout рукопожатия, в секундах
+        :param seed: Seed генератора случайных задержек и ошибок (None - случайный)
+        """
+
+        self.host: str = host
+        self.port: int = port
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.rate_limit_rate: float = rate_limit_rate
+        self.error_rate: float = error_rate
+        self.retry_after: float = retry_after
+        self.items: int = items
+        self.user_id: int = user_id
+        self.ping_interval: float = ping_interval
+        self.ping_timeout: float = ping_timeout
+
+        self.requests: dict[str, int] = {}
+        self.rate_limited: int = 0
+        self.errors: int = 0
+        self.connections: int = 0
+        self.frames_sent: int = 0
+        self.pongs: int = 0
+        self.blacklist: dict[int, dict[str, Any]] = {}
+        # спаны, полученные по /v1/traces (в формате OTLP JSON)
+        self.spans: list[dict[str, Any]] = []
+
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__sockets: set[web.WebSocketResponse] = set()
+        self.__next_lot: int = items
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__runner: web.AppRunner | None = None
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Адрес сервера для Account / AsyncAccount (base_url)
+        """
+
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        Запускает сервер в отдельном потоке
+
+        :return: Адрес сервера (base_url)
+        """
+
+        loop = asyncio.new_event_loop()
+
+        self.__thread = threading.Thread(
+            target=self.__serve,
+            args=(loop,),
+            name="starvell-server",
+            daemon=True,
+        )
+        self.__thread.start()
+
+        # ошибка запуска (например порт занят) пробрасывается в вызывающий поток
+        try:
+            asyncio.run_coroutine_threadsafe(self.__startup(), loop).result()
+        except BaseException:
+            loop.call_soon_threadsafe(loop.stop)
+            self.__thread.join()
+            raise
+
+        self.__loop = loop
+
+        return self.base_url
+
+    def stop(self) -> None:
+        """
+        Закрывает все соединения и останавливает сервер
+
+        :return: None
+        """
+
+        if self.__loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(
+            self.__shutdown(), self.__loop
+        ).result()
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def send_frame(self, frame: str) -> None:
+        """
+        Отправляет кадр всем подключённым веб-сокетам
+
+        :param frame: Кадр веб-сокета
+
+        :return: None
+        """
+
+        asyncio.run_coroutine_threadsafe(
+            self.__broadcast(frame), self.__loop
+        ).result()
+
+    def emit(
+        self,
+        data: dict[str, Any],
+        event: str = "message_created",
+        namespace: str = "/chats",
+    ) -> None:
+        """
+        Отправляет событие Socket.IO всем подключённым веб-сокетам
+
+        :param data: Данные события (например make_message(...))
+        :param event: Название события
+        :param namespace: Пространство имён
+
+        :return: None
+        """
+
+        self.send_frame(encode_event(namespace, event, data))
+
+    def drop_connections(self) -> None:
+        """
+        Обрывает все веб-сокеты (для проверки переподключения)
+
+        :return: None
+        """
+
+        asyncio.run_coroutine_threadsafe(
+            self.__close_sockets(), self.__loop
+        ).result()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика сервера
+
+        :return: Словарь (кол-во запросов по маршрутам, ответов 429 и 500, подключений веб-сокета, отправленных кадров, полученных спанов)
+        """
+
+        with self.__lock:
+            return {
+                "requests": sum(self.requests.values()),
+                "routes": dict(self.requests),
+                "rate_limited": self.rate_limited,
+                "errors": self.errors,
+                "connections": self.connections,
+                "sockets": len(self.__sockets),
+                "frames_sent": self.frames_sent,
+                "pongs": self.pongs,
+                "spans": len(self.spans),
+            }
+
+    @staticmethod
+    def __serve(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def __startup(self) -> None:
+        app = web.Application(middlewares=[self.__middleware])
+        app.add_routes(self.__routes())
+
+        self.__runner = web.AppRunner(app, access_log=None)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, self.host, self.port)
+        await site.start()
+
+        # при port=0 берётся порт, выданный системой
+        self.port = self.__runner.addresses[0][1]
+
+    async def __shutdown(self) -> None:
+        await self.__close_sockets()
+        await self.__runner.cleanup()
+
+    async def __close_sockets(self) -> None:
+        for ws in list(self.__sockets):
+            await ws.close()
+
+    async def __broadcast(self, frame: str) -> None:
+        for ws in list(self.__sockets):
+            try:
+                await ws.send_str(frame)
+            except ConnectionError:
+                continue
+
+            with self.__lock:
+                self.frames_sent += 1
+
+    @web.middleware
+    async def __middleware(
+        self, request: web.Request, handler: _Handler
+    ) -> web.StreamResponse:
+        if not request.path.startswith("/api/"):
+            return await handler(request)
+
+        resource = request.match_info.route.resource
+        route = f"{request.method} " + (
+            resource.canonical if resource is not None else request.path
+        )
+
+        with self.__lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            delay = self.latency + self.__random.uniform(0, self.jitter)
+            roll = self.__random.random()
+
+        if delay:
+            await asyncio.sleep(delay)
+
+        if "session" not in request.cookies:
+            return web.json_response({"message": "Unauthorized"}, status=403)
+
+        if roll < self.rate_limit_rate:
+            with self.__lock:
+                self.rate_limited += 1
+
+            return web.json_response(
+                {"message": "Too Many Requests"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self.__lock:
+                self.errors += 1
+
+            return web.json_response(
+                {"message": "Internal server error"}, status=500
+            )
+
+        return await handler(request)
+
+    def __routes(self) -> list[web.RouteDef]:
+        ok = self.__ok
+
+        return [
+            web.get("/socket.io/", self.__socket),
+            web.get("/api/users-profile", self.__profile),
+            web.get("/api/user/settings", self.__settings),
+            web.patch("/api/user/settings", self.__settings),
+            web.post("/api/orders/list", self.__sales),
+            web.get("/api/orders/{id}", self.__order),
+            web.post("/api/orders/refund", ok),
+            web.post("/api/reviews/list", self.__reviews),
+            web.get("/api/reviews/by-order-id", self.__review),
+            web.post("/api/review-responses/create", ok),
+            web.post("/api/review-responses/{id}/update", ok),
+            web.post("/api/transactions/list", self.__transactions),
+            web.post("/api/chats/list", self.__chats),
+            web.post("/api/chats/read", ok),
+            web.post("/api/chats/send-typing", ok),
+            web.post("/api/messages/list", self.__messages),
+            web.post("/api/messages/send", self.__send_message),
+            web.post("/api/messages/send-with-image", self.__send_image),
+            web.post("/api/offers/list-by-category", self.__offers),
+            web.post("/api/offers/list-my", self.__my_lots),
+            web.get("/api/offers/{id}", self.__lot),
+            web.post("/api/offers/{id}/delete", ok),
+            web.post("/api/offers-operations/create", self.__create_lot),
+            web.post("/api/offers-operations/{id}/update", ok),
+            web.post("/api/blacklisted-users/list", self.__black_list),
+            web.post("/api/blacklisted-users/block", self.__block),
+            web.post("/api/blacklisted-users/unblock", self.__unblock),
+            web.get("/api/users/{id}", self.__user),
+            web.get("/api/exchange-rates/usdt-rub", self.__rate),
+            web.get("/api/exchange-rates/usdt-ltc", self.__rate),
+            web.post("/api/payouts/create", ok),
+            web.post("/v1/traces", self.__traces),
+        ]
+
+    async def __page(self, request: web.Request) -> tuple[dict, range]:
+        body = await self.__body(request)
+        pagination = body.get("pagination", body)
+        offset = int(pagination.get("offset", 0))
+        limit = int(pagination.get("limit", self.items))
+
+        return body, range(offset, min(offset + limit, self.items))
+
+    @staticmethod
+    async def __body(request: web.Request) -> dict[str, Any]:
+        if not request.can_read_body:
+            return {}
+
+        try:
+            return await request.json()
+        except ValueError:
+            return {}
+
+    @staticmethod
+    async def __ok(request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def __profile(self, request: web.Request) -> web.Response:
+        return web.json_response(make_profile(self.user_id))
+
+    async def __settings(self, request: web.Request) -> web.Response:
+        return web.json_response(make_settings())
+
+    async def __sales(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_order_info(i) for i in page])
+
+    async def __order(self, request: web.Request) -> web.Response:
+        order_id = request.match_info["id"]
+
+        return web.json_response(make_order(order_number(order_id), order_id))
+
+    async def __reviews(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_review(i) for i in page])
+
+    async def __review(self, request: web.Request) -> web.Response:
+        order_id = request.query.get("id", "")
+
+        return web.json_response(make_review(order_number(order_id), order_id))
+
+    async def __transactions(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_transaction(i) for i in page])
+
+    async def __chats(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_chat(i, self.user_id) for i in page])
+
+    async def __messages(self, request: web.Request) -> web.Response:
+        body = await self.__body(request)
+        limit = min(int(body.get("limit", 50)), self.items)
+
+        return web.json_response([
+            make_message(i, body.get("chatId")) for i in range(limit)
+        ])
+
+    async def __send_message(self, request: web.Request) -> web.Response:
+        body = await self.__body(request)
+        message = self.__own_message(body.get("chatId"), body.get("content"))
+
+        # как и Starvell, отправленное сообщение приходит в веб-сокет
+        await self.__broadcast(
+            encode_event("/chats", "message_created", message)
+        )
+
+        return web.json_response(message, status=201)
+
+    async def __traces(self, request: web.Request) -> web.Response:
+        body = await self.__body(request)
+        spans = [
+            span
+            for resource in body.get("resourceSpans", [])
+            for scope in resource.get("scopeSpans", [])
+            for span in scope.get("spans", [])
+        ]
+
+        with self.__lock:
+            self.spans.extend(spans)
+
+        return web.json_response({})
+
+    async def __send_image(self, request: web.Request) -> web.Response:
+        await request.read()
+
+        return web.json_response(
+            self.__own_message(request.query.get("chatId"), ""), status=201
+        )
+
+    async def __offers(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_offer(i) for i in page])
+
+    async def __my_lots(self, request: web.Request) -> web.Response:
+        _, page = await self.__page(request)
+
+        return web.json_response([make_lot(i, self.user_id) for i in page])
+
+    async def __lot(self, request: web.Request) -> web.Response:
+        try:
+            lot_id = int(request.match_info["id"])
+        except ValueError:
+            return web.json_response({"message": "Not Found"}, status=404)
+
+        return web.json_response(make_lot(lot_id, self.user_id))
+
+    async def __create_lot(self, request: web.Request) -> web.Response:
+        await self.__body(request)
+
+        with self.__lock:
+            self.__next_lot += 1
+            lot_id = self.__next_lot
+
+        return web.json_response(make_lot(lot_id, self.user_id), status=201)
+
+    async def __black_list(self, request: web.Request) -> web.Response:
+        with self.__lock:
+            return web.json_response(list(self.blacklist.values()))
+
+    async def __block(self, request: web.Request) -> web.Response:
+        user_id = int((await self.__body(request)).get("targetId", 0))
+
+        with self.__lock:
+            self.blacklist[user_id] = make_blocked_user(user_id)
+
+        return web.json_response({})
+
+    async def __unblock(self, request: web.Request) -> web.Response:
+        user_id = int((await self.__body(request)).get("targetId", 0))
+
+        with self.__lock:
+            self.blacklist.pop(user_id, None)
+
+        return web.json_response({})
+
+    async def __user(self, request: web.Request) -> web.Response:
+        try:
+            user_id = int(request.match_info["id"])
+        except ValueError:
+            return web.json_response(
+                {"message": "Пользователь не найден"}, status=404
+            )
+
+        return web.json_response(make_user(user_id))
+
+    async def __rate(self, request: web.Request) -> web.Response:
+        course = 92.5 if request.path.endswith("rub") else 0.012
+
+        return web.json_response({"course": course})
+
+    def __own_message(
+        self, chat_id: str | None, content: str | None
+    ) -> dict[str, Any]:
+        with self.__lock:
+            n = self.frames_sent + sum(self.requests.values())
+
+        message = make_message(n, chat_id, content=content or "")
+        message["author"].update(
+            id=self.user_id, username=f"user{self.user_id}"
+        )
+
+        return message
+
+    async def __socket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        sid = uuid.uuid4().hex
+        handshake = {
+            "sid": sid,
+            "upgrades": [],
+            "pingInterval": int(self.ping_interval * 1000),
+            "pingTimeout": int(self.ping_timeout * 1000),
+            "maxPayload": 1000000,
+        }
+
+        with self.__lock:
+            self.connections += 1
+
+        self.__sockets.add(ws)
+        await ws.send_str("0" + json.dumps(handshake))
+        pinger = asyncio.create_task(self.__ping(ws))
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+
+                if msg.data == PONG:
+                    with self.__lock:
+                        self.pongs += 1
+                elif msg.data.startswith("40"):
+                    # подключение к пространству имён ("40/chats,")
+                    namespace = msg.data[2:].split(",", 1)[0] or "/"
+                    prefix = f"40{namespace}," if namespace != "/" else "40"
+                    await ws.send_str(
+                        prefix + json.dumps({"sid": uuid.uuid4().hex})
+                    )
+        finally:
+            pinger.cancel()
+            self.__sockets.discard(ws)
+
+        return ws
+
+    async def __ping(self, ws: web.WebSocketResponse) -> None:
+        while not ws.closed:
+            await asyncio.sleep(self.ping_interval)
+
+            try:
+                await ws.send_str(PING)
+            except ConnectionError:
+                return
@@ -0,0 +1,19 @@
+from .exporters import BaseExporter, JsonFileExporter, OtlpExporter
+from .tracer import (
+    Span,
+    Tracer,
+    current_span,
+    span,
+    start_span,
+)
+
+__all__ = [
+    "BaseExporter",
+    "JsonFileExporter",
+    "OtlpExporter",
+    "Span",
+    "Tracer",
+    "current_span",
+    "span",
+    "start_span",
+]
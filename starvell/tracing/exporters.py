@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+import requests
+
+if TYPE_CHECKING:
+    from .tracer import Span
+
+
+class BaseExporter(ABC):
+    """
+    Базовый класс получателя завершённых спанов Tracer'а, наследуйте его, чтобы отправлять спаны в своё хранилище. export() вызывается из потока отправки Tracer'а, пачками
+    """
+
+    @abstractmethod
+    def export(self, spans: list["Span"]) -> None:
+        """
+        Отправляет пачку спанов
+
+        :param spans: Завершённые спаны
+
+        :return: None
+        """
+
+    # необязательный метод: по умолчанию exporter'у нечего освобождать
+    def close(self) -> None:  # noqa: B027
+        """
+        Освобождает ресурсы exporter'а (вызывается из Tracer.close())
+
+        :return: None
+        """
+
+
+class JsonFileExporter(BaseExporter):
+    def __init__(self, path: str):
+        """
+        Дописывает спаны в файл, по одному JSON объекту (Span.to_dict()) на строку (файл открывается на время записи пачки)
+
+        :param path: Путь к файлу (папки создаются при необходимости)
+        """
+
+        self.path: str = path
+
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+
+    def export(self, spans: list["Span"]) -> None:
+        lines = "".join(
+            json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for s in spans
+        )
+
+        with self.__lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(s: "Span") -> dict[str, Any]:
+    span = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        # SPAN_KIND_INTERNAL
+        "kind": 1,
+        "startTimeUnixNano": str(int(s.start * 1e9)),
+        "endTimeUnixNano": str(int((s.end or s.start) * 1e9)),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in s.attributes.items()
+        ],
+        # STATUS_CODE_ERROR / STATUS_CODE_UNSET
+        "status": {"code": 2, "message": s.error} if s.error else {},
+    }
+
+    if s.parent_id:
+        span["parentSpanId"] = s.parent_id
+
+    return span
+
+
+class OtlpExporter(BaseExporter):
+    def __init__(
+        self,
+        url: str = "http://127.0.0.1:4318/v1/traces",
+        service_name: str = "starvell",
+        headers: dict[str, str] | None = None,
+        timeout: float = 10,
+    ):
+        """
+        Отправляет спаны коллектору по OTLP/HTTP в формате JSON (OpenTelemetry Collector, Jaeger, Tempo, либо StarvellServer из starvell.testing)
+
+        :param url: Адрес приёма трассировок коллектора
+        :param service_name: Название сервиса (атрибут service.name)
+        :param headers: Дополнительные заголовки (например авторизация коллектора)
+        :param timeout: Таймаут запроса в секундах
+        """
+
+        self.url: str = url
+        self.service_name: str = service_name
+        self.timeout: float = timeout
+
+        self.__session = requests.Session()
+        self.__session.headers.update(headers or {})
+
+    def export(self, spans: list["Span"]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(self.service_name),
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "starvell"},
+                            "spans": [_otlp_span(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+        response = self.__session.post(
+            self.url, json=body, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self.__session.close()
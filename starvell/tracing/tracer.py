@@ -0,0 +1,465 @@
+import random
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from .exporters import BaseExporter
+
+# текущий спан; _NOT_SAMPLED - трассировка не попала в выборку, вложенные спаны не создаются
+_NOT_SAMPLED: Any = object()
+_current_span: ContextVar[Any] = ContextVar("starvell_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "attributes",
+        "end",
+        "error",
+        "name",
+        "parent_id",
+        "span_id",
+        "start",
+        "trace_id",
+        "tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        start: float | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Этап обработки в трассировке: название, время начала и окончания (unix time в секундах), атрибуты и ошибка
+
+        :param tracer: Tracer, в который спан отправляется по окончании
+        :param name: Название этапа
+        :param trace_id: ID трассировки (32 hex символа)
+        :param parent_id: ID родительского спана (None - корневой спан)
+        :param start: Время начала (по умолчанию - сейчас)
+        :param attributes: Атрибуты (str / int / float / bool)
+        """
+
+        self.tracer: Tracer = tracer
+        self.name: str = name
+        self.trace_id: str = trace_id
+        self.span_id: str = tracer.new_id(64)
+        self.parent_id: str | None = parent_id
+        self.start: float = start if start is not None else time.time()
+        self.end: float | None = None
+        self.attributes: dict[str, Any] = attributes or {}
+        self.error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """
+        Длительность спана в секундах (0, если спан ещё не завершён)
+        """
+
+        return self.end - self.start if self.end is not None else 0.0
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Добавляет атрибуты спана
+
+        :return: None
+        """
+
+        self.attributes.update(attributes)
+
+    def finish(
+        self, end: float | None = None, error: BaseException | None = None
+    ) -> None:
+        """
+        Завершает спан и ставит его в очередь на отправку (повторный вызов ничего не делает)
+
+        :param end: Время окончания (по умолчанию - сейчас)
+        :param error: Исключение, с которым завершился этап
+
+        :return: None
+        """
+
+        if self.end is not None:
+            return
+
+        self.end = end if end is not None else time.time()
+
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+        self.tracer.export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        :return: Спан в виде словаря (для JSON)
+        """
+
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def current_span() -> Span | None:
+    """
+    :return: Текущий спан (в этом потоке / задаче asyncio), либо None, если трассировки нет или она не попала в выборку
+    """
+
+    current = _current_span.get()
+
+    return None if current is _NOT_SAMPLED else current
+
+
+def start_span(
+    name: str,
+    parent: Span | None = None,
+    start: float | None = None,
+    **attributes: Any,
+) -> Span | None:
+    """
+    Создаёт дочерний спан, не делая его текущим (например для ожидания в очереди, которое завершается в другом потоке). Его нужно завершить через ``span.finish()``
+
+    :param name: Название этапа
+    :param parent: Родительский спан (по умолчанию текущий)
+    :param start: Время начала (по умолчанию - сейчас)
+    :param attributes: Атрибуты спана
+
+    :return: Span, либо None, если трассировки нет
+    """
+
+    parent = parent or current_span()
+
+    if parent is None:
+        return None
+
+    return Span(
+        parent.tracer,
+        name,
+        parent.trace_id,
+        parent.span_id,
+        start,
+        attributes,
+    )
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Generator[Span | None, None, None]:
+    """
+    Дочерний спан текущей трассировки на время блока with (если трассировки нет - ничего не делает). Исключение из блока записывается в спан
+
+    Пример: ``with span("my_handler.send", chat_id=chat_id): ...``
+
+    :param name: Название этапа
+    :param attributes: Атрибуты спана
+
+    :return: Контекстный менеджер, возвращающий Span либо None
+    """
+
+    child = start_span(name, **attributes)
+
+    if child is None:
+        yield None
+        return
+
+    with _finishing(child):
+        yield child
+
+
+@contextmanager
+def _finishing(s: Span) -> Generator[None, None, None]:
+    token = _current_span.set(s)
+    error = None
+
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        s.finish(error=error)
+
+
+class Tracer:
+    def __init__(
+        self,
+        exporter: BaseExporter,
+        sample_rate: float = 1.0,
+        batch_size: int = 512,
+        flush_interval: float = 5.0,
+        max_queue: int = 10000,
+        seed: int | None = None,
+    ):
+        """
+        Трассировка событий: спан на каждый этап (кадр веб-сокета, разбор, очередь, детали заказа, сборка события, хэндлеры, HTTP запросы) с общим ID трассировки у события
+
+        Socket и Runner начинают трассировку на каждое событие Starvell, StarvellSession и OrderEnricher добавляют в неё дочерние спаны, если запрос выполняется внутри трассировки. Завершённые спаны отправляются exporter'у пачками в отдельном потоке, при переполнении очереди новые спаны отбрасываются
+
+        :param exporter: Куда отправлять спаны (JsonFileExporter, OtlpExporter)
+        :param sample_rate: Доля событий, которые трассируются (от 0 до 1)
+        :param batch_size: Сколько спанов отправлять за раз
+        :param flush_interval: Как часто отправлять накопившиеся спаны, в секундах
+        :param max_queue: Максимальное кол-во спанов в очереди на отправку
+        :param seed: Seed генератора ID и выборки (None - случайный)
+        """
+
+        self.exporter: BaseExporter = exporter
+        self.sample_rate: float = sample_rate
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.max_queue: int = max_queue
+
+        self.traces_count: int = 0
+        self.sampled_count: int = 0
+        self.spans_count: int = 0
+        self.exported_count: int = 0
+        self.dropped_count: int = 0
+
+        self.__random = random.Random(seed)
+        self.__queue: list[Span] = []
+        self.__cond = threading.Condition()
+        self.__export_lock = threading.Lock()
+        self.__thread: threading.Thread | None = None
+        self.__closed: bool = False
+
+    def new_id(self, bits: int = 128) -> str:
+        """
+        :param bits: Размер ID в битах (128 - ID трассировки, 64 - ID спана)
+
+        :return: Случайный ID в hex
+        """
+
+        return f"{self.__random.getrandbits(bits):0{bits // 4}x}"
+
+    def start_trace(
+        self, name: str, start: float | None = None, **attributes: Any
+    ) -> Span | None:
+        """
+        Начинает новую трассировку (с учётом sample_rate), не делая её текущей
+
+        :param name: Название корневого спана
+        :param start: Время начала (по умолчанию - сейчас)
+        :param attributes: Атрибуты спана
+
+        :return: Корневой Span, либо None, если трассировка не попала в выборку
+        """
+
+        with self.__cond:
+            self.traces_count += 1
+
+            if self.__random.random() >= self.sample_rate:
+                return None
+
+            self.sampled_count += 1
+
+        return Span(self, name, self.new_id(128), None, start, attributes)
+
+    def start_span(
+        self, name: str, start: float | None = None, **attributes: Any
+    ) -> Span | None:
+        """
+        Создаёт спан, не делая его текущим: дочерний, если вызван внутри трассировки, иначе - корневой спан новой трассировки (с учётом sample_rate)
+
+        :param name: Название этапа
+        :param start: Время начала (по умолчанию - сейчас)
+        :param attributes: Атрибуты спана
+
+        :return: Span, либо None, если трассировка не попала в выборку
+        """
+
+        parent = _current_span.get()
+
+        if parent is _NOT_SAMPLED:
+            return None
+
+        if parent is not None:
+            return start_span(name, parent, start, **attributes)
+
+        return self.start_trace(name, start, **attributes)
+
+    @contextmanager
+    def activate(self, s: Span | None) -> Generator[Span | None, None, None]:
+        """
+        Делает спан текущим внутри блока with (например в потоке пула, который обрабатывает событие). None означает трассировку вне выборки: внутри блока новые трассировки не начинаются
+
+        :param s: Спан, полученный от start_span() / start_trace()
+
+        :return: Контекстный менеджер, возвращающий s
+        """
+
+        token = _current_span.set(s if s is not None else _NOT_SAMPLED)
+
+        try:
+            yield s
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def trace(
+        self, name: str, start: float | None = None, **attributes: Any
+    ) -> Generator[Span | None, None, None]:
+        """
+        Спан на время блока with (см. start_span): дочерний внутри трассировки, иначе - начало новой трассировки. Исключение из блока записывается в спан
+
+        :param name: Название этапа
+        :param start: Время начала (по умолчанию - сейчас)
+        :param attributes: Атрибуты спана
+
+        :return: Контекстный менеджер, возвращающий Span, либо None, если трассировка не попала в выборку
+        """
+
+        s = self.start_span(name, start, **attributes)
+
+        if s is None:
+            with self.activate(None):
+                yield None
+            return
+
+        with _finishing(s):
+            yield s
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float | None = None,
+        parent: Span | None = None,
+        **attributes: Any,
+    ) -> None:
+        """
+        Добавляет уже завершившийся этап текущей трассировки (например замеренный до её начала)
+
+        :param name: Название этапа
+        :param start: Время начала (unix time)
+        :param end: Время окончания (по умолчанию - сейчас)
+        :param parent: Родительский спан (по умолчанию текущий)
+        :param attributes: Атрибуты спана
+
+        :return: None
+        """
+
+        s = start_span(name, parent, start, **attributes)
+
+        if s is not None:
+            s.finish(end)
+
+    def export(self, s: Span) -> None:
+        """
+        Ставит завершённый спан в очередь на отправку
+
+        :param s: Спан
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.spans_count += 1
+
+            if self.__closed or len(self.__queue) >= self.max_queue:
+                self.dropped_count += 1
+                return
+
+            self.__queue.append(s)
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="starvell-tracer", daemon=True
+                )
+                self.__thread.start()
+
+            if len(self.__queue) >= self.batch_size:
+                self.__cond.notify()
+
+    def flush(self) -> None:
+        """
+        Отправляет все спаны из очереди в текущем потоке
+
+        :return: None
+        """
+
+        while True:
+            with self.__cond:
+                batch = self.__queue[: self.batch_size]
+                del self.__queue[: self.batch_size]
+
+            if not batch:
+                return
+
+            self.__send(batch)
+
+    def close(self) -> None:
+        """
+        Отправляет оставшиеся спаны, останавливает поток отправки и закрывает exporter. Спаны, завершённые после close(), отбрасываются
+
+        :return: None
+        """
+
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify()
+            thread = self.__thread
+
+        if thread is not None:
+            thread.join()
+
+        self.flush()
+        self.exporter.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Статистика трассировки
+
+        :return: Словарь (начато трассировок, попало в выборку, завершено спанов, отправлено, отброшено, в очереди)
+        """
+
+        with self.__cond:
+            return {
+                "traces": self.traces_count,
+                "sampled": self.sampled_count,
+                "spans": self.spans_count,
+                "exported": self.exported_count,
+                "dropped": self.dropped_count,
+                "queued": len(self.__queue),
+            }
+
+    def __run(self) -> None:
+        while True:
+            with self.__cond:
+                if not self.__closed and len(self.__queue) < self.batch_size:
+                    self.__cond.wait(self.flush_interval)
+
+                closed = self.__closed
+
+            self.flush()
+
+            if closed:
+                return
+
+    def __send(self, batch: list[Span]) -> None:
+        # exporter может быть не потокобезопасным, а flush() вызывается и из потока отправки, и вручную
+        with self.__export_lock:
+            try:
+                self.exporter.export(batch)
+            # exporter подключается пользователем, его ошибка не должна останавливать поток отправки
+            except Exception as e:  # noqa: BLE001
+                print(f"Ошибка при отправке спанов: {e}")
+
+                with self.__cond:
+                    self.dropped_count += len(batch)
+                return
+
+        with self.__cond:
+            self.exported_count += len(batch)
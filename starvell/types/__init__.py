@@ -47,6 +47,13 @@ __all__ = [
     "ExchangeRate",
     "Attributes",
     "OrderArgs",
+    "OrderInfoList",
+    "TransactionInfoList",
+    "ReviewInfoList",
+    "ChatInfoList",
+    "OfferTableInfoList",
+    "LotFieldsList",
+    "BlockListedUserList",
 ]
 
 from .blocklist import BlockListedUser
@@ -87,3 +94,12 @@ from .transaction import (
 )
 from .user import UserInfo, UserInfoExtendedLow, User
 from .exchange_rate import ExchangeRate
+from .adapters import (
+    OrderInfoList,
+    TransactionInfoList,
+    ReviewInfoList,
+    ChatInfoList,
+    OfferTableInfoList,
+    LotFieldsList,
+    BlockListedUserList,
+)
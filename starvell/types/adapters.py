@@ -0,0 +1,25 @@
+from pydantic import TypeAdapter
+
+from .blocklist import BlockListedUser
+from .chats import ChatInfo
+from .offer_fields import LotFields
+from .offers_list import OfferTableInfo
+from .preview_order import OrderInfo
+from .review import ReviewInfo
+from .transaction import TransactionInfo
+
+# Схемы валидации списков собираются один раз при импорте, а не на каждый ответ.
+# validate_json() парсит и валидирует байты ответа за один проход в pydantic-core, без промежуточных dict'ов
+OrderInfoList: TypeAdapter[list[OrderInfo]] = TypeAdapter(list[OrderInfo])
+TransactionInfoList: TypeAdapter[list[TransactionInfo]] = TypeAdapter(
+    list[TransactionInfo]
+)
+ReviewInfoList: TypeAdapter[list[ReviewInfo]] = TypeAdapter(list[ReviewInfo])
+ChatInfoList: TypeAdapter[list[ChatInfo]] = TypeAdapter(list[ChatInfo])
+OfferTableInfoList: TypeAdapter[list[OfferTableInfo]] = TypeAdapter(
+    list[OfferTableInfo]
+)
+LotFieldsList: TypeAdapter[list[LotFields]] = TypeAdapter(list[LotFields])
+BlockListedUserList: TypeAdapter[list[BlockListedUser]] = TypeAdapter(
+    list[BlockListedUser]
+)
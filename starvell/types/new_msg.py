@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from starvell.enums import MessageTypes
 from .chat import MetaData, Author
@@ -9,6 +9,18 @@ class BaseConfig(BaseModel):
         validate_by_name = True
 
 
+class TracedEvent(BaseModel):
+    _trace_id: str | None = PrivateAttr(None)
+
+    @property
+    def trace_id(self) -> str | None:
+        """
+        ID трассировки события (Tracer Runner'а), None - если трассировка не ведётся либо событие не попало в выборку
+        """
+
+        return self._trace_id
+
+
 class Images(BaseConfig):
     id: str
     width: int | float | str
@@ -16,7 +28,7 @@ class Images(BaseConfig):
     extension: str
 
 
-class NewMessageEvent(BaseConfig):
+class NewMessageEvent(BaseConfig, TracedEvent):
     by_api: bool | None = None
     by_admin: bool
     is_auto_response: bool
@@ -29,7 +41,7 @@ class NewMessageEvent(BaseConfig):
     type: MessageTypes
 
 
-class ServiceMessageEvent(BaseConfig):
+class ServiceMessageEvent(BaseConfig, TracedEvent):
     id: str
     type: MessageTypes
     chat_id: str | None = None
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
+from typing import Any
 
 from starvell.enums import OrderStatuses
+from starvell.utils import format_order_status, get_full_lot_title
 
 
 class BaseConfig(BaseModel):
@@ -88,3 +90,31 @@ class Order(BaseConfig):
     created_at: datetime = Field(alias="createdAt")
     refunded_at: datetime | None = Field(alias="refundedAt")
     completed_at: datetime | None = Field(alias="completedAt")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def validate_status(cls, value: Any) -> Any:
+        return format_order_status(value) if isinstance(value, str) else value
+
+    @field_validator("price_for_me", "price_for_buyer", mode="before")
+    @classmethod
+    def validate_price(cls, value: Any) -> Any:
+        # Starvell отдаёт цены в копейках
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value / 100
+
+        return 0
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_full_lot_title(cls, data: Any) -> Any:
+        if (
+            isinstance(data, dict)
+            and isinstance(data.get("offerDetails"), dict)
+            and "full_lot_title" not in data["offerDetails"]
+        ):
+            data["offerDetails"]["full_lot_title"] = get_full_lot_title(
+                data["offerDetails"], data
+            )
+
+        return data
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, Field
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 from .chat import Author, MiniOrder
+from .new_msg import TracedEvent
 
 
 class BaseConfig(BaseModel):
@@ -8,7 +12,23 @@ class BaseConfig(BaseModel):
         validate_by_name = True
 
 
-class OrderEvent(BaseModel):
+class OrderEvent(TracedEvent):
     chat_id: str = Field(alias="chatId")
     buyer: Author
     order: MiniOrder
+
+    _order_loader: Callable[[], Any] | None = PrivateAttr(None)
+
+    def get_order(self) -> Any:
+        """
+        Полная информация о заказе (Order), запрашивается при первом обращении и запоминается
+
+        Для событий AsyncRunner возвращает awaitable: ``order = await event.get_order()``
+
+        :return: Order
+        """
+
+        if self._order_loader is None:
+            raise ValueError("Событие создано не Runner'ом")
+
+        return self._order_loader()
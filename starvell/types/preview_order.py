@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
+from typing import Any
 
 from .order import SubCategory, DeliveryTime, Descriptions, Game
 from starvell.enums import OrderStatuses
+from starvell.utils import format_order_status
 
 
 class BaseConfig(BaseModel):
@@ -57,3 +59,8 @@ class OrderInfo(BaseConfig):
     created_at: datetime | None = Field(alias="createdAt")
     updated_at: datetime | None = Field(alias="updatedAt")
     buyer: UserPreviewOrder = Field(alias="user")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def validate_status(cls, value: Any) -> Any:
+        return format_order_status(value) if isinstance(value, str) else value
@@ -1,11 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
+from typing import Any
 
 from starvell.enums import (
     TransactionDirections,
     TransactionTypes,
     TransactionStatuses,
 )
+from starvell.utils import format_directions, format_statuses, format_types
 
 
 class BaseConfig(BaseModel):
@@ -56,3 +58,18 @@ class TransactionInfo(BaseConfig):
         alias="payoutPaymentSystem"
     )
     topup_payment_system: dict | None = Field(alias="topupPaymentSystem")
+
+    @field_validator("direction", mode="before")
+    @classmethod
+    def validate_direction(cls, value: Any) -> Any:
+        return format_directions(value) if isinstance(value, str) else value
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def validate_type(cls, value: Any) -> Any:
+        return format_types(value) if isinstance(value, str) else value
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def validate_status(cls, value: Any) -> Any:
+        return format_statuses(value) if isinstance(value, str) else value
@@ -5,10 +5,15 @@ from .utils import (
     format_payment_methods,
     format_statuses,
     format_types,
+    fill_order_details,
     identify_ws_starvell_message,
+    is_order_notification,
+    parse_ws_starvell_message,
     get_full_lot_title,
     NOTIFICATION_ORDER_TYPES,
 )
+from .json_stream import iter_json_array
+from .pagination import apaginate, paginate
 
 __all__ = [
     "format_directions",
@@ -17,7 +22,13 @@ __all__ = [
     "format_order_status",
     "format_statuses",
     "format_types",
+    "fill_order_details",
     "identify_ws_starvell_message",
+    "is_order_notification",
+    "parse_ws_starvell_message",
     "get_full_lot_title",
     "NOTIFICATION_ORDER_TYPES",
+    "apaginate",
+    "iter_json_array",
+    "paginate",
 ]
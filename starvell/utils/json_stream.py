@@ -0,0 +1,88 @@
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Инкрементально парсит JSON-массив верхнего уровня, приходящий кусками (например response.iter_content()), и отдаёт элементы по мере их получения
+
+    В памяти одновременно находится только текущий кусок и не до конца полученный элемент
+
+    :param chunks: Куски ответа (bytes)
+
+    :return: Генератор элементов массива
+    :raise ValueError: Если ответ не является JSON-массивом, или он оборван
+    """
+
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, eof
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer = buffer[pos:] + utf8.decode(chunk)
+            pos = 0
+            return True
+
+        if not eof:
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+            pos = 0
+            eof = True
+            return True
+
+        return False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos == len(buffer):
+            if read_more():
+                continue
+            raise ValueError("JSON-массив оборван")
+
+        char = buffer[pos]
+
+        if not started:
+            if char != "[":
+                raise ValueError("Ответ не является JSON-массивом")
+            started = True
+            pos += 1
+            continue
+
+        if char == "]":
+            return
+
+        if char == ",":
+            pos += 1
+            continue
+
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if read_more():
+                continue
+            raise
+
+        # за элементом всегда идёт разделитель, иначе он (например число "12" из "123") пришёл не полностью
+        if end == len(buffer) or buffer[end] not in _DELIMITERS:
+            if read_more():
+                continue
+            if end < len(buffer):
+                raise ValueError("Некорректный JSON-массив")
+
+        pos = end
+        yield item
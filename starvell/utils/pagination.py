@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def paginate(
+    fetch_page: Callable[[int, int], list[T]],
+    page_size: int = 100,
+    prefetch: int = 2,
+    offset: int = 0,
+) -> Iterator[T]:
+    """
+    Ленивый генератор по страницам: пока вызывающий код обрабатывает текущую страницу, следующие prefetch страниц загружаются параллельно
+
+    В памяти одновременно находится не больше prefetch + 1 страниц. Загрузка прекращается на первой неполной странице.
+
+    :param fetch_page: Функция, получающая страницу (offset, limit) -> list
+    :param page_size: Размер страницы
+    :param prefetch: Сколько страниц загружать наперёд (параллельно)
+    :param offset: С какого объекта начинать
+
+    :return: Генератор объектов
+    """
+
+    prefetch = max(prefetch, 1)
+    pool = ThreadPoolExecutor(
+        max_workers=prefetch, thread_name_prefix="starvell-page"
+    )
+    pages: deque[Future] = deque()
+
+    def submit() -> None:
+        nonlocal offset
+        # у каждой страницы своя копия контекста (например приоритет запросов из request_priority)
+        ctx = contextvars.copy_context()
+        pages.append(pool.submit(ctx.run, fetch_page, offset, page_size))
+        offset += page_size
+
+    try:
+        for _ in range(prefetch):
+            submit()
+
+        while pages:
+            page = pages.popleft().result()
+
+            if len(page) < page_size:
+                for future in pages:
+                    future.cancel()
+                pages.clear()
+            else:
+                submit()
+
+            yield from page
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def apaginate(
+    fetch_page: Callable[[int, int], Awaitable[list[T]]],
+    page_size: int = 100,
+    prefetch: int = 2,
+    offset: int = 0,
+) -> AsyncIterator[T]:
+    """
+    Асинхронная версия paginate: следующие prefetch страниц загружаются в отдельных задачах asyncio
+
+    :param fetch_page: Корутинная функция, получающая страницу (offset, limit) -> list
+    :param page_size: Размер страницы
+    :param prefetch: Сколько страниц загружать наперёд (параллельно)
+    :param offset: С какого объекта начинать
+
+    :return: Асинхронный генератор объектов
+    """
+
+    prefetch = max(prefetch, 1)
+    pages: deque[asyncio.Task] = deque()
+
+    def submit() -> None:
+        nonlocal offset
+        pages.append(asyncio.ensure_future(fetch_page(offset, page_size)))
+        offset += page_size
+
+    try:
+        for _ in range(prefetch):
+            submit()
+
+        while pages:
+            page = await pages.popleft()
+
+            if len(page) < page_size:
+                for task in pages:
+                    task.cancel()
+                pages.clear()
+            else:
+                submit()
+
+            for item in page:
+                yield item
+    finally:
+        for task in pages:
+            task.cancel()
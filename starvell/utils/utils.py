@@ -1,4 +1,3 @@
-import json
 from typing import TYPE_CHECKING, Any, Optional
 
 from starvell.enums import (
@@ -9,9 +8,12 @@ from starvell.enums import (
     TransactionStatuses,
     TransactionTypes,
 )
+from starvell.protocol import Packet, parse_packet
 
 if TYPE_CHECKING:
     from starvell.account import Account
+    from starvell.events.enrichment import OrderDetails
+    from starvell.types import Order
 
 NOTIFICATION_TYPES = (
     "ORDER_PAYMENT",
@@ -163,17 +165,47 @@ def format_payment_methods(method: PaymentTypes) -> Optional[int]:
     return p_types.get(method)
 
 
-def identify_ws_starvell_message(data: str, acc: "Account") -> dict[str, Any]:
+def identify_ws_starvell_message(
+    data: str | Packet, acc: "Account"
+) -> dict[str, Any]:
     """
     Определяет тип нового сообщения со Starvell в чате, полученного с веб-сокета
 
-    :param data: Сообщение с веб-сокета (Должно быть именно новым сообщением)
+    :param data: Сообщение с веб-сокета либо разобранный пакет (Должно быть именно новым сообщением)
     :param acc: Экземпляр аккаунта
 
     :return: Отформатированный словарь
     """
 
-    dict_with_data = json.loads(data[len('42/chats,["message_created",') : -1])
+    dict_with_data = parse_ws_starvell_message(data)
+
+    if is_order_notification(dict_with_data):
+        # заказ мог измениться (оплачен, закрыт, возвращён), поэтому всегда запрашиваем свежий - он же обновит кэш аккаунта
+        order = acc.get_order(dict_with_data["order"]["id"], use_cache=False)
+        fill_order_details(dict_with_data, order)
+
+    return dict_with_data
+
+
+def parse_ws_starvell_message(
+    data: str | Packet | dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Разбирает новое сообщение со Starvell из веб-сокета и определяет его тип, не делая запросов к Starvell
+
+    Для уведомлений о заказах детали заказа (цены, ID лота) нужно дополнить через fill_order_details()
+
+    :param data: Сообщение с веб-сокета, разобранный пакет (parse_packet) либо уже декодированные данные события message_created (Должно быть именно новым сообщением)
+
+    :return: Отформатированный словарь
+    """
+
+    if isinstance(data, str):
+        data = parse_packet(data)
+    if isinstance(data, Packet):
+        data = data.args[0]
+
+    dict_with_data = data
 
     if (
         dict_with_data["metadata"] is None
@@ -202,15 +234,9 @@ def identify_ws_starvell_message(data: str, acc: "Account") -> dict[str, Any]:
         dict_with_data["type"] = MessageTypes.NEW_MESSAGE
 
     elif dict_with_data["metadata"]["notificationType"] in NOTIFICATION_TYPES:
-        nt = dict_with_data["metadata"]["notificationType"]
-
-        if nt in NOTIFICATION_ORDER_TYPES:
-            order = acc.get_order(dict_with_data["order"]["id"])
-            dict_with_data["order"]["price_for_me"] = order.price_for_me
-            dict_with_data["order"]["price_for_buyer"] = order.price_for_buyer
-            dict_with_data["order"]["offer_id"] = order.offer_id
-
-        dict_with_data["type"] = format_message_types(nt)
+        dict_with_data["type"] = format_message_types(
+            dict_with_data["metadata"]["notificationType"]
+        )
 
     elif (
         dict_with_data["metadata"]["notificationType"]
@@ -232,6 +258,37 @@ def identify_ws_starvell_message(data: str, acc: "Account") -> dict[str, Any]:
     return dict_with_data
 
 
+def is_order_notification(dict_with_data: dict[str, Any]) -> bool:
+    """
+    Проверяет, является-ли событие уведомлением о заказе (для него нужны детали заказа)
+
+    :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+
+    :return: True / False
+    """
+
+    metadata = dict_with_data.get("metadata") or {}
+
+    return metadata.get("notificationType") in NOTIFICATION_ORDER_TYPES
+
+
+def fill_order_details(
+    dict_with_data: dict[str, Any], order: "Order | OrderDetails"
+) -> None:
+    """
+    Дополняет уведомление о заказе деталями заказа (цены, ID лота)
+
+    :param dict_with_data: Словарь с событием (результат parse_ws_starvell_message)
+    :param order: Заказ, полученный через get_order() (либо OrderDetails)
+
+    :return: None
+    """
+
+    dict_with_data["order"]["price_for_me"] = order.price_for_me
+    dict_with_data["order"]["price_for_buyer"] = order.price_for_buyer
+    dict_with_data["order"]["offer_id"] = order.offer_id
+
+
 def get_full_lot_title(offer: dict[str, Any], response):
     full_lot_title = ""
 